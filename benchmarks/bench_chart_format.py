@@ -0,0 +1,53 @@
+"""
+Compare the records and the columnar output formats of GraphChart.process.
+
+Reports the processing time, the peak memory while processing and the size
+of the JSON serialized result for both formats.
+"""
+from __future__ import absolute_import, print_function
+import json
+import tracemalloc
+
+from common import FIELDS, make_readings, best_time, print_table
+
+from ooui.graph import parse_graph
+
+XML = '''<?xml version="1.0"?>
+<graph type="line" timerange="hour">
+    <field name="date" axis="x"/>
+    <field name="value" operator="+" label="period" axis="y"/>
+</graph>'''
+
+SIZES = (3000, 30000)
+
+
+def measure(graph, values, options):
+    tracemalloc.start()
+    result = graph.process(values, FIELDS, options=options)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    elapsed = best_time(lambda: graph.process(values, FIELDS, options=options))
+    size = len(json.dumps(result))
+    return elapsed, peak, size
+
+
+def run():
+    graph = parse_graph(XML)
+    rows = []
+    for num_rows in SIZES:
+        values = make_readings(num_rows)
+        for name, options in (('records', {}), ('columnar', {'format': 'columnar'})):
+            elapsed, peak, size = measure(graph, values, options)
+            rows.append((
+                num_rows, name, '{:.1f}'.format(elapsed * 1000),
+                '{:.1f}'.format(peak / 1024.0), '{:.1f}'.format(size / 1024.0)
+            ))
+    print_table(
+        'Chart output format',
+        ('rows', 'format', 'time (ms)', 'peak (KiB)', 'json (KiB)'), rows
+    )
+    return True
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,65 @@
+"""
+Measure the evaluation of the `colors` condition of a tree for each row.
+
+The compiled condition is compared with the `simpleeval` interpreter, and the
+memoised results with the compiled condition for rows repeating their values.
+The benchmark fails when the compiled condition is not faster. The memoised
+results are reported only, they are about as fast as short compiled
+conditions and pay off with the interpreted ones.
+"""
+from __future__ import absolute_import, print_function
+
+from common import best_time, make_readings, print_table
+
+from ooui.helpers.conditions import ConditionParser
+
+CONDITION = (
+    "grey:period in ('p3',);red:value<10 and meter[0]!=1;"
+    "blue:date<current_date and bool(value)"
+)
+
+# Only hashable values, the rows repeat the values of a few months
+MEMO_CONDITION = (
+    "grey:period=='p3' and value>18;red:value<2 and date>='2020-06';"
+    "orange:value<5 and period!='p1';green:value>=15 and date<current_date;"
+    "blue:date>=current_date"
+)
+
+NUM_ROWS = 20000
+
+
+def run():
+    rows = make_readings(NUM_ROWS)
+    parser = ConditionParser(CONDITION)
+
+    interpreted = best_time(lambda: [parser.interpret(r) for r in rows], 3)
+    compiled = best_time(lambda: [parser.eval(r) for r in rows], 3)
+
+    memo_rows = [
+        dict(row, date=row['date'][:7], value=row['value'] % 20)
+        for row in rows
+    ]
+    parser = ConditionParser(MEMO_CONDITION)
+    memo = parser.memo
+    parser.memo = None
+    not_memoised = best_time(
+        lambda: [parser.eval(r) for r in memo_rows], 3
+    )
+    parser.memo = memo
+    memoised = best_time(lambda: [parser.eval(r) for r in memo_rows], 3)
+
+    print_table(
+        'Condition evaluation ({} rows)'.format(NUM_ROWS),
+        ('mode', 'ms', 'us/row'),
+        [(mode, '{:.1f}'.format(t * 1000), '{:.2f}'.format(t * 1e6 / NUM_ROWS))
+         for mode, t in (
+             ('interpreted', interpreted), ('compiled', compiled),
+             ('compiled, repeated', not_memoised),
+             ('memoised, repeated', memoised),
+        )]
+    )
+    return compiled < interpreted
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,123 @@
+"""
+Measure the private memory of forked workers that share cached views.
+
+The master parses the views and forks the workers, which run a garbage
+collection and look up every view in the parse caches, as a server does
+with the archs it receives. The parse caches only keep some of the views
+unless `ooui.warmup` grows them, and the workers parse the others again.
+Without `gc.freeze` the collection writes to the object headers of the
+cached views and the workers get private copies of their pages. With it,
+the workers still write to the reference counts of the views they read, so
+the warmed up workers can write more private memory than the ones that only
+find some of the views cached. Only available on Linux.
+"""
+from __future__ import absolute_import, print_function
+import gc
+import os
+import subprocess
+import sys
+
+from common import ROOT_DIR, print_table
+
+NUM_VIEWS = 5000
+NUM_WORKERS = 4
+
+GRAPH_XML = '''<graph type="line" timerange="day">
+    <field name="date_{0}" axis="x"/>
+    <field name="value_{0}" operator="+" label="period_{0}" axis="y"/>
+</graph>'''
+
+TREE_XML = '''<tree string="Readings {0}" colors="red:value_{0}&lt;0">
+    <field name="date_{0}"/>
+    <field name="value_{0}"/>
+</tree>'''
+
+
+def get_private_dirty():
+    """
+    Return the private dirty memory of the current process in KiB.
+    """
+    with open('/proc/self/smaps_rollup') as smaps:
+        for line in smaps:
+            if line.startswith('Private_Dirty:'):
+                return int(line.split()[1])
+    return 0
+
+
+def measure(mode):
+    """
+    Parse the views, fork the workers and return the number of views parsed
+    again by each worker and their average private dirty memory in KiB.
+    """
+    from ooui import warmup
+    from ooui.compile import parse_view
+    from ooui.graph import parse_graph, PARSE_CACHE as GRAPH_CACHE
+    from ooui.tree import parse_tree, PARSE_CACHE as TREE_CACHE
+
+    archs = [GRAPH_XML.format(i) for i in range(NUM_VIEWS)]
+    archs += [TREE_XML.format(i) for i in range(NUM_VIEWS)]
+    if mode == 'warmup':
+        warmup(archs)
+    elif mode == 'nofreeze':
+        warmup(archs, freeze=False)
+    else:
+        for arch in archs:
+            if arch.startswith('<graph'):
+                parse_graph(arch)
+            else:
+                parse_tree(arch)
+
+    readers = []
+    for _ in range(NUM_WORKERS):
+        read_fd, write_fd = os.pipe()
+        if os.fork() == 0:
+            os.close(read_fd)
+            parsed = sum(
+                arch not in GRAPH_CACHE and arch not in TREE_CACHE
+                for arch in archs
+            )
+            before = get_private_dirty()
+            gc.collect()
+            for arch in archs:
+                parse_view(arch).string
+            private = get_private_dirty() - before
+            os.write(write_fd, '{} {}'.format(parsed, private).encode('ascii'))
+            os._exit(0)
+        os.close(write_fd)
+        readers.append(read_fd)
+
+    results = []
+    for read_fd in readers:
+        results.append([int(v) for v in os.read(read_fd, 64).split()])
+        os.close(read_fd)
+        os.wait()
+    parsed = results[0][0]
+    private = sum(result[1] for result in results) / float(len(results))
+    return parsed, private
+
+
+def run():
+    if not os.path.exists('/proc/self/smaps_rollup') or not hasattr(os, 'fork'):
+        print('fork_rss: skipped, needs Linux\n')
+        return True
+    rows = []
+    for mode in ('parse', 'nofreeze', 'warmup'):
+        # A new interpreter for each mode, gc.freeze can't be undone
+        output = subprocess.check_output(
+            [sys.executable, os.path.abspath(__file__), mode], cwd=ROOT_DIR
+        )
+        parsed, private = output.decode().split()
+        rows.append((mode, NUM_VIEWS * 2, NUM_WORKERS, parsed, private))
+    print_table(
+        'Private memory written by each forked worker',
+        ('mode', 'views', 'workers', 'parsed again', 'private dirty (KiB)'),
+        rows
+    )
+    return True
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        print('{} {:.0f}'.format(*measure(sys.argv[1])))
+    else:
+        run()
@@ -0,0 +1,70 @@
+"""
+Measure the time to import the ooui entry points in a fresh interpreter.
+
+Short-lived workers import ooui just to parse a view, so each import has a
+budget and must not load the heavy dependencies, which are only imported on
+first use.
+"""
+from __future__ import absolute_import, print_function
+import json
+import subprocess
+import sys
+
+from common import ROOT_DIR, print_table
+
+# Module imported, budget in milliseconds and modules it must not load
+IMPORTS = (
+    ('ooui.tree', 20, ('lxml.etree', 'simpleeval')),
+    ('ooui.helpers', 20, ('simpleeval', 'dateutil')),
+    ('ooui.graph', 20, ('lxml.etree', 'dateutil', 'ooui.graph.chart')),
+)
+
+REPEAT = 5
+
+SCRIPT = '''
+import json, sys, time
+start = time.time()
+import {module}
+elapsed = time.time() - start
+print(json.dumps({{
+    'elapsed': elapsed,
+    'loaded': [m for m in {heavy!r} if m in sys.modules],
+}}))
+'''
+
+
+def measure(module, heavy):
+    """
+    Import `module` in a new interpreter and return the best import time in
+    seconds and the heavy modules loaded by it.
+    """
+    results = []
+    for _ in range(REPEAT):
+        output = subprocess.check_output(
+            [sys.executable, '-c', SCRIPT.format(module=module, heavy=heavy)],
+            cwd=ROOT_DIR
+        )
+        results.append(json.loads(output.decode('utf-8')))
+    return min(r['elapsed'] for r in results), results[0]['loaded']
+
+
+def run():
+    ok = True
+    rows = []
+    for module, budget, heavy in IMPORTS:
+        elapsed, loaded = measure(module, list(heavy))
+        within_budget = elapsed * 1000 <= budget and not loaded
+        ok = ok and within_budget
+        rows.append((
+            module, '{:.1f}'.format(elapsed * 1000), budget,
+            ', '.join(loaded) or '-', 'ok' if within_budget else 'FAIL'
+        ))
+    print_table(
+        'Import time',
+        ('module', 'time (ms)', 'budget (ms)', 'heavy loaded', 'status'), rows
+    )
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run() else 1)
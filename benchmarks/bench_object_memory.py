@@ -0,0 +1,87 @@
+"""
+Measure the memory used by each parsed view object.
+
+Workers keep tens of thousands of parsed views cached, so the size of the
+graph, axis and tree objects (not counting the lxml elements they keep) is
+reported per object.
+"""
+from __future__ import absolute_import, print_function
+import tracemalloc
+
+from common import print_table
+
+from ooui.graph import parse_graph
+from ooui.graph.axis import GraphXAxis, GraphYAxis
+from ooui.tree import parse_tree
+
+CHART_XML = '''<?xml version="1.0"?>
+<graph type="line" timerange="day">
+    <field name="date" axis="x"/>
+    <field name="value" operator="+" label="period" axis="y"/>
+    <field name="other" operator="max" axis="y" stacked="a"/>
+</graph>'''
+
+INDICATOR_XML = '''<?xml version="1.0"?>
+<graph type="indicatorField" color="red:value&gt;0" showPercent="1">
+    <field name="value" operator="+"/>
+</graph>'''
+
+TREE_XML = '''<tree string="Readings" colors="red:value&lt;0">
+    <field name="date"/>
+    <field name="value"/>
+</tree>'''
+
+NUM_OBJECTS = 5000
+
+
+def measure(factory, elements):
+    """
+    Return the bytes allocated per object when building one object for
+    each of `elements`.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(element) for element in elements]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    return allocated / float(len(elements))
+
+
+def run():
+    from lxml import etree
+
+    chart = parse_graph(CHART_XML)
+    indicator = parse_graph(INDICATOR_XML)
+    tree = parse_tree(TREE_XML)
+    chart_elements = [etree.fromstring(CHART_XML) for _ in range(NUM_OBJECTS)]
+    indicator_elements = [
+        etree.fromstring(INDICATOR_XML) for _ in range(NUM_OBJECTS)
+    ]
+    tree_elements = [etree.fromstring(TREE_XML) for _ in range(NUM_OBJECTS)]
+    # Every attribute string is a new object, as it is when parsing views
+    names = [''.join(['da', 'te']) for _ in range(NUM_OBJECTS)]
+
+    rows = [
+        ('GraphXAxis', measure(GraphXAxis, names)),
+        ('GraphYAxis', measure(
+            lambda name: GraphYAxis(name, ''.join(['+']), None, None), names
+        )),
+        ('GraphChart', measure(
+            lambda element: type(chart)('line', element), chart_elements
+        )),
+        ('GraphIndicatorField', measure(
+            lambda element: type(indicator)('indicatorField', element),
+            indicator_elements
+        )),
+        ('Tree', measure(lambda element: type(tree)(element), tree_elements)),
+    ]
+    print_table(
+        'Memory per view object',
+        ('object', 'bytes'), [(n, '{:.0f}'.format(b)) for n, b in rows]
+    )
+    return True
+
+
+if __name__ == '__main__':
+    run()
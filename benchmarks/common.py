@@ -0,0 +1,77 @@
+"""
+Shared helpers for the benchmark suite.
+
+Run every benchmark with `python benchmarks/run.py` or a single one with
+`python benchmarks/<name>.py`.
+"""
+from __future__ import absolute_import, print_function
+import gc
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+FIELDS = {
+    'date': {'type': 'datetime', 'string': 'Date'},
+    'value': {'type': 'float', 'string': 'Value'},
+    'period': {
+        'type': 'selection',
+        'string': 'Period',
+        'selection': [('p1', 'P1'), ('p2', 'P2'), ('p3', 'P3')],
+    },
+    'meter': {
+        'type': 'many2one',
+        'string': 'Meter',
+        'relation': 'giscedata.lectures.comptador',
+    },
+}
+
+
+def make_readings(num_rows, start=None):
+    """
+    Build a list of synthetic hourly meter readings.
+    :param int num_rows: number of rows to build
+    :param datetime start: date of the first reading
+    :return: list of dicts
+    """
+    if start is None:
+        start = datetime(2020, 1, 1)
+    periods = ('p1', 'p2', 'p3')
+    rows = []
+    for i in range(num_rows):
+        date = start + timedelta(hours=i // 3)
+        rows.append({
+            'id': i + 1,
+            'date': date.strftime('%Y-%m-%d %H:%M:%S'),
+            'value': float((i * 37) % 101),
+            'period': periods[i % 3],
+            'meter': [i % 50 + 1, 'Meter {}'.format(i % 50 + 1)],
+        })
+    return rows
+
+
+def best_time(func, repeat=5, number=1):
+    """
+    Return the best wall time in seconds of `repeat` runs of `func`.
+    """
+    gc.collect()
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def print_table(title, headers, rows):
+    print(title)
+    print('-' * len(title))
+    widths = [
+        max(len(str(h)), *(len(str(r[i])) for r in rows))
+        for i, h in enumerate(headers)
+    ]
+    line = '  '.join('{{:>{}}}'.format(w) for w in widths)
+    print(line.format(*headers))
+    for row in rows:
+        print(line.format(*row))
+    print()
@@ -0,0 +1,32 @@
+"""
+Run every benchmark of the suite.
+
+Each `bench_*.py` module exposes a `run()` function that prints its report
+and returns False when a budget enforced by the benchmark is exceeded.
+"""
+from __future__ import absolute_import, print_function
+import glob
+import importlib
+import os
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+if BENCHMARKS_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARKS_DIR)
+
+
+def main(names=None):
+    ok = True
+    for path in sorted(glob.glob(os.path.join(BENCHMARKS_DIR, 'bench_*.py'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if names and name not in names and name[len('bench_'):] not in names:
+            continue
+        module = importlib.import_module(name)
+        if module.run() is False:
+            print('{} exceeded its budget'.format(name))
+            ok = False
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,24 @@
+from __future__ import absolute_import
+import importlib
+import sys
+
+# Imported on first use, importing ooui doesn't load the views stack
+LAZY_ATTRIBUTES = {
+    'warmup': 'ooui.prefork',
+}
+
+
+def __getattr__(name):
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name)
+        )
+    module = importlib.import_module(LAZY_ATTRIBUTES[name])
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ is not supported
+    from ooui.prefork import warmup
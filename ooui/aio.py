@@ -0,0 +1,218 @@
+"""
+Asyncio entry points, for Python 3 only.
+
+The records can be async iterators, the processing runs in an executor so the
+event loop is not blocked, and identical graphs over the same version of the
+data that are processed at the same time share a single computation.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import pickle
+
+from ooui.graph import parse_graph
+from ooui.graph.dashboard import Dashboard
+from ooui.graph.processor import process_graph_data
+from ooui.helpers.features import (
+    parse_feature_document, get_feature_keys, apply_feature_tags,
+    get_batch_checker, get_key_checker, get_active_features
+)
+from ooui.helpers.xmlparser import is_xml_string
+
+
+class Coalescer(object):
+    """
+    Share the result of the computations in flight with the same key.
+
+    The first caller of a key starts the computation and the rest of callers
+    wait for its result, until it finishes. Cancelling a waiter does not
+    cancel the computation of the rest.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def run(self, key, factory):
+        """
+        Run a computation or wait for the one in flight with the same key.
+
+        :param key: A hashable key of the computation.
+        :param func factory: A function that returns the coroutine of the
+            computation, only called if no computation of the key is in
+            flight.
+
+        :returns: The result of the computation, shared by all the callers.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(factory())
+            self._tasks[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def __contains__(self, key):
+        return key in self._tasks
+
+    def __len__(self):
+        return len(self._tasks)
+
+
+DEFAULT_COALESCER = Coalescer()
+
+
+def get_graph_digest(graph):
+    """
+    Retrieve a digest that identifies a graph.
+
+    :param graph: The graph XML or a parsed graph.
+
+    :rtype: str
+    """
+    if is_xml_string(graph):
+        data = graph if isinstance(graph, bytes) else graph.encode('utf-8')
+    else:
+        data = pickle.dumps(graph, protocol=2)
+    return hashlib.sha1(data).hexdigest()
+
+
+async def maybe_await(value):
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def collect_values(values):
+    """
+    Retrieve the list of records of an async iterator, an awaitable or an
+    iterable.
+
+    :rtype: list
+    """
+    values = await maybe_await(values)
+    if hasattr(values, '__aiter__'):
+        return [value async for value in values]
+    if isinstance(values, list):
+        return values
+    return list(values)
+
+
+async def process_graph_data_async(ooui, values, fields, options=None,
+                                   data_version=None, executor=None,
+                                   coalescer=None):
+    """
+    Process graph data in an executor.
+
+    :param ooui: The graph XML or a parsed graph.
+    :param values: The records, as an async iterator, an awaitable or an
+        iterable.
+    :param dict fields: A dictionary of field definitions.
+    :param dict options: Optional processing options.
+    :param data_version: Optional hashable version of the records. The
+        calls with the same graph, options and data version that are in
+        flight at the same time are coalesced, and only the records of the
+        first one are read.
+    :param executor: Optional `concurrent.futures.Executor`, by default the
+        one of the event loop.
+    :param Coalescer coalescer: Optional coalescer, by default the one of the
+        module.
+
+    :rtype: dict
+    :returns: The result of `process_graph_data`. Coalesced calls share the
+        same result, so it must not be modified.
+    """
+    graph = parse_graph(ooui) if is_xml_string(ooui) else ooui
+
+    async def compute():
+        records = await collect_values(values)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(
+            process_graph_data, graph, records, fields, options
+        ))
+
+    if data_version is None:
+        return await compute()
+    key = (
+        get_graph_digest(ooui), data_version,
+        repr(sorted((options or {}).items()))
+    )
+    return await (coalescer or DEFAULT_COALESCER).run(key, compute)
+
+
+async def process_dashboard_async(items, fetch, options=None, executor=None):
+    """
+    Process the graphs of a dashboard, see `ooui.graph.dashboard.Dashboard`.
+
+    Every dataset is read concurrently, and then the graphs are processed
+    concurrently in the executor.
+
+    :param list items: The graphs of the dashboard.
+    :param func fetch: A function called with the `model`, the `domain` and
+        the list of `fields` of each dataset that returns, or that is a
+        coroutine function that returns, a tuple with the records and the
+        fields definitions. The records can be an async iterator.
+    :param dict options: Processing options shared by all the graphs.
+    :param executor: Optional `concurrent.futures.Executor`.
+
+    :rtype: list
+    :returns: The result of each graph, in the order of the items.
+    """
+    dashboard = Dashboard(items)
+    keys = list(dashboard.datasets)
+
+    async def read(key):
+        dataset = dashboard.datasets[key]
+        values, fields = await maybe_await(fetch(
+            dataset['model'], dataset['domain'], dataset['fields']
+        ))
+        return await collect_values(values), fields
+
+    data = dict(zip(keys, await asyncio.gather(*[read(k) for k in keys])))
+    groupings = {}
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*[
+        loop.run_in_executor(
+            executor, dashboard.process_item, index, data, options, groupings
+        ) for index in range(len(dashboard.items))
+    ])
+    return list(results)
+
+
+async def preprocess_feature_tags_async(xml_str, feature_checker,
+                                        output='unicode'):
+    """
+    Resolve the feature tags of a view checking its features concurrently.
+
+    :param xml_str: The view as bytes or text, or a parsed element.
+    :param feature_checker: Function or coroutine function that returns if a
+        feature key is active, called once for each distinct key, or an
+        object with a `check_features(keys)` method, that can be a
+        coroutine, called once with all the distinct keys.
+    :param str output: `unicode` (default), `bytes` or `element`.
+    """
+    doc = parse_feature_document(xml_str, output)
+    keys = get_feature_keys(doc)
+    batch = get_batch_checker(feature_checker)
+    if not keys:
+        active_features = {}
+    elif batch is not None:
+        result = await maybe_await(batch(keys))
+        active_features = get_active_features(keys, result)
+        key_checker = get_key_checker(feature_checker)
+        if isinstance(result, dict) and key_checker is not None:
+            # Keys missing from the batch result are checked one by one
+            missing = [key for key in keys if key not in result]
+            active = await asyncio.gather(*[
+                maybe_await(key_checker(key)) for key in missing
+            ])
+            active_features.update(zip(missing, active))
+    else:
+        active = await asyncio.gather(*[
+            maybe_await(feature_checker(key)) for key in keys
+        ])
+        active_features = dict(zip(keys, active))
+    return apply_feature_tags(doc, active_features.__getitem__, output)
@@ -0,0 +1,118 @@
+from __future__ import absolute_import, unicode_literals
+import mmap
+import os
+import pickle
+import struct
+
+
+MAGIC = b'OOUIBND1'
+
+# Magic, offset and length of the index
+HEADER = struct.Struct('<8sQQ')
+
+
+def write_bundle(path, views, protocol=pickle.HIGHEST_PROTOCOL):
+    """
+    Write parsed views to a bundle file.
+
+    Each view is pickled on its own, so loading a view does not need to
+    unpickle the rest. The file is written next to `path` and then renamed,
+    so workers that have the previous bundle mapped are not affected.
+
+    :param str path: The path of the bundle.
+    :param views: A dictionary or an iterable of `(key, view)` pairs.
+    :param int protocol: The pickle protocol.
+
+    :rtype: int
+    :returns: The number of views written.
+
+    :raises ValueError: If a key is repeated.
+    """
+    if isinstance(views, dict):
+        views = views.items()
+
+    index = {}
+    tmp_path = '{}.tmp'.format(path)
+    with open(tmp_path, 'wb') as bundle:
+        bundle.write(HEADER.pack(MAGIC, 0, 0))
+        for key, view in views:
+            if key in index:
+                raise ValueError("Duplicated view key: {}".format(key))
+            data = pickle.dumps(view, protocol)
+            index[key] = (bundle.tell(), len(data))
+            bundle.write(data)
+
+        index_offset = bundle.tell()
+        index_data = pickle.dumps(index, protocol)
+        bundle.write(index_data)
+        bundle.seek(0)
+        bundle.write(HEADER.pack(MAGIC, index_offset, len(index_data)))
+
+    getattr(os, 'replace', os.rename)(tmp_path, path)
+    return len(index)
+
+
+class ViewBundle(object):
+    """
+    Read only access to the views of a bundle.
+
+    The bundle is memory-mapped, so every process that opens it shares the
+    same pages. Views are unpickled on first access and kept for the next
+    ones.
+    """
+
+    def __init__(self, path):
+        """
+        :param str path: The path of the bundle written by `write_bundle`.
+
+        :raises ValueError: If the file is not a bundle.
+        """
+        self.path = path
+        with open(path, 'rb') as bundle:
+            self._mmap = mmap.mmap(bundle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, offset, length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError("{} is not a view bundle".format(path))
+
+        self._index = pickle.loads(self._mmap[offset:offset + length])
+        self._views = {}
+
+    def get(self, key):
+        """
+        Retrieve a view of the bundle.
+
+        :param str key: The key of the view.
+        :returns: The parsed view.
+
+        :raises KeyError: If the bundle does not contain the view.
+        """
+        view = self._views.get(key)
+        if view is None:
+            offset, length = self._index[key]
+            view = pickle.loads(self._mmap[offset:offset + length])
+            self._views[key] = view
+        return view
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def keys(self):
+        return list(self._index)
+
+    def close(self):
+        self._views = {}
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
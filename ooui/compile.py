@@ -0,0 +1,104 @@
+"""
+Compile a directory of graph and tree views to a bundle.
+
+Usage: python -m ooui.compile SRC OUT
+
+Every `*.xml` file in SRC is parsed and stored in OUT under its path
+relative to SRC without the extension, e.g. `sales/monthly`.
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import os
+import sys
+
+from ooui.bundle import write_bundle
+
+
+def iter_view_files(src):
+    """
+    Find the view files of a directory.
+
+    :param str src: The directory with the views.
+
+    :rtype: generator
+    :returns: Tuples with the key and the path of each view, sorted by key.
+    """
+    for root, dirs, files in os.walk(src):
+        dirs.sort()
+        for filename in sorted(files):
+            if not filename.endswith('.xml'):
+                continue
+            path = os.path.join(root, filename)
+            key = os.path.splitext(os.path.relpath(path, src))[0]
+            yield key.replace(os.sep, '/'), path
+
+
+def parse_view(xml):
+    """
+    Parse a graph or a tree view.
+
+    :param bytes xml: The arch of the view.
+
+    :returns: The parsed view.
+
+    :raises ValueError: If the view is not a graph or a tree.
+    """
+    from ooui.helpers.xmlparser import parse_xml, is_xml_string
+    from ooui import graph, tree
+
+    caches = (graph.PARSE_CACHE, tree.PARSE_CACHE)
+    if is_xml_string(xml):
+        for cache in caches:
+            view = cache.get(xml)
+            if view is not None:
+                return view
+
+    # The view is parsed once, the parsers accept the element
+    element = parse_xml(xml)
+    tag = element.tag
+    if tag == 'graph':
+        view, cache = graph.parse_graph(element), caches[0]
+    elif tag == 'tree':
+        view, cache = tree.parse_tree(element), caches[1]
+    else:
+        raise ValueError("Unsupported view: {}".format(tag))
+    if is_xml_string(xml):
+        # Shared with the views parsed with parse_graph and parse_tree
+        cache.set(xml, view)
+    return view
+
+
+def compile_views(src):
+    """
+    Parse every view of a directory.
+
+    :param str src: The directory with the views.
+
+    :rtype: generator
+    :returns: Tuples with the key and the parsed view.
+    """
+    for key, path in iter_view_files(src):
+        with open(path, 'rb') as view_file:
+            xml = view_file.read()
+        try:
+            yield key, parse_view(xml)
+        except ValueError as error:
+            raise ValueError("{}: {}".format(path, error))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ooui.compile',
+        description='Compile a directory of graph and tree views to a bundle.'
+    )
+    parser.add_argument('src', help='directory with the XML views')
+    parser.add_argument('out', help='path of the bundle to write')
+    args = parser.parse_args(argv)
+
+    count = write_bundle(args.out, compile_views(args.src))
+    print('Compiled {} views to {}'.format(count, args.out))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,31 +1,101 @@
 from __future__ import absolute_import, unicode_literals
-from lxml import etree
-from ooui.graph.indicator import GraphIndicator, GraphIndicatorField
-from ooui.graph.chart import GraphChart
+import importlib
+import sys
 
+from ooui.metrics import timed
+from ooui.helpers.cache import LRUCache
+from ooui.helpers.xmlparser import parse_xml, is_xml_string
 
-GRAPH_TYPES = {
-    'indicator': GraphIndicator,
-    'indicatorField': GraphIndicatorField,
-    'line': GraphChart,
-    'pie': GraphChart,
-    'bar': GraphChart,
+
+# Graph classes are imported on first use, so importing ooui.graph does not
+# load lxml and the chart processing stack until a graph is parsed.
+LAZY_ATTRIBUTES = {
+    'GraphIndicator': 'ooui.graph.indicator',
+    'GraphIndicatorField': 'ooui.graph.indicator',
+    'GraphChart': 'ooui.graph.chart',
+    'iter_json': 'ooui.graph.serializer',
+    'dump_json': 'ooui.graph.serializer',
+    'FieldsMetadata': 'ooui.graph.metadata',
+    'get_fields_metadata': 'ooui.graph.metadata',
+}
+
+# Name of the graph class of each graph type. `GRAPH_TYPES`, with the classes,
+# is built on first use.
+_GRAPH_CLASS_NAMES = {
+    'indicator': 'GraphIndicator',
+    'indicatorField': 'GraphIndicatorField',
+    'line': 'GraphChart',
+    'pie': 'GraphChart',
+    'bar': 'GraphChart',
 }
 
+# Parsed graphs by their XML. Graphs are not modified once parsed, so the
+# same object is returned for the same XML.
+PARSE_CACHE = LRUCache(maxsize=1024)
+
+
+def _get_graph_class(graph_type):
+    return getattr(sys.modules[__name__], _GRAPH_CLASS_NAMES[graph_type])
+
 
+def __getattr__(name):
+    if name == 'GRAPH_TYPES':
+        value = dict(
+            (graph_type, _get_graph_class(graph_type))
+            for graph_type in _GRAPH_CLASS_NAMES
+        )
+        globals()[name] = value
+        return value
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name)
+        )
+    module = importlib.import_module(LAZY_ATTRIBUTES[name])
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ is not supported
+    from ooui.graph.indicator import GraphIndicator, GraphIndicatorField
+    from ooui.graph.chart import GraphChart
+    from ooui.graph.serializer import iter_json, dump_json
+    from ooui.graph.metadata import FieldsMetadata, get_fields_metadata
+    GRAPH_TYPES = {
+        'indicator': GraphIndicator,
+        'indicatorField': GraphIndicatorField,
+        'line': GraphChart,
+        'pie': GraphChart,
+        'bar': GraphChart,
+    }
+
+
+@timed('ooui_parse_graph')
 def parse_graph(xml):
     """
     Parse a graph from an XML string.
-    :param xml:
+    :param xml: The XML as bytes or text, or a parsed element
     :return:
     :rtype ooui.graph.Graph
     """
-    tree = etree.fromstring(xml)
+    if not is_xml_string(xml):
+        return _parse_graph(xml)
+    graph = PARSE_CACHE.get(xml)
+    if graph is None:
+        graph = _parse_graph(xml)
+        PARSE_CACHE.set(xml, graph)
+    return graph
+
+
+def _parse_graph(xml):
+    tree = parse_xml(xml)
     graph = tree.xpath('//graph')[0]
 
     graph_type = graph.get("type")
 
-    if not graph_type or graph_type not in GRAPH_TYPES:
+    if not graph_type or graph_type not in _GRAPH_CLASS_NAMES:
         raise ValueError("{} is not a valid graph".format(graph_type))
 
-    return GRAPH_TYPES[graph_type](graph_type, graph)
+    graph_class = _get_graph_class(graph_type)
+    return graph_class(graph_type, graph)
@@ -1,12 +1,20 @@
+from ooui.helpers import intern_string
+
+
 class GraphAxis(object):
+    """
+    Immutable and hashable description of a graph axis.
+    """
+    __slots__ = ('_name', '_axis')
+
     AXIS_OPTIONS = ('x', 'y')
 
     def __init__(self, name, axis):
         if axis not in self.AXIS_OPTIONS:
             raise ValueError("Invalid axis value. Must be 'x' or 'y'.")
 
-        self._name = name
-        self._axis = axis
+        object.__setattr__(self, '_name', intern_string(name))
+        object.__setattr__(self, '_axis', intern_string(axis))
 
     @property
     def name(self):
@@ -16,15 +24,56 @@ class GraphAxis(object):
     def axis(self):
         return self._axis
 
+    def _key(self):
+        return (self._name, self._axis)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash((type(self).__name__,) + self._key())
+
+    def __reduce__(self):
+        return type(self), self._key()
+
+    def __repr__(self):
+        return '{}({})'.format(
+            type(self).__name__, ', '.join(repr(v) for v in self._key())
+        )
+
 
 class GraphXAxis(GraphAxis):
+    __slots__ = ()
+
     def __init__(self, name):
         # Crida el constructor de GraphAxis amb l'eix 'x' fixat
         super(GraphXAxis, self).__init__(name, 'x')
 
+    def _key(self):
+        return (self._name,)
+
 
 class GraphYAxis(GraphAxis):
-    OPERATOR_OPTIONS = ('count', '+', '-', '*', 'min', 'max', 'avg')
+    __slots__ = ('_operator', '_label', '_stacked')
+
+    OPERATOR_OPTIONS = (
+        'count', '+', '-', '*', 'min', 'max', 'avg', 'count_distinct',
+        'median', 'p95'
+    )
 
     def __init__(self, name, operator, label=None, stacked=None):
         super(GraphYAxis, self).__init__(name, 'y')
@@ -32,9 +81,9 @@ class GraphYAxis(GraphAxis):
         if operator not in self.OPERATOR_OPTIONS:
             raise ValueError("Invalid operator value.")
 
-        self._operator = operator
-        self._label = label
-        self._stacked = stacked
+        object.__setattr__(self, '_operator', intern_string(operator))
+        object.__setattr__(self, '_label', intern_string(label))
+        object.__setattr__(self, '_stacked', intern_string(stacked))
 
     @property
     def operator(self):
@@ -48,6 +97,9 @@ class GraphYAxis(GraphAxis):
     def stacked(self):
         return self._stacked
 
+    def _key(self):
+        return (self._name, self._operator, self._label, self._stacked)
+
 
 def parse_xy_axis(nodes):
     x_axis = None
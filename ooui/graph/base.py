@@ -1,14 +1,19 @@
 
 
+from ooui.helpers import intern_string
+
+
 class Graph(object):
+    __slots__ = ('_string', '_timerange', '_y_range', '_interval', '_type')
+
     def __init__(self, element):
         """
 
         :param element: lxml.etree._Element
         """
-        self._string = element.get('string')
-        self._timerange = element.get('timerange', None)
-        self._y_range = element.get('y_range', "default")
+        self._string = intern_string(element.get('string'))
+        self._timerange = intern_string(element.get('timerange', None))
+        self._y_range = intern_string(element.get('y_range', "default"))
 
         interval = element.get('interval', None)
         self._interval = int(interval) if interval is not None else 1
@@ -41,3 +46,14 @@ class Graph(object):
 
     def process(self, values, fields, options=None):
         raise NotImplementedError
+
+    def __getstate__(self):
+        return dict(
+            (name, getattr(self, name))
+            for cls in type(self).__mro__
+            for name in getattr(cls, '__slots__', ())
+        )
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, intern_string(value))
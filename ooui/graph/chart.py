@@ -1,19 +1,40 @@
 from __future__ import absolute_import, unicode_literals
 from ooui.graph.base import Graph
 from ooui.graph.axis import parse_xy_axis
-from ooui.graph.fields import get_value_for_operator
+from ooui.graph.fields import get_value_for_operator, get_state_for_operator
+from ooui.graph.sketches import SKETCH_OPERATORS
 from ooui.graph.axis import get_y_axis_fieldname
-from ooui.graph.timerange import process_timerange_data
+from ooui.graph.timerange import (
+    process_timerange_data, convert_date_to_time_range_adjusted
+)
+from ooui.graph.downsample import downsample_data
+from ooui.graph.columnar import ColumnarData, get_columnar_values
+from ooui.graph.stats import get_stage_recorder, run_stage
+from ooui.graph.sampling import (
+    get_approximate_options, sample_values_grouped_by_field,
+    estimate_for_operator
+)
+from ooui.graph.ordering import get_sort_key, get_ordinals, sort_keyed_values
+from ooui.metrics import timed
+from ooui.helpers import intern_string
 from ooui.graph.processor import (
-    get_values_grouped_by_field, get_values_for_y_field, get_min_max
+    get_values_grouped_by_field, get_values_for_y_field,
+    iter_values_for_y_field, get_min_max,
+    get_min_max_for_values
 )
 
 
+def sort_by_value(data):
+    return sorted(data, key=lambda x: x['value'], reverse=True)
+
+
 class GraphChart(Graph):
+    __slots__ = ('_x', '_y')
+
     def __init__(self, graph_type, element):
         super(GraphChart, self).__init__(element)
 
-        self._type = graph_type
+        self._type = intern_string(graph_type)
         xy_axis = parse_xy_axis(element)
         self._x = xy_axis['x']
         self._y = xy_axis['y']
@@ -43,7 +64,8 @@ class GraphChart(Graph):
 
         return fields
 
-    def process(self, values, fields, options=None):
+    @timed('ooui_graph_process')
+    def process(self, values, fields, options=None, grouped_values=None):
         """
         Process graph data by grouping and sorting the values according to the
         specified X and Y axes.
@@ -52,6 +74,18 @@ class GraphChart(Graph):
         :param list values: A list of dictionaries representing the original data.
         :param dict fields: A dictionary of field definitions.
         :param dict options: Optional additional options for processing graph data.
+            `max_points` limits the number of points of each series and
+            `format` set to `columnar` returns the data as columns.
+            `stats` adds the stats of each processing stage to the result
+            under the `_stats` key and `on_stage` is a function called with
+            the stats of each stage when it finishes.
+            `approximate` (`True` or a dictionary with `sample_size`,
+            `confidence` and `seed`) consumes `values` as a stream keeping a
+            random sample of each x group, estimates the counts, sums and
+            averages from it and adds a `confidenceInterval` to each value.
+        :param dict grouped_values: Optional result of
+            `get_values_grouped_by_field` for the x axis and `values`, to
+            share the grouping between charts with the same x axis.
 
         :rtype: dict
         :returns: A dictionary containing the final processed data and flags like
@@ -59,34 +93,218 @@ class GraphChart(Graph):
         """
         if options is None:
             options = {}
+        recorder = get_stage_recorder(options)
+        approximate = get_approximate_options(options)
+
+        if approximate:
+            if options.get('format') == 'columnar':
+                raise ValueError(
+                    "The approximate mode does not support the columnar format"
+                )
+            if grouped_values is not None:
+                raise ValueError(
+                    "The approximate mode does not support grouped values"
+                )
+            values_grouped_by_x = run_stage(
+                recorder, 'sample', self._sample_values, values, fields,
+                approximate
+            )
+            num_items = sum(
+                group['population'] for group in values_grouped_by_x.values()
+            )
+        elif grouped_values is not None:
+            values_grouped_by_x = grouped_values
+            num_items = len(values)
+        else:
+            values_grouped_by_x = run_stage(
+                recorder, 'group',
+                lambda v: get_values_grouped_by_field(self.x.name, fields, v),
+                values
+            )
+            num_items = len(values)
+        aggregated_values = self._aggregate(
+            values_grouped_by_x, fields, approximate
+        )
+
+        # Check if data should be flagged as grouped or stacked
+        is_group = any(y.label is not None for y in self.y)
+        is_stack = any(y.stacked is not None for y in self.y)
+
+        if options.get('format') == 'columnar':
+            return self._process_columnar(
+                aggregated_values, values, options, is_group, is_stack,
+                recorder
+            )
+
+        keyed_values = run_stage(
+            recorder, 'aggregate', self._get_keyed_values,
+            aggregated_values, options, approximate
+        )
+        series_ordinals = get_ordinals(k[1] for k in keyed_values)
+
+        # Sort the data by the x-axis and the series in a single pass
+        final_data = run_stage(
+            recorder, 'sort', sort_keyed_values, keyed_values, series_ordinals
+        )
+
+        # Fill gaps if a timerange is defined
+        if self.timerange:
+            final_data = run_stage(
+                recorder, 'timerange', process_timerange_data,
+                final_data, self.timerange, self.interval, recorder,
+                lambda v: (get_sort_key(v['x']), series_ordinals[v['type']])
+            )
+
+        # Reduce dense series to the requested number of points
+        max_points = options.get('max_points')
+        if max_points and self.type != 'pie':
+            final_data = run_stage(
+                recorder, 'downsample', downsample_data, final_data, max_points
+            )
+
+        if self.type == 'pie':
+            final_data = run_stage(
+                recorder, 'final_sort', sort_by_value, final_data
+            )
+
+        result = {
+            'data': final_data,
+            'isGroup': is_stack or is_group,
+            'isStack': is_stack,
+            'type': self.type,
+            'num_items': num_items,
+        }
+        if approximate:
+            result['approximate'] = True
+
+        if self.type == "line" and self.y_range:
+            y_axis_props = {'mode': self.y_range}
+            if self.y_range == "auto":
+                y_axis_props['valueOpts'] = run_stage(
+                    recorder, 'min_max', get_min_max, final_data
+                )
+            result['yAxisProps'] = y_axis_props
+
+        if recorder is not None and options.get('stats'):
+            result['_stats'] = recorder.stages
+
+        return result
 
-        values_grouped_by_x = get_values_grouped_by_field(
-            self.x.name, fields, values
+    def _sample_values(self, values, fields, approximate):
+        """
+        Group a stream of values by the x axis keeping a random sample of
+        each group.
+
+        With a timerange the groups are the time units, so every point of the
+        chart is estimated from its own sample.
+        """
+        adjust_key = None
+        if self.timerange:
+            adjust_key = lambda x: convert_date_to_time_range_adjusted(
+                x, self.timerange
+            )
+        return sample_values_grouped_by_field(
+            self.x.name, fields, values, approximate['sample_size'],
+            approximate['random'], adjust_key
         )
 
-        data = []
+    def _iter_final_values(self, aggregated_values, options):
+        """
+        Adjust the aggregated values to the labels shown in the chart.
+
+        Values without x label are discarded, or labeled with the uninformed
+        string in pie charts, and the series of stacked y axes get the stack
+        name when there is more than one stack.
+        """
+        rename_stacked = len([y for y in self.y if y.stacked is not None]) > 1
+        uninformed_string = options.get('uninformedString', 'Not informed')
+
+        for x_ordinal, x_label, final_value, type_label, y_field in aggregated_values:
+            if x_label is False:
+                if self.type != 'pie':
+                    continue
+                x_label = uninformed_string
+            if rename_stacked:
+                type_label = "{} - {}".format(type_label, y_field.stacked)
+            yield x_ordinal, x_label, final_value, type_label, y_field
 
-        # Iterate through the y-axis items
+    def _get_keyed_values(self, aggregated_values, options, approximate=None):
+        if approximate:
+            return [
+                (x_ordinal, type_label, {
+                    'x': x_label,
+                    'value': final_value[0],
+                    'confidenceInterval': final_value[1],
+                    'type': type_label,
+                    'operator': y_field.operator,
+                    'stacked': y_field.stacked
+                }) for x_ordinal, x_label, final_value, type_label, y_field in
+                self._iter_final_values(aggregated_values, options)
+            ]
+        return [
+            (x_ordinal, type_label, {
+                'x': x_label,
+                'value': final_value,
+                'type': type_label,
+                'operator': y_field.operator,
+                'stacked': y_field.stacked
+            }) for x_ordinal, x_label, final_value, type_label, y_field in
+            self._iter_final_values(aggregated_values, options)
+        ]
+
+    def _aggregate(self, values_grouped_by_x, fields, approximate=None):
+        """
+        Aggregate the values of every y axis for each group of the x axis.
+
+        :param dict values_grouped_by_x: The values grouped by the x field.
+        :param dict fields: A dictionary of field definitions.
+
+        :rtype: generator
+        :returns: Tuples with the ordinal of the x label, the x label, the
+            aggregated value, the series label and the y axis of the value.
+            The groups of each y axis are yielded sorted by their x label.
+            With a timerange the values are the operator states, so they can
+            be combined for each time unit. In approximate mode the values
+            are tuples with the estimate and its confidence interval.
+        """
+        if self.timerange:
+            aggregate = get_state_for_operator
+        else:
+            aggregate = get_value_for_operator
+        if approximate:
+            get_value = lambda operator, values, group: estimate_for_operator(
+                operator, values, len(group['entries']), group['population'],
+                approximate['z'], aggregate
+            )
+        else:
+            get_value = lambda operator, values, group: aggregate(
+                operator, values
+            )
+        sorted_groups = sorted(
+            values_grouped_by_x.values(),
+            key=lambda group: get_sort_key(group['label'] or False)
+        )
         for y_field in self.y:
-            for x_value, group in values_grouped_by_x.items():
-                x_label = group['label']
+            # The sketches take the values as they are read
+            if y_field.operator in SKETCH_OPERATORS:
+                get_y_values = iter_values_for_y_field
+            else:
+                get_y_values = get_values_for_y_field
+            for x_ordinal, group in enumerate(sorted_groups):
+                x_label = group['label'] or False
                 objects_for_x_value = group['entries']
 
                 if not y_field.label:
-                    values_for_y_field = get_values_for_y_field(
+                    values_for_y_field = get_y_values(
                         objects_for_x_value, y_field.name, fields
                     )
-                    final_value = get_value_for_operator(
-                        y_field.operator, values_for_y_field
+                    final_value = get_value(
+                        y_field.operator, values_for_y_field, group
+                    )
+                    yield (
+                        x_ordinal, x_label, final_value,
+                        get_y_axis_fieldname(y_field, fields), y_field
                     )
-
-                    data.append({
-                        'x': x_label or False,
-                        'value': final_value,
-                        'type': get_y_axis_fieldname(y_field, fields),
-                        'operator': y_field.operator,
-                        'stacked': y_field.stacked
-                    })
                 else:
                     values_grouped_by_y_label = get_values_grouped_by_field(
                         y_field.label, fields, objects_for_x_value
@@ -96,70 +314,45 @@ class GraphChart(Graph):
                         entries = grouped_entries['entries']
                         label = grouped_entries['label']
 
-                        values_for_y_field = get_values_for_y_field(
+                        values_for_y_field = get_y_values(
                             entries, y_field.name, fields
                         )
-                        final_value = get_value_for_operator(
-                            y_field.operator, values_for_y_field
+                        final_value = get_value(
+                            y_field.operator, values_for_y_field, group
                         )
+                        yield x_ordinal, x_label, final_value, label, y_field
 
-                        data.append({
-                            'x': x_label or False,
-                            'value': final_value,
-                            'type': label,
-                            'operator': y_field.operator,
-                            'stacked': y_field.stacked
-                        })
-
-        # Check if data should be flagged as grouped or stacked
-        is_group = any(y.label is not None for y in self.y)
-        is_stack = any(y.stacked is not None for y in self.y)
-
-        # Sort the data by the x-axis
-        sorted_data = sorted(data, key=lambda x: x['x'] or "")
+    def _process_columnar(self, aggregated_values, values, options,
+                          is_group, is_stack, recorder=None):
+        """
+        Build the columnar result of the graph directly from the aggregated
+        values.
 
-        adjusted_stacked_data = sorted_data[:]
-        if is_stack and len([y for y in self.y if y.stacked is not None]) > 1:
-            adjusted_stacked_data = [
-                dict(
-                    entry,
-                    type="{} - {}".format(entry['type'], entry['stacked'])
-                ) for entry in sorted_data
-            ]
+        :rtype: dict
+        :returns: A dictionary like the one returned by `process` where `data`
+            contains a shared `x` list and the values of each series.
+        """
+        columns = ColumnarData(self.timerange, self.interval)
+        # Each y axis is its own series, as in the records format
+        axis_indexes = dict((id(y), index) for index, y in enumerate(self.y))
 
-        adjusted_uninformed_data = adjusted_stacked_data[:]
-        if self.type == 'pie' and any(
-                entry['x'] is False for entry in adjusted_stacked_data):
-            adjusted_uninformed_data = [
-                dict(
-                    entry,
-                    x=options.get('uninformedString', 'Not informed') if entry['x'] is False else
-                    entry['x']
-                ) for entry in adjusted_stacked_data
-            ]
-        else:
-            adjusted_uninformed_data = [
-                entry for entry in adjusted_stacked_data if
-                entry['x'] is not False
-            ]
+        def add_values():
+            for x_ordinal, x_label, final_value, type_label, y_field in \
+                    self._iter_final_values(aggregated_values, options):
+                columns.add(
+                    x_label, final_value, type_label, y_field.operator,
+                    y_field.stacked, axis_indexes[id(y_field)]
+                )
 
-        # Fill gaps if a timerange is defined
-        final_data = adjusted_uninformed_data
-        if self.timerange:
-            final_data = process_timerange_data(
-                final_data, self.timerange, self.interval
-            )
-        if self.type == 'pie':
-            final_data = sorted(
-                final_data, key=lambda x: x['value'], reverse=True
-            )
-        else:
-            final_data = sorted(
-                final_data, key=lambda x: '{x}-{type}'.format(**x)
-            )
+        run_stage(recorder, 'aggregate', add_values)
+        final_data = run_stage(
+            recorder, 'build', columns.build,
+            self.type == 'pie', options.get('max_points')
+        )
 
         result = {
             'data': final_data,
+            'format': 'columnar',
             'isGroup': is_stack or is_group,
             'isStack': is_stack,
             'type': self.type,
@@ -169,7 +362,13 @@ class GraphChart(Graph):
         if self.type == "line" and self.y_range:
             y_axis_props = {'mode': self.y_range}
             if self.y_range == "auto":
-                y_axis_props['valueOpts'] = get_min_max(final_data)
+                y_axis_props['valueOpts'] = run_stage(
+                    recorder, 'min_max', get_min_max_for_values,
+                    get_columnar_values(final_data)
+                )
             result['yAxisProps'] = y_axis_props
 
+        if recorder is not None and options.get('stats'):
+            result['_stats'] = recorder.stages
+
         return result
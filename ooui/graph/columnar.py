@@ -0,0 +1,171 @@
+from __future__ import absolute_import, unicode_literals
+from ooui.graph.fields import get_value_for_operator
+from ooui.graph.timerange import (
+    convert_date_to_time_range_adjusted, get_missing_consecutive_dates
+)
+from ooui.graph.downsample import get_lttb_indexes
+from ooui.graph.ordering import get_sort_key
+
+
+class ColumnarData(object):
+    """
+    Build the columnar representation of a chart.
+
+    Aggregated values are added one by one as they are produced, so the
+    records representation is never built. The result has one shared `x`
+    list and, for each series, its metadata and a list of values aligned
+    with `x`. Positions without a value for a series are `None`.
+    """
+
+    def __init__(self, timerange=None, interval=1):
+        """
+        :param str timerange: The time range unit used to combine the x values.
+        :param int interval: The interval used to fill the gaps of timerange.
+        """
+        self.timerange = timerange
+        self.interval = interval
+        self._series = []
+        self._series_index = {}
+        self._columns = []
+        self._adjusted_x = {}
+
+    def add(self, x, value, series_type, operator, stacked, axis=None):
+        """
+        Add an aggregated value to a series.
+
+        :param x: The x label of the value.
+        :param value: The aggregated value.
+        :param str series_type: The name of the series.
+        :param str operator: The operator used to aggregate the value.
+        :param str stacked: The stack of the series.
+        :param axis: Optional key of the y axis of the value, so the axes
+            with the same series name, like the same field with two
+            operators, are kept in their own series.
+        """
+        series_key = (series_type, stacked, operator, axis)
+        index = self._series_index.get(series_key)
+        if index is None:
+            index = len(self._series)
+            self._series_index[series_key] = index
+            self._series.append({
+                'type': series_type,
+                'operator': operator,
+                'stacked': stacked,
+            })
+            self._columns.append({})
+
+        column = self._columns[index]
+        if self.timerange:
+            # The series of a chart share their x values
+            adjusted = self._adjusted_x.get(x)
+            if adjusted is None:
+                adjusted = self._adjusted_x[x] = \
+                    convert_date_to_time_range_adjusted(x, self.timerange)
+            column.setdefault(adjusted, []).append(value)
+        else:
+            column[x] = value
+
+    def _combine_timerange_values(self):
+        for series, column in zip(self._series, self._columns):
+            operator = series['operator']
+            if operator == 'count':
+                operator = '+'
+            for x, values in column.items():
+                column[x] = get_value_for_operator(operator, values)
+
+    def _fill_timerange_gaps(self):
+        # Each series is filled between its own dates, as the records format
+        # does, so the filled dates don't depend on the other series
+        for column in self._columns:
+            for x in get_missing_consecutive_dates(
+                sorted(column), self.timerange, self.interval
+            ):
+                column.setdefault(x, 0)
+
+    def _get_x_values(self):
+        x_values = set()
+        for column in self._columns:
+            x_values.update(column)
+        return sorted(x_values, key=get_sort_key)
+
+    def build(self, sort_by_value=False, max_points=None):
+        """
+        Build the columnar data.
+
+        :param bool sort_by_value: Sort the x values by the total of all the
+            series in descending order (used by pie charts).
+        :param int max_points: The maximum number of points of each series.
+            Each series is downsampled on its own values, and the positions
+            it doesn't keep are `None`.
+
+        :rtype: dict
+        :returns: A dictionary with the `x` list and the `series` list.
+        """
+        if self.timerange:
+            self._combine_timerange_values()
+            self._fill_timerange_gaps()
+
+        x_values = self._get_x_values()
+
+        series_list = []
+        for series, column in zip(self._series, self._columns):
+            values = [column.get(x) for x in x_values]
+            series_list.append(dict(series, values=values))
+
+        if sort_by_value:
+            order = sorted(
+                range(len(x_values)),
+                key=lambda i: sum(s['values'][i] or 0 for s in series_list),
+                reverse=True
+            )
+            x_values, series_list = _take(order, x_values, series_list)
+
+        if max_points and not sort_by_value:
+            x_values, series_list = _downsample(
+                max_points, x_values, series_list
+            )
+
+        return {'x': x_values, 'series': series_list}
+
+
+def get_columnar_values(data):
+    """
+    Retrieve all the informed values of a columnar data.
+
+    :param dict data: The columnar data built by `ColumnarData`.
+
+    :rtype: list
+    :returns: A list with all the values that are not `None`.
+    """
+    return [
+        value for series in data['series'] for value in series['values']
+        if value is not None
+    ]
+
+
+def _take(indexes, x_values, series_list):
+    x_values = [x_values[i] for i in indexes]
+    for series in series_list:
+        values = series['values']
+        series['values'] = [values[i] for i in indexes]
+    return x_values, series_list
+
+
+def _downsample(max_points, x_values, series_list):
+    kept_by_series = []
+    for series in series_list:
+        values = series['values']
+        informed = [i for i, value in enumerate(values) if value is not None]
+        kept_by_series.append(set(
+            informed[position] for position in get_lttb_indexes(
+                informed, max_points, key=lambda i: values[i]
+            )
+        ))
+    indexes = sorted(set().union(*kept_by_series))
+    x_values = [x_values[i] for i in indexes]
+    for kept, series in zip(kept_by_series, series_list):
+        values = series['values']
+        series['values'] = [
+            values[i] if i in kept else None for i in indexes
+        ]
+    return x_values, series_list
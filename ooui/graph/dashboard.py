@@ -0,0 +1,165 @@
+from __future__ import absolute_import, unicode_literals
+
+from ooui.graph import parse_graph
+from ooui.graph.fields import get_processed_fields
+from ooui.graph.metadata import get_fields_metadata
+from ooui.graph.processor import get_values_grouped_by_field
+from ooui.graph.sampling import get_approximate_options
+
+
+def get_dataset_key(model, domain):
+    """
+    Retrieve the key of the records of a model that match a domain.
+
+    :param str model: The name of the model.
+    :param list domain: The parsed domain.
+
+    :rtype: tuple
+    """
+    return model, repr(list(domain or []))
+
+
+class Dashboard(object):
+    """
+    Process the graphs of a dashboard sharing their reads and groupings.
+
+    The fields of the graphs over the same records are read at once, and the
+    values of the charts with the same x axis are grouped once.
+    """
+    __slots__ = ('items', 'datasets', '_dataset_keys')
+
+    def __init__(self, items):
+        """
+        :param list items: The graphs of the dashboard, as dictionaries with:
+            - `graph`: The graph XML or a parsed graph.
+            - `model`: The name of the model of the graph.
+            - `domain`: Optional parsed domain of the records.
+            - `context`: Optional values to parse the `totalDomain` of the
+              indicators.
+            - `options`: Optional processing options of the graph.
+        """
+        self.items = []
+        self.datasets = {}
+        self._dataset_keys = []
+
+        for item in items:
+            graph = item['graph']
+            if not hasattr(graph, 'process'):
+                graph = parse_graph(graph)
+            item = dict(item, graph=graph)
+            self.items.append(item)
+
+            fields = get_processed_fields(graph)
+            keys = [self._add_dataset(item['model'], item.get('domain'), fields)]
+            if graph.type in ('indicator', 'indicatorField') and graph.total_domain:
+                total_domain = graph.total_domain.parse(
+                    dict(item.get('context') or {})
+                )
+                keys.append(self._add_dataset(item['model'], total_domain, fields))
+            self._dataset_keys.append(keys)
+
+    def _add_dataset(self, model, domain, fields):
+        key = get_dataset_key(model, domain)
+        dataset = self.datasets.setdefault(key, {
+            'model': model,
+            'domain': list(domain or []),
+            'fields': [],
+        })
+        for field in fields:
+            if field not in dataset['fields']:
+                dataset['fields'].append(field)
+        return key
+
+    def process(self, fetch, options=None):
+        """
+        Read every dataset once and process all the graphs.
+
+        :param func fetch: A function called with the `model`, the `domain`
+            and the list of `fields` of each dataset that returns a tuple with
+            the list of records and the fields definitions.
+        :param dict options: Processing options shared by all the graphs,
+            updated with the `options` of each graph.
+
+        :rtype: list
+        :returns: The result of each graph, in the order of the items.
+        """
+        data = {}
+        for key, dataset in self.datasets.items():
+            data[key] = fetch(
+                dataset['model'], dataset['domain'], dataset['fields']
+            )
+        return self.process_data(data, options)
+
+    def process_data(self, data, options=None):
+        """
+        Process all the graphs with the records of every dataset.
+
+        :param dict data: The records and the fields definitions of each key
+            of `datasets`.
+        :param dict options: Processing options shared by all the graphs.
+
+        :rtype: list
+        :returns: The result of each graph, in the order of the items.
+        """
+        groupings = {}
+        return [
+            self.process_item(index, data, options, groupings)
+            for index in range(len(self.items))
+        ]
+
+    def process_item(self, index, data, options=None, groupings=None):
+        """
+        Process one of the graphs.
+
+        :param int index: The position of the graph in the items.
+        :param dict data: The records and the fields definitions of each key
+            of `datasets`.
+        :param dict options: Processing options shared by all the graphs.
+        :param dict groupings: Optional groupings of the charts by their
+            dataset and x axis, shared between the calls.
+
+        :rtype: dict
+        """
+        item = self.items[index]
+        keys = self._dataset_keys[index]
+        graph = item['graph']
+        graph_options = dict(options or {}, **(item.get('options') or {}))
+        values, fields = data[keys[0]]
+
+        if graph.type == 'indicator':
+            total = len(data[keys[1]][0]) if len(keys) > 1 else 0
+            return graph.process(len(values), total)
+        fields = get_fields_metadata(graph, fields)
+        if graph.type == 'indicatorField':
+            total_values = data[keys[1]][0] if len(keys) > 1 else None
+            return graph.process(
+                values, fields, total_values, options=graph_options
+            )
+        elif groupings is None or get_approximate_options(graph_options):
+            return graph.process(values, fields, graph_options)
+
+        grouping_key = (keys[0], graph.x.name)
+        grouped_values = groupings.get(grouping_key)
+        if grouped_values is None:
+            grouped_values = groupings.setdefault(
+                grouping_key,
+                get_values_grouped_by_field(graph.x.name, fields, values)
+            )
+        return graph.process(
+            values, fields, graph_options, grouped_values=grouped_values
+        )
+
+
+def process_dashboard(items, fetch, options=None):
+    """
+    Process the graphs of a dashboard sharing their reads and groupings.
+
+    :param list items: The graphs of the dashboard, see `Dashboard`.
+    :param func fetch: The function to read the records, see
+        `Dashboard.process`.
+    :param dict options: Processing options shared by all the graphs.
+
+    :rtype: list
+    :returns: The result of each graph, in the order of the items.
+    """
+    return Dashboard(items).process(fetch, options)
@@ -0,0 +1,119 @@
+from __future__ import absolute_import, division
+
+
+def get_lttb_indexes(series, max_points, key=None):
+    """
+    Select the points of a series to keep using the Largest-Triangle-Three-
+    Buckets algorithm.
+
+    The series is only accessed by index, so no copy of it is made. The
+    position of each point in the series is used as its x coordinate, which
+    matches the evenly spaced x values produced by the timerange gap fill.
+
+    :param list series: A list of points sorted by their x value.
+    :param int max_points: The maximum number of points to keep.
+    :param func key: Optional function to get the numeric value of a point.
+
+    :rtype: generator
+    :returns: The indexes of the points to keep, in ascending order.
+    """
+    if key is None:
+        key = _identity
+
+    length = len(series)
+    if max_points < 1:
+        raise ValueError("max_points must be a positive number")
+
+    if length <= max_points:
+        for index in range(length):
+            yield index
+        return
+
+    if max_points < 3:
+        yield 0
+        if max_points == 2:
+            yield length - 1
+        return
+
+    every = (length - 2) / (max_points - 2)
+    point_a = 0
+    yield point_a
+
+    for i in range(max_points - 2):
+        # Average point of the next bucket, used as the third triangle vertex
+        avg_start = int(i * every + every) + 1
+        avg_end = min(int(i * every + 2 * every) + 1, length)
+        avg_x = (avg_start + avg_end - 1) / 2
+        avg_y = sum(
+            key(series[j]) for j in range(avg_start, avg_end)
+        ) / (avg_end - avg_start)
+
+        range_start = int(i * every) + 1
+        range_end = int(i * every + every) + 1
+        point_a_y = key(series[point_a])
+
+        max_area = -1
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = abs(
+                (point_a - avg_x) * (key(series[j]) - point_a_y) -
+                (point_a - j) * (avg_y - point_a_y)
+            )
+            if area > max_area:
+                max_area = area
+                next_a = j
+
+        yield next_a
+        point_a = next_a
+
+    yield length - 1
+
+
+def iter_downsampled_data(values, max_points):
+    """
+    Downsample every series in a list of chart values.
+
+    Series are identified by their `type` and `stacked` keys and each one is
+    expected to be sorted by `x`, as it is after the aggregation and the
+    timerange gap fill.
+
+    :param list values: A list of dictionaries with the chart values.
+    :param int max_points: The maximum number of points to keep per series.
+
+    :rtype: generator
+    :returns: The kept values, in the same order they have in `values`.
+    """
+    series_indexes = {}
+
+    for index, value in enumerate(values):
+        series_key = (value.get('type'), value.get('stacked'))
+        series_indexes.setdefault(series_key, []).append(index)
+
+    kept = set()
+    for indexes in series_indexes.values():
+        kept.update(
+            indexes[position] for position in get_lttb_indexes(
+                indexes, max_points, key=lambda i: values[i]['value']
+            )
+        )
+
+    for index, value in enumerate(values):
+        if index in kept:
+            yield value
+
+
+def downsample_data(values, max_points):
+    """
+    Reduce the number of points of each series to at most `max_points`.
+
+    :param list values: A list of dictionaries with the chart values.
+    :param int max_points: The maximum number of points to keep per series.
+
+    :rtype: list
+    :returns: A list with the kept values.
+    """
+    return list(iter_downsampled_data(values, max_points))
+
+
+def _identity(value):
+    return value
@@ -1,5 +1,11 @@
 from functools import reduce
 
+from ooui.graph.sketches import (
+    SKETCH_OPERATORS, get_sketch_for_operator, is_sketch
+)
+
+_MISSING = object()
+
 
 def get_fields_to_retrieve(ooui):
     """
@@ -12,6 +18,26 @@ def get_fields_to_retrieve(ooui):
     return ooui.fields
 
 
+def get_processed_fields(ooui):
+    """
+    Returns the fields whose definitions are read to process a graph. These
+    are the fields to retrieve and the fields of the `count` y axes, whose
+    values are not read but whose definitions name their series.
+    :param ooui: Graph instance
+    :type ooui: ooui.graph.base.Graph
+    :return: list of fields to describe
+    :rtype: list[str]
+    """
+    if ooui.type == 'indicator':
+        # Indicators only count the records
+        return []
+    fields = list(get_fields_to_retrieve(ooui))
+    for y in getattr(ooui, 'y', None) or []:
+        if y.name not in fields:
+            fields.append(y.name)
+    return fields
+
+
 def get_value_and_label_for_field(fields, values, field_name):
     """
     Retrieve the value and label for a specific field.
@@ -43,6 +69,14 @@ def get_value_and_label_for_field(fields, values, field_name):
         return {'value': value[0], 'label': value[1]}
 
     elif x_field_data['type'] == 'selection':
+        get_selection_label = getattr(x_field_data, 'get_selection_label', None)
+        if get_selection_label is not None:
+            # Projected metadata, see `ooui.graph.metadata`
+            label = get_selection_label(value, _MISSING)
+            if label is _MISSING:
+                return {'value': False, 'label': None}
+            return {'value': value, 'label': label}
+
         selection_values = x_field_data['selection']
         value_pair = next((pair for pair in selection_values if pair[0] == value), None)
 
@@ -59,9 +93,12 @@ def get_value_for_operator(operator, values):
     Retrieve the result of applying an operator on a list of values.
 
     :param str operator: The operator to be applied.
-        Possible values include "count", "+", "-", "*", "avg", "min", "max".
+        Possible values include "count", "+", "-", "*", "avg", "min", "max",
+        "count_distinct", "median", "p95".
     :param list values: A list of numerical values on which to apply the
-        operator.
+        operator. For the sketch operators ("count_distinct", "median" and
+        "p95") it can be any iterable, and it can also contain states
+        returned by `get_state_for_operator`, which are merged.
 
     :rtype: float or int
     :returns: The result of applying the operator to the values.
@@ -91,10 +128,123 @@ def get_value_for_operator(operator, values):
         if not values:
             return 0
         return max(values)
+    elif operator == "count_distinct":
+        return get_sketch_for_operator(operator, values).result()
+    elif operator in SKETCH_OPERATORS:
+        return round_number(get_sketch_for_operator(operator, values).result())
     else:
         raise ValueError("Unsupported operator: {}".format(operator))
 
 
+def get_state_for_operator(operator, values):
+    """
+    Retrieve a state of an operator that can be combined later with other
+    states of the same operator.
+
+    The sketch operators ("count_distinct", "median" and "p95") can't be
+    recomputed from their results, so their mergeable sketch is returned.
+    The rest of operators are returned as their result, which
+    `get_value_for_operator` combines as it does with the values.
+
+    :param str operator: The operator to be applied.
+    :param list values: A list of values on which to apply the operator.
+
+    :returns: The state of the operator for the values.
+    """
+    if operator in SKETCH_OPERATORS:
+        return get_sketch_for_operator(operator, values)
+    return get_value_for_operator(operator, values)
+
+
+class OperatorAccumulator(object):
+    """
+    Accumulate the result of an operator over a stream of values.
+
+    Values are added one by one without keeping them, except for the sketch
+    operators, and accumulators of the same operator can be merged. The
+    result is the same as `get_value_for_operator` with all the values.
+    """
+    __slots__ = ('operator', 'count', 'value', 'first', 'sketch')
+
+    def __init__(self, operator):
+        if operator not in ACCUMULATED_OPERATORS:
+            raise ValueError("Unsupported operator: {}".format(operator))
+        self.operator = operator
+        self.count = 0
+        self.value = 0
+        self.first = None
+        self.sketch = None
+        if operator in SKETCH_OPERATORS:
+            self.sketch = get_sketch_for_operator(operator, [])
+
+    def add(self, value):
+        operator = self.operator
+        self.count += 1
+        if self.sketch is not None:
+            if is_sketch(value):
+                self.sketch.merge(value)
+            else:
+                self.sketch.add(value)
+        elif operator in ('+', 'avg'):
+            self.value += value
+        elif self.count == 1:
+            self.value = value
+            self.first = value
+        elif operator == '-':
+            self.value -= value
+        elif operator == '*':
+            self.value *= value
+        elif operator == 'min':
+            self.value = min(self.value, value)
+        elif operator == 'max':
+            self.value = max(self.value, value)
+
+    def merge(self, other):
+        """
+        Add the values of another accumulator of the same operator, as if
+        they were added after the values of this one.
+        """
+        if other.operator != self.operator:
+            raise ValueError("Can't merge accumulators of different operators")
+        if not other.count:
+            return
+        if self.sketch is not None:
+            self.sketch.merge(other.sketch)
+        elif not self.count:
+            self.value, self.first = other.value, other.first
+        elif self.operator in ('+', 'avg'):
+            self.value += other.value
+        elif self.operator == '-':
+            # other.value is first - rest
+            self.value -= other.first + (other.first - other.value)
+        elif self.operator == '*':
+            self.value *= other.value
+        elif self.operator == 'min':
+            self.value = min(self.value, other.value)
+        elif self.operator == 'max':
+            self.value = max(self.value, other.value)
+        self.count += other.count
+
+    def result(self):
+        operator = self.operator
+        if self.sketch is not None:
+            return get_value_for_operator(operator, [self.sketch])
+        if operator == 'count':
+            return self.count
+        if not self.count:
+            return get_value_for_operator(operator, [])
+        if operator == 'avg':
+            return round_number(self.value / self.count)
+        if operator in ('min', 'max'):
+            return self.value
+        return round_number(self.value)
+
+
+ACCUMULATED_OPERATORS = (
+    'count', '+', '-', '*', 'avg', 'min', 'max'
+) + tuple(SKETCH_OPERATORS)
+
+
 def round_number(num):
     """
     Round a number to two decimal places.
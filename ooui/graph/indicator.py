@@ -1,26 +1,36 @@
 from __future__ import division
 from ooui.graph.base import Graph
 from ooui.helpers import (
-    parse_bool_attribute, replace_entities, ConditionParser, Domain
+    parse_bool_attribute, intern_string, get_condition_parser, get_domain
+)
+from ooui.helpers.elements import dump_element, load_element
+from ooui.helpers.domain_filter import compile_domain
+from ooui.graph.fields import OperatorAccumulator, round_number
+from ooui.graph.sampling import (
+    Reservoir, get_approximate_options, estimate_for_operator
 )
-from ooui.graph.fields import get_value_for_operator, round_number
 
 
 class GraphIndicator(Graph):
+    __slots__ = (
+        '_color', '_icon', '_suffix', '_total_domain', '_show_percent',
+        '_show_total', '_progressbar'
+    )
+
     def __init__(self, graph_type, element):
         # Inicia la classe base Graph
         super(GraphIndicator, self).__init__(element)
 
-        self._type = graph_type
-        self._color = ConditionParser(replace_entities(element.get('color'))) if element.get(
-            'color') else None
-        self._icon = ConditionParser(replace_entities(element.get('icon'))) if element.get(
-            'icon') else None
-        self._suffix = element.get('suffix') if element.get('suffix') else None
-        self._total_domain = Domain(replace_entities(
-            element.get('totalDomain')) if element.get('totalDomain') else None)
-        self._total_domain = element.get('totalDomain') and Domain(
-            replace_entities(element.get('totalDomain'))
+        self._type = intern_string(graph_type)
+        self._color = get_condition_parser(
+            element.get('color'), unescape=True
+        ) if element.get('color') else None
+        self._icon = get_condition_parser(
+            element.get('icon'), unescape=True
+        ) if element.get('icon') else None
+        self._suffix = intern_string(element.get('suffix')) if element.get('suffix') else None
+        self._total_domain = element.get('totalDomain') and get_domain(
+            element.get('totalDomain'), unescape=True
         ) or None
         self._show_percent = parse_bool_attribute(
             element.get('showPercent')) if element.get('showPercent') else False
@@ -28,7 +38,6 @@ class GraphIndicator(Graph):
             element.get('showTotal')) if element.get('showTotal') else True
         self._progressbar = parse_bool_attribute(
             element.get('progressbar')) if element.get('progressbar') else False
-        self.domain_parse_values = {}
 
     @property
     def color(self):
@@ -84,6 +93,7 @@ class GraphIndicator(Graph):
 
 
 class GraphIndicatorField(GraphIndicator):
+    __slots__ = ('_fields',)
 
     def __init__(self, graph_type, element):
         super(GraphIndicatorField, self).__init__(graph_type, element)
@@ -93,14 +103,128 @@ class GraphIndicatorField(GraphIndicator):
     def fields(self):
         return [f.get('name') for f in self._fields]
 
-    def process(self, values, fields, total_values=None):
-        if total_values is None:
-            total_values = []
+    def __getstate__(self):
+        state = super(GraphIndicatorField, self).__getstate__()
+        state['_fields'] = [dump_element(f) for f in self._fields]
+        return state
+
+    def __setstate__(self, state):
+        state = dict(
+            state, _fields=[load_element(f) for f in state['_fields']]
+        )
+        super(GraphIndicatorField, self).__setstate__(state)
+
+    def process(self, values, fields, total_values=None, options=None,
+                value_filter=None):
+        """
+        Compute the value and the total of the indicator.
+
+        Values are consumed once and accumulated for all the fields at the
+        same time, so they can be any iterable.
+
+        :param values: An iterable of dictionaries with the values.
+        :param dict fields: A dictionary containing field definitions.
+        :param total_values: An optional iterable with the values of the
+            total domain.
+        :param dict options: Optional processing options.
+        :param value_filter: Optional function that tells if an entry of
+            `values` belongs to the value, or the parsed domain of the value.
+            With it `values` are the entries of the total domain and both
+            are computed from a single stream, which requires the value
+            domain to be a subset of the total one.
+
+        :rtype: dict
+        :returns: The result of `GraphIndicator.process`.
+        """
+        if value_filter is not None and total_values is not None:
+            raise ValueError("total_values can't be used with value_filter")
+        if value_filter is not None and not callable(value_filter):
+            value_filter = compile_domain(value_filter)
+        approximate = get_approximate_options(options)
+        if approximate:
+            return self._process_approximate(
+                values, total_values, approximate, value_filter
+            )
+
+        value_accumulators = self._get_accumulators()
+        total_accumulators = self._get_accumulators()
+        if value_filter is None:
+            self._accumulate(value_accumulators, values)
+            self._accumulate(total_accumulators, total_values or [])
+        else:
+            for entry in values:
+                for name, accumulator in total_accumulators:
+                    accumulator.add(entry[name])
+                if value_filter(entry):
+                    for name, accumulator in value_accumulators:
+                        accumulator.add(entry[name])
+
         value = 0
         total = 0
-        for field in self._fields:
-            data = [v[field.get('name')] for v in values]
-            value += get_value_for_operator(field.get('operator'), data)
-            total_data = [v[field.get('name')] for v in total_values]
-            total += get_value_for_operator(field.get('operator'), total_data)
+        for (_, value_acc), (_, total_acc) in zip(
+                value_accumulators, total_accumulators):
+            value += value_acc.result()
+            total += total_acc.result()
         return super(GraphIndicatorField, self).process(value, total)
+
+    def _get_accumulators(self):
+        return [
+            (field.get('name'), OperatorAccumulator(field.get('operator')))
+            for field in self._fields
+        ]
+
+    @staticmethod
+    def _accumulate(accumulators, values):
+        for entry in values:
+            for name, accumulator in accumulators:
+                accumulator.add(entry[name])
+
+    def _process_approximate(self, values, total_values, approximate,
+                             value_filter=None):
+        """
+        Estimate the value and the total from a random sample of each stream.
+
+        The intervals of the fields are added, which bounds the interval of
+        the sum even though the estimates come from the same sample.
+        """
+        value_reservoir = Reservoir(
+            approximate['sample_size'], approximate['random']
+        )
+        total_reservoir = Reservoir(
+            approximate['sample_size'], approximate['random']
+        )
+        if value_filter is None:
+            for entry in values:
+                value_reservoir.add(entry)
+            for entry in total_values or []:
+                total_reservoir.add(entry)
+        else:
+            for entry in values:
+                total_reservoir.add(entry)
+                if value_filter(entry):
+                    value_reservoir.add(entry)
+
+        value, interval = self._estimate(value_reservoir, approximate)
+        total = self._estimate(total_reservoir, approximate)[0]
+        res = super(GraphIndicatorField, self).process(value, total)
+        res['confidenceInterval'] = interval
+        return res
+
+    def _estimate(self, reservoir, approximate):
+        value = 0
+        interval = [0, 0]
+        for field in self._fields:
+            estimate, field_interval = estimate_for_operator(
+                field.get('operator'),
+                [v[field.get('name')] for v in reservoir.items],
+                len(reservoir.items), reservoir.seen, approximate['z']
+            )
+            value += estimate
+            if interval is not None and field_interval is not None:
+                interval = [interval[0] + field_interval[0],
+                            interval[1] + field_interval[1]]
+            else:
+                interval = None
+        if interval is not None:
+            interval = [round_number(bound) for bound in interval]
+        return round_number(value), interval
@@ -0,0 +1,165 @@
+"""
+Compact projection of the fields definitions used by a graph.
+
+The fields definitions of a model (`fields_get`) can have hundreds of fields,
+and a graph only uses two or three of them. `get_fields_metadata` keeps only
+the fields whose definitions a parsed graph reads, including its `count` y
+axes, and the keys its processing reads, in immutable
+and hashable objects that can be cached, shared between requests and sent to
+other processes. They are dictionaries like the definitions they project, so
+they can be passed wherever the fields definitions are expected.
+"""
+from __future__ import absolute_import, unicode_literals
+
+from ooui.graph.fields import get_processed_fields
+from ooui.helpers.cache import LRUCache
+
+
+# Projected fields by model, fields version and field names
+METADATA_CACHE = LRUCache(maxsize=1024)
+
+
+class FrozenDict(dict):
+    """
+    Dictionary that can't be modified once built, hashable by its items.
+
+    It is a `dict` so reading it is as fast as reading the definitions.
+    """
+    __slots__ = ('_hash',)
+
+    def __init__(self, *args, **kwargs):
+        super(FrozenDict, self).__init__(*args, **kwargs)
+        self._hash = None
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("{} can't be modified".format(type(self).__name__))
+
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+class FieldMetadata(FrozenDict):
+    """
+    The keys of a field definition read by the graphs: `type`, `string`,
+    `relation` and `selection`, whose pairs are tuples.
+    """
+    __slots__ = ('selection_map',)
+
+    KEYS = ('type', 'string', 'relation', 'selection')
+
+    def __init__(self, definition):
+        """
+        :param dict definition: A field definition of `fields_get`.
+        """
+        items = {}
+        for key in self.KEYS:
+            value = definition.get(key)
+            if value is None:
+                continue
+            if key == 'selection':
+                value = tuple(tuple(pair) for pair in value)
+            items[key] = value
+        super(FieldMetadata, self).__init__(items)
+        self.selection_map = None
+        if 'selection' in items:
+            try:
+                selection_map = {}
+                for value, label in items['selection']:
+                    # The first pair of a value is used, as a linear search
+                    selection_map.setdefault(value, label)
+                self.selection_map = selection_map
+            except TypeError:
+                # Unhashable values are searched in the selection
+                pass
+
+    @classmethod
+    def from_definition(cls, definition):
+        """
+        Build the metadata of a field definition of `fields_get`.
+
+        :rtype: FieldMetadata
+        """
+        if isinstance(definition, cls):
+            return definition
+        return cls(definition)
+
+    def get_selection_label(self, value, default=None):
+        """
+        Retrieve the label of a selection value.
+
+        :returns: The label of the first pair of the value or `default`.
+        """
+        if self.selection_map is not None:
+            try:
+                return self.selection_map.get(value, default)
+            except TypeError:
+                return default
+        for pair in self.get('selection', ()):
+            if pair[0] == value:
+                return pair[1]
+        return default
+
+
+class FieldsMetadata(FrozenDict):
+    """
+    Immutable dictionary of field names to their `FieldMetadata`.
+    """
+    __slots__ = ()
+
+    def __init__(self, fields):
+        """
+        :param dict fields: The definitions or the metadata of each field.
+        """
+        super(FieldsMetadata, self).__init__(
+            (name, FieldMetadata.from_definition(definition))
+            for name, definition in fields.items()
+        )
+
+
+def project_fields(fields, names):
+    """
+    Keep the metadata of some fields of the fields definitions.
+
+    :param dict fields: The fields definitions.
+    :param names: The names of the fields to keep. Names without
+        definition are skipped.
+
+    :rtype: FieldsMetadata
+    """
+    return FieldsMetadata(dict(
+        (name, fields[name]) for name in names if name in fields
+    ))
+
+
+def get_fields_metadata(graph, fields, model=None, version=None):
+    """
+    Project the fields definitions to the fields whose definitions are read
+    to process a graph, see `ooui.graph.fields.get_processed_fields`.
+
+    :param graph: A parsed graph.
+    :param dict fields: The fields definitions of the model.
+    :param str model: Optional model of the fields definitions.
+    :param version: Optional hashable version of the fields definitions of
+        the model, that changes when they change. With the model, the
+        projection is cached and shared by the calls with the same model,
+        version and fields.
+
+    :rtype: FieldsMetadata
+    """
+    names = tuple(get_processed_fields(graph))
+    if model is None or version is None:
+        return project_fields(fields, names)
+    key = (model, version, names)
+    metadata = METADATA_CACHE.get(key)
+    if metadata is None:
+        metadata = project_fields(fields, names)
+        METADATA_CACHE.set(key, metadata)
+    return metadata
@@ -0,0 +1,76 @@
+from __future__ import absolute_import, unicode_literals
+import heapq
+import numbers
+import six
+
+
+def get_sort_key(value):
+    """
+    Retrieve a key to sort values of different types together.
+
+    Empty values (`False` and `None`) go first, then numbers in numeric order
+    and then the rest of values in text order.
+
+    :param value: The value to sort.
+
+    :rtype: tuple
+    :returns: The sort key of the value.
+    """
+    if value is None or value is False:
+        return (0, 0)
+    if isinstance(value, numbers.Number):
+        return (1, value)
+    return (2, six.text_type(value))
+
+
+def get_ordinals(values):
+    """
+    Assign to each distinct value its position in the sorted values.
+
+    :param values: An iterable of hashable values.
+
+    :rtype: dict
+    :returns: A dictionary with the ordinal of each value.
+    """
+    return dict(
+        (value, ordinal) for ordinal, value in enumerate(
+            sorted(set(values), key=get_sort_key)
+        )
+    )
+
+
+def sort_keyed_values(keyed_values, series_ordinals):
+    """
+    Sort chart values by their x ordinal and the ordinal of their series.
+
+    :param list keyed_values: A list of tuples with the x ordinal, the series
+        label and the value.
+    :param dict series_ordinals: The ordinal of each series label.
+
+    :rtype: list
+    :returns: The values in their final order.
+    """
+    keyed_values.sort(key=lambda k: (k[0], series_ordinals[k[1]]))
+    return [value for x_ordinal, series, value in keyed_values]
+
+
+def merge_sorted_runs(runs, key):
+    """
+    Merge runs of values that are already sorted by `key`.
+
+    :param list runs: A list of sorted lists.
+    :param func key: The function used to sort the runs.
+
+    :rtype: list
+    :returns: A list with all the values sorted by `key`.
+    """
+    if len(runs) == 1:
+        return list(runs[0])
+    decorated = [_decorate_run(run, run_index, key)
+                 for run_index, run in enumerate(runs)]
+    return [item[-1] for item in heapq.merge(*decorated)]
+
+
+def _decorate_run(run, run_index, key):
+    for index, value in enumerate(run):
+        yield key(value), run_index, index, value
@@ -1,5 +1,6 @@
 from __future__ import absolute_import, unicode_literals
 from ooui.graph.fields import get_value_and_label_for_field
+from ooui.graph.metadata import FieldsMetadata, get_fields_metadata
 
 
 def process_graph_data(ooui, values, fields, options=None):
@@ -10,17 +11,18 @@ def process_graph_data(ooui, values, fields, options=None):
     :param ooui: A GraphChart-like object containing chart information.
     :type ooui: ooui.graph.GraphChart
     :param list values: A list of dictionaries representing the original data.
-    :param dict fields: A dictionary of field definitions.
+    :param dict fields: A dictionary of field definitions, or their
+        projection to the fields of the graph, see
+        `ooui.graph.metadata.get_fields_metadata`.
     :param dict options: Optional additional options for processing graph data.
 
     :rtype: dict
     :returns: A dictionary containing the final processed data and flags like
         isGroup and isStack.
     """
-    if ooui.type == "indicatorField":
-        return ooui.process(values, fields)
-    else:
-        return ooui.process(values, fields, options=options)
+    if not isinstance(fields, FieldsMetadata):
+        fields = get_fields_metadata(ooui, fields)
+    return ooui.process(values, fields, options=options)
 
 
 def get_values_for_y_field(entries, field_name, fields):
@@ -42,6 +44,17 @@ def get_values_for_y_field(entries, field_name, fields):
     ]
 
 
+def iter_values_for_y_field(entries, field_name, fields):
+    """
+    Retrieve the labels of a field across multiple entries one by one, like
+    `get_values_for_y_field` without keeping them in a list.
+
+    :rtype: generator
+    """
+    for entry in entries:
+        yield get_value_and_label_for_field(fields, entry, field_name)['label']
+
+
 def get_values_grouped_by_field(field_name, fields, values):
     """
     Group values by a specific field.
@@ -96,10 +109,19 @@ def get_min_max(values, margin=0.1):
     :param margin: Margin to add to the min and max values.
     :return: Dictionary with 'min' and 'max' keys.
     """
-    if not values:
+    return get_min_max_for_values([d['value'] for d in values], margin)
+
+
+def get_min_max_for_values(value_list, margin=0.1):
+    """
+    Calculate the minimum and maximum values from a list of numbers.
+    :param value_list: List of numbers.
+    :param margin: Margin to add to the min and max values.
+    :return: Dictionary with 'min' and 'max' keys.
+    """
+    if not value_list:
         raise ValueError("The values array cannot be empty.")
 
-    value_list = [d['value'] for d in values]
     min_value = min(value_list)
     max_value = max(value_list)
     calculated_margin = (max_value - min_value) * margin
@@ -0,0 +1,207 @@
+from __future__ import absolute_import, division, unicode_literals
+import math
+import random
+
+from ooui.graph.fields import (
+    get_value_and_label_for_field, get_value_for_operator, round_number
+)
+from ooui.graph.sketches import is_sketch
+
+
+DEFAULT_SAMPLE_SIZE = 1000
+DEFAULT_CONFIDENCE = 0.95
+
+ESTIMATED_OPERATORS = ('count', '+', 'avg')
+
+
+class Reservoir(object):
+    """
+    Keep a uniform random sample of at most `size` items of a stream using
+    Algorithm R.
+    """
+
+    def __init__(self, size, rng=None):
+        if size < 1:
+            raise ValueError("sample_size must be a positive number")
+        self.size = size
+        self.items = []
+        self.seen = 0
+        self._random = rng or random.Random()
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+        else:
+            index = self._random.randint(0, self.seen - 1)
+            if index < self.size:
+                self.items[index] = item
+
+
+def get_approximate_options(options):
+    """
+    Retrieve the options of the approximate mode.
+
+    :param dict options: The processing options. `approximate` can be `True`
+        or a dictionary with `sample_size`, `confidence` and `seed`.
+
+    :rtype: dict
+    :returns: The approximate options with their defaults or `None` if the
+        approximate mode is not enabled.
+    """
+    approximate = (options or {}).get('approximate')
+    if not approximate:
+        return None
+    if approximate is True:
+        approximate = {}
+    confidence = approximate.get('confidence', DEFAULT_CONFIDENCE)
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    return {
+        'sample_size': approximate.get('sample_size', DEFAULT_SAMPLE_SIZE),
+        'confidence': confidence,
+        'z': get_z_score(confidence),
+        'random': random.Random(approximate.get('seed')),
+    }
+
+
+def get_z_score(confidence):
+    """
+    Retrieve the two-sided critical value of the normal distribution for a
+    confidence level.
+
+    :param float confidence: The confidence level, between 0 and 1.
+
+    :rtype: float
+    :returns: The z score such that `P(-z < Z < z) == confidence`.
+    """
+    low, high = 0.0, 40.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if math.erf(middle / math.sqrt(2)) < confidence:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def sample_values_grouped_by_field(field_name, fields, values, sample_size,
+                                   rng=None, adjust_key=None):
+    """
+    Group a stream of values by a field keeping a bounded random sample of
+    each group.
+
+    :param str field_name: The name of the field by which to group values.
+    :param dict fields: A dictionary containing field definitions.
+    :param values: An iterable of dictionaries with the values, consumed once.
+    :param int sample_size: The maximum number of entries kept per group.
+    :param random.Random rng: Optional random generator for the samples.
+    :param func adjust_key: Optional function to get the group of a label,
+        used to group dates by their time range.
+
+    :rtype: dict
+    :returns: A dictionary like the one of `get_values_grouped_by_field`,
+        where the `entries` of each group are a sample and `population` is
+        the number of entries of the group in the stream.
+    """
+    if rng is None:
+        rng = random.Random()
+    reservoirs = {}
+    labels = {}
+
+    for entry in values:
+        result = get_value_and_label_for_field(fields, entry, field_name)
+        value, label = result['value'], result['label']
+        if adjust_key is not None and value:
+            value = adjust_key(value)
+
+        if value not in reservoirs:
+            reservoirs[value] = Reservoir(sample_size, rng)
+            labels[value] = label
+
+        reservoirs[value].add(entry)
+
+    return dict(
+        (value, {
+            'label': labels[value],
+            'entries': reservoir.items,
+            'population': reservoir.seen,
+        }) for value, reservoir in reservoirs.items()
+    )
+
+
+def estimate_for_operator(operator, values, sample_size, population, z,
+                          aggregate=get_value_for_operator):
+    """
+    Estimate the result of an operator for a group from a sample.
+
+    Counts and sums are scaled to the population of the group and, with
+    averages, get a normal approximation confidence interval using the
+    finite population correction. The rest of operators are computed on the
+    sample and only get an interval when the sample is the whole group.
+
+    :param str operator: The operator to be applied.
+    :param list values: The values of the sampled entries of the series.
+    :param int sample_size: The number of sampled entries of the group, that
+        can be more than `values` when the group is split in series.
+    :param int population: The number of entries of the group.
+    :param float z: The critical value of the confidence level.
+    :param func aggregate: The function used to apply the operators that are
+        not estimated, like `get_state_for_operator`.
+
+    :rtype: tuple
+    :returns: The estimated value and its confidence interval as a
+        `[low, high]` list or `None` if it can't be estimated.
+    """
+    exact = sample_size >= population
+    if operator not in ESTIMATED_OPERATORS:
+        value = aggregate(operator, values)
+        if exact and not is_sketch(value):
+            return value, [value, value]
+        return value, None
+
+    if exact or population < 2:
+        correction = 0
+    else:
+        correction = (population - sample_size) / (population - 1)
+
+    if operator == 'count':
+        proportion = len(values) / sample_size if sample_size else 0
+        value = population * proportion
+        error = population * math.sqrt(
+            proportion * (1 - proportion) / max(sample_size, 1) * correction
+        )
+    elif operator == '+':
+        # Entries of other series count as zero in the sample
+        mean = sum(values) / sample_size if sample_size else 0
+        value = population * mean
+        error = population * math.sqrt(
+            _get_variance(values, mean, sample_size) /
+            max(sample_size, 1) * correction
+        )
+    else:
+        if not values:
+            return 0, None
+        value = sum(values) / len(values)
+        error = math.sqrt(
+            _get_variance(values, value, len(values)) / len(values) *
+            correction
+        )
+
+    error *= z
+    if operator == 'count':
+        value = int(round(value))
+    else:
+        value = round_number(value)
+    return value, [
+        round_number(value - error), round_number(value + error)
+    ]
+
+
+def _get_variance(values, mean, size):
+    if size < 2:
+        return 0
+    squares = sum((v - mean) ** 2 for v in values)
+    # Entries missing from values are zeros
+    squares += (size - len(values)) * mean ** 2
+    return squares / (size - 1)
@@ -0,0 +1,138 @@
+from __future__ import absolute_import, unicode_literals
+import io
+import json
+import six
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+SCALAR_TYPES = six.string_types + six.integer_types + (float, bool, type(None))
+
+
+def get_json_dumps(backend=None):
+    """
+    Retrieve the function used to encode values to JSON bytes.
+
+    :param str backend: The JSON library to use, `orjson` or `json`. By
+        default `orjson` is used when it is installed.
+
+    :rtype: func
+    :returns: A function that encodes a value to JSON bytes.
+    """
+    if backend is None:
+        backend = 'orjson' if orjson is not None else 'json'
+
+    if backend == 'orjson':
+        if orjson is None:
+            raise ValueError("orjson is not installed")
+        return _orjson_dumps
+    elif backend == 'json':
+        return _json_dumps
+    else:
+        raise ValueError("Unsupported JSON backend: {}".format(backend))
+
+
+def iter_json(obj, chunk_size=DEFAULT_CHUNK_SIZE, backend=None):
+    """
+    Encode a value to JSON yielding the result in chunks of bytes.
+
+    Dictionaries and lists containing other containers are written item by
+    item, so a chart result or an `Aggregator` output is never held as a
+    single string. Iterators and generators are written as JSON arrays while
+    they are consumed, allowing to serialize data as it is produced.
+
+    :param obj: The value to encode.
+    :param int chunk_size: The approximate size of each chunk in bytes.
+    :param str backend: The JSON library to use, see `get_json_dumps`.
+
+    :rtype: generator
+    :returns: Chunks of bytes with the JSON encoded value.
+    """
+    dumps = get_json_dumps(backend)
+    buf = bytearray()
+    for fragment in _iter_encode(obj, dumps):
+        buf += fragment
+        if len(buf) >= chunk_size:
+            yield bytes(buf)
+            del buf[:]
+    if buf:
+        yield bytes(buf)
+
+
+def dump_json(obj, fp, chunk_size=DEFAULT_CHUNK_SIZE, backend=None):
+    """
+    Encode a value to JSON writing it incrementally to a file-like object.
+
+    :param obj: The value to encode.
+    :param fp: A binary or text file-like object with a `write` method.
+    :param int chunk_size: The approximate size of each write in bytes.
+    :param str backend: The JSON library to use, see `get_json_dumps`.
+    """
+    text = isinstance(fp, io.TextIOBase)
+    for chunk in iter_json(obj, chunk_size=chunk_size, backend=backend):
+        fp.write(chunk.decode('utf-8') if text else chunk)
+
+
+def _iter_encode(obj, dumps):
+    if isinstance(obj, SCALAR_TYPES):
+        yield dumps(obj)
+    elif isinstance(obj, dict):
+        if all(isinstance(v, SCALAR_TYPES) for v in obj.values()):
+            yield dumps(obj)
+            return
+        yield b'{'
+        first = True
+        for key, value in obj.items():
+            if not first:
+                yield b','
+            first = False
+            yield dumps(_encode_key(key))
+            yield b':'
+            for fragment in _iter_encode(value, dumps):
+                yield fragment
+        yield b'}'
+    elif isinstance(obj, (list, tuple)) and all(
+            isinstance(v, SCALAR_TYPES) for v in obj):
+        yield dumps(obj)
+    elif hasattr(obj, '__iter__'):
+        yield b'['
+        first = True
+        for value in obj:
+            if not first:
+                yield b','
+            first = False
+            for fragment in _iter_encode(value, dumps):
+                yield fragment
+        yield b']'
+    else:
+        yield dumps(obj)
+
+
+def _encode_key(key):
+    # Same conversion of dictionary keys done by the json module
+    if isinstance(key, six.string_types):
+        return key
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, float):
+        return repr(key)
+    return six.text_type(key)
+
+
+def _json_dumps(obj):
+    return json.dumps(
+        obj, separators=(',', ':'), ensure_ascii=False
+    ).encode('utf-8')
+
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,283 @@
+from __future__ import absolute_import, division, unicode_literals
+import hashlib
+import math
+import numbers
+import random
+import six
+
+
+EXACT_THRESHOLD = 1000
+
+MASK_64 = (1 << 64) - 1
+
+
+def hash_value(value):
+    """
+    Hash a value to a well distributed 64 bits integer.
+
+    Numbers are hashed with the builtin `hash`, so values that are equal in
+    Python (`1`, `1.0`) get the same hash. The rest of values are hashed from
+    their text representation, which does not change between processes.
+    """
+    if isinstance(value, numbers.Number):
+        h = hash(value) & MASK_64
+    else:
+        if not isinstance(value, six.binary_type):
+            value = six.text_type(value).encode('utf-8')
+        h = int(hashlib.md5(value).hexdigest()[:16], 16)
+    # splitmix64 finalizer
+    h = (h + 0x9E3779B97F4A7C15) & MASK_64
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return h ^ (h >> 31)
+
+
+class HyperLogLog(object):
+    """
+    HyperLogLog sketch to estimate the number of distinct values using
+    `2 ** precision` bytes of memory.
+    """
+
+    def __init__(self, precision=12):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        h = hash_value(value)
+        bits = 64 - self.precision
+        index = h >> bits
+        rest = h & ((1 << bits) - 1)
+        rank = bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Can't merge HyperLogLog with different precision")
+        self.registers = bytearray(
+            max(a, b) for a, b in zip(self.registers, other.registers)
+        )
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range correction
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+
+class KLLSketch(object):
+    """
+    KLL sketch to estimate quantiles keeping O(k) values.
+    """
+
+    def __init__(self, k=200, c=2.0 / 3.0, seed=None):
+        self.k = k
+        self.c = c
+        self.compactors = []
+        self.size = 0
+        self.max_size = 0
+        self._random = random.Random(seed)
+        self._grow()
+
+    def _capacity(self, height):
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self.max_size = sum(
+            self._capacity(h) for h in range(len(self.compactors))
+        )
+
+    def _compress(self):
+        for height in range(len(self.compactors)):
+            compactor = self.compactors[height]
+            if len(compactor) >= self._capacity(height):
+                if height + 1 >= len(self.compactors):
+                    self._grow()
+                compactor.sort()
+                # With an odd number of items the smallest one stays
+                start = len(compactor) % 2
+                offset = 1 if self._random.random() < 0.5 else 0
+                self.compactors[height + 1].extend(
+                    compactor[start + offset::2]
+                )
+                del compactor[start:]
+                self.size = sum(len(c) for c in self.compactors)
+                if self.size < self.max_size:
+                    break
+
+    def add(self, value):
+        self.compactors[0].append(value)
+        self.size += 1
+        if self.size >= self.max_size:
+            self._compress()
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for height, compactor in enumerate(other.compactors):
+            self.compactors[height].extend(compactor)
+        self.size = sum(len(c) for c in self.compactors)
+        while self.size >= self.max_size:
+            self._compress()
+
+    def quantile(self, q):
+        return get_weighted_quantile(sorted(
+            (value, 1 << height)
+            for height, compactor in enumerate(self.compactors)
+            for value in compactor
+        ), q)
+
+
+def get_weighted_quantile(weighted, q):
+    """
+    Interpolate a quantile of sorted values that stand for `weight` values.
+
+    Each value fills as many ranks as its weight and the quantile is
+    interpolated between the two closest ranks. With unit weights it is the
+    exact interpolated quantile, so the exact values and the sketches give
+    the same quantile.
+
+    :param list weighted: Tuples with a value and its weight, sorted by value.
+    :param float q: The quantile, between 0 and 1.
+    """
+    if not weighted:
+        return 0
+    total = sum(weight for value, weight in weighted)
+    position = q * (total - 1)
+    lower_rank = int(math.floor(position))
+    upper_rank = min(lower_rank + 1, total - 1)
+    lower = None
+    cumulative = 0
+    for value, weight in weighted:
+        cumulative += weight
+        if lower is None and cumulative > lower_rank:
+            lower = value
+        if cumulative > upper_rank:
+            return lower + (value - lower) * (position - lower_rank)
+    return weighted[-1][0]
+
+
+class DistinctCounter(object):
+    """
+    Count distinct values exactly up to `threshold` values and estimate them
+    with a HyperLogLog sketch afterwards.
+    """
+
+    def __init__(self, threshold=EXACT_THRESHOLD, precision=12):
+        self.threshold = threshold
+        self.precision = precision
+        self.values = set()
+        self.sketch = None
+
+    def _promote(self):
+        self.sketch = HyperLogLog(self.precision)
+        for value in self.values:
+            self.sketch.add(value)
+        self.values = None
+
+    def add(self, value):
+        if self.sketch is not None:
+            self.sketch.add(value)
+            return
+        self.values.add(value)
+        if len(self.values) > self.threshold:
+            self._promote()
+
+    def merge(self, other):
+        if other.sketch is None:
+            for value in other.values:
+                self.add(value)
+            return
+        if self.sketch is None:
+            self._promote()
+        self.sketch.merge(other.sketch)
+
+    def result(self):
+        if self.sketch is None:
+            return len(self.values)
+        return int(round(self.sketch.count()))
+
+
+class QuantileEstimator(object):
+    """
+    Compute a quantile exactly up to `threshold` values and estimate it with
+    a KLL sketch afterwards. Both interpolate between the closest ranks, see
+    `get_weighted_quantile`.
+    """
+
+    def __init__(self, quantile, threshold=EXACT_THRESHOLD, k=200):
+        if not 0 <= quantile <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        self.quantile = quantile
+        self.threshold = threshold
+        self.k = k
+        self.values = []
+        self.sketch = None
+
+    def _promote(self):
+        self.sketch = KLLSketch(self.k)
+        for value in self.values:
+            self.sketch.add(value)
+        self.values = None
+
+    def add(self, value):
+        if self.sketch is not None:
+            self.sketch.add(value)
+            return
+        self.values.append(value)
+        if len(self.values) > self.threshold:
+            self._promote()
+
+    def merge(self, other):
+        if other.sketch is None:
+            for value in other.values:
+                self.add(value)
+            return
+        if self.sketch is None:
+            self._promote()
+        self.sketch.merge(other.sketch)
+
+    def result(self):
+        if self.sketch is not None:
+            return self.sketch.quantile(self.quantile)
+        return get_weighted_quantile(
+            [(value, 1) for value in sorted(self.values)], self.quantile
+        )
+
+
+SKETCH_OPERATORS = {
+    'count_distinct': DistinctCounter,
+    'median': lambda: QuantileEstimator(0.5),
+    'p95': lambda: QuantileEstimator(0.95),
+}
+
+
+def is_sketch(value):
+    return isinstance(value, (DistinctCounter, QuantileEstimator))
+
+
+def get_sketch_for_operator(operator, values):
+    """
+    Build the mergeable state of a sketch operator.
+
+    :param str operator: The operator ("count_distinct", "median" or "p95").
+    :param list values: The values to add. Values that are already sketches
+        of the same operator are merged.
+
+    :returns: The sketch with all the values.
+    """
+    sketch = SKETCH_OPERATORS[operator]()
+    for value in values:
+        if is_sketch(value):
+            sketch.merge(value)
+        else:
+            sketch.add(value)
+    return sketch
@@ -0,0 +1,104 @@
+from __future__ import absolute_import, unicode_literals
+import sys
+import time
+
+try:
+    perf_counter = time.perf_counter
+except AttributeError:
+    perf_counter = time.time
+
+
+def get_allocated_blocks():
+    """
+    Retrieve the number of memory blocks currently allocated by the
+    interpreter, or `None` when it is not available.
+    """
+    getallocatedblocks = getattr(sys, 'getallocatedblocks', None)
+    if getallocatedblocks is None:
+        return None
+    return getallocatedblocks()
+
+
+def get_size(value):
+    """
+    Retrieve the number of items of a value, or `None` if it has no length.
+    """
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+class StageRecorder(object):
+    """
+    Record the wall time, the input and output sizes and the allocated memory
+    blocks of each processing stage.
+    """
+
+    def __init__(self, callback=None):
+        """
+        :param func callback: Optional function called with the stats of each
+            stage once it finishes.
+        """
+        self.stages = []
+        self.callback = callback
+
+    def run(self, name, func, *args):
+        """
+        Run a stage recording its stats.
+
+        :param str name: The name of the stage.
+        :param func func: The function that implements the stage. Its first
+            argument is used as the input of the stage.
+
+        :returns: The result of the stage.
+        """
+        blocks = get_allocated_blocks()
+        start = perf_counter()
+        result = func(*args)
+        elapsed = perf_counter() - start
+        if blocks is not None:
+            blocks = get_allocated_blocks() - blocks
+
+        stage = {
+            'name': name,
+            'time': elapsed,
+            'input_size': get_size(args[0]) if args else None,
+            'output_size': get_size(result),
+            'allocated_blocks': blocks,
+        }
+        self.stages.append(stage)
+        if self.callback is not None:
+            self.callback(stage)
+        return result
+
+
+def get_stage_recorder(options):
+    """
+    Build a stage recorder from the processing options.
+
+    :param dict options: The processing options. `stats` enables the stats
+        and `on_stage` sets a function called with the stats of each stage.
+
+    :rtype: StageRecorder or None
+    :returns: The recorder, or `None` if the stats are not enabled.
+    """
+    callback = options.get('on_stage')
+    if not options.get('stats') and callback is None:
+        return None
+    return StageRecorder(callback)
+
+
+def run_stage(recorder, name, func, *args):
+    """
+    Run a stage, recording its stats when a recorder is given.
+
+    :param StageRecorder recorder: The recorder or `None`.
+    :param str name: The name of the stage.
+    :param func func: The function that implements the stage.
+
+    :returns: The result of the stage.
+    """
+    if recorder is None:
+        return func(*args)
+    return recorder.run(name, func, *args)
@@ -3,25 +3,44 @@ from dateutil.relativedelta import relativedelta
 
 from ooui.helpers.dates import datetime_from_string
 from ooui.graph.fields import get_value_for_operator
+from ooui.graph.stats import run_stage
+from ooui.graph.ordering import merge_sorted_runs
 
 
-def process_timerange_data(values, timerange, interval=1):
+def process_timerange_data(values, timerange, interval=1, recorder=None,
+                           sort_key=None):
     """
     Process time range data by combining values and filling gaps.
 
     :param list values: A list de diccionaris representing the original data.
     :param str timerange: The time range unit ("day", "week", "month", "year").
     :param int interval: The interval to increment dates by.
+    :param StageRecorder recorder: Optional recorder for the stats of the
+        combine and fill gaps stages.
+    :param func sort_key: Optional key the values are already sorted by. When
+        given, the series are not sorted again and the result is merged in
+        the order of this key.
 
     :rtype: list
     :returns: A list containing the processed values with gaps filled.
     """
-    combined_values = combine_values_for_timerange(values, timerange)
-    filled_values = fill_gaps_in_timerange_data(
-        combined_values, timerange, interval
+    combined_values = run_stage(
+        recorder, 'timerange.combine', combine_values_for_timerange,
+        values, timerange
     )
+    if sort_key is None:
+        return run_stage(
+            recorder, 'timerange.fill_gaps', fill_gaps_in_timerange_data,
+            combined_values, timerange, interval
+        )
 
-    return filled_values
+    filled_series = run_stage(
+        recorder, 'timerange.fill_gaps', get_filled_series,
+        combined_values, timerange, interval, True
+    )
+    return run_stage(
+        recorder, 'timerange.merge', merge_sorted_runs, filled_series, sort_key
+    )
 
 
 def fill_gaps_in_timerange_data(values, timerange, interval):
@@ -36,10 +55,31 @@ def fill_gaps_in_timerange_data(values, timerange, interval):
     :returns: A new list containing all values with gaps filled in.
     """
     final_values = []
+    for values_for_key in get_filled_series(values, timerange, interval):
+        final_values.extend(values_for_key)
+    return final_values
+
+
+def get_filled_series(values, timerange, interval, presorted=False):
+    """
+    Split time range data in series filling the gaps of each one.
+
+    :param list values: A list of dictionaries representing the original data.
+    :param str timerange: The time range unit ("day", "week", "month", "year").
+    :param int interval: The interval to increment dates by.
+    :param bool presorted: The values of each series are already sorted by x.
+
+    :rtype: list
+    :returns: A list with the values of each series, sorted by x and with the
+        gaps filled in.
+    """
+    series = []
     unique_values = get_unique_values_grouped_by(values, 'type-stacked')
 
     for key, values_for_key in unique_values.items():
-        values_for_key = sorted(values_for_key, key=lambda k: k['x'])
+        if not presorted:
+            values_for_key = sorted(values_for_key, key=lambda k: k['x'])
+        final_values = []
         for i in range(len(values_for_key)):
             value = values_for_key[i]
             final_values.append(value)
@@ -62,8 +102,9 @@ def fill_gaps_in_timerange_data(values, timerange, interval):
                     'stacked': value['stacked']
                 } for string_date in missing_dates
             ])
+        series.append(final_values)
 
-    return final_values
+    return series
 
 
 def add_time_unit(start_date, interval, units):
@@ -101,12 +142,12 @@ def get_missing_consecutive_dates(dates, timerange, interval=1):
     if len(dates) == 1:
         return dates
 
-    sorted_dates = sorted(dates)
-
-    for i in range(len(sorted_dates) - 1):
-        date1 = datetime_from_string(sorted_dates[i], format_str)
-        date2 = datetime_from_string(sorted_dates[i + 1], format_str)
+    # Each date is parsed once, it ends a gap and starts the next one
+    parsed_dates = [
+        datetime_from_string(date, format_str) for date in sorted(dates)
+    ]
 
+    for date1, date2 in zip(parsed_dates, parsed_dates[1:]):
         next_date = add_time_unit(date1, interval, units)
 
         while next_date < date2:
@@ -1,8 +1,59 @@
 from __future__ import absolute_import
-import six
-from .conditions import ConditionParser
-from .domain import Domain
-from .aggregated import Aggregator
+import importlib
+import sys
+
+# The helpers are imported on first use, so importing ooui does not load
+# simpleeval and dateutil until a condition or a domain is needed.
+LAZY_ATTRIBUTES = {
+    'ConditionParser': '.conditions',
+    'get_condition_parser': '.conditions',
+    'Domain': '.domain',
+    'get_domain': '.domain',
+    'Aggregator': '.aggregated',
+    'compile_domain': '.domain_filter',
+    'DomainIndex': '.domain_filter',
+    'Budget': '.budget',
+    'BudgetExceeded': '.budget',
+}
+
+
+def __getattr__(name):
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name)
+        )
+    module = importlib.import_module(LAZY_ATTRIBUTES[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ is not supported
+    from .conditions import ConditionParser, get_condition_parser
+    from .domain import Domain, get_domain
+    from .aggregated import Aggregator
+    from .domain_filter import compile_domain, DomainIndex
+    from .budget import Budget, BudgetExceeded
+
+
+try:
+    _intern = sys.intern
+except AttributeError:
+    # Python 2
+    _intern = intern
+
+
+def intern_string(value):
+    """
+    Intern a string so equal attributes of different views share the same
+    object. Other values are returned as they are.
+    :param value:
+    :return:
+    """
+    if isinstance(value, str):
+        return _intern(value)
+    return value
 
 
 def parse_bool_attribute(attribute):
@@ -20,7 +71,7 @@ def replace_entities(text):
     :param text:
     :return:
     """
-    if six.PY2:
+    if sys.version_info[0] == 2:
         from HTMLParser import HTMLParser
         parser = HTMLParser()
         return parser.unescape(text)
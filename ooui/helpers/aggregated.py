@@ -1,4 +1,7 @@
 from __future__ import absolute_import, unicode_literals
+from ooui.metrics import timed
+
+AGGREGATE_FUNCTIONS = ('sum', 'count', 'avg', 'max', 'min')
 
 
 class Aggregator:
@@ -6,25 +9,80 @@ class Aggregator:
         self.data = data
         self.field_definitions = field_definitions
         self.precisions = precisions or {}
+        self.reset()
 
-    def process(self):
+    def reset(self):
+        """
+        Discard the accumulated rows.
+        """
+        # Only the state of the requested functions is kept, so a count
+        # doesn't need values that can be added or compared
+        self._states = dict(
+            (field, {'count': 0, 'sum': 0, 'min': None, 'max': None})
+            for field in self.field_definitions
+        )
+        self._accumulated = [
+            (
+                field, self._states[field],
+                'sum' in functions or 'avg' in functions,
+                'min' in functions, 'max' in functions
+            )
+            for field, functions in self.field_definitions.items()
+        ]
+
+    def add(self, item):
+        """
+        Accumulate the values of a row.
+        :param dict item: The row.
+        """
+        for field, state, add_sum, add_min, add_max in self._accumulated:
+            if field not in item:
+                continue
+            value = item[field]
+            state['count'] += 1
+            if add_sum:
+                state['sum'] += value
+            if add_min and (state['min'] is None or value < state['min']):
+                state['min'] = value
+            if add_max and (state['max'] is None or value > state['max']):
+                state['max'] = value
+
+    def update(self, data):
+        """
+        Accumulate the values of a batch of rows in a single pass.
+        :param data: An iterable of rows.
+        """
+        for item in data:
+            self.add(item)
+
+    def result(self):
+        """
+        Compute the aggregates of the accumulated rows.
+        :return: A dictionary with the results of each function by field.
+        """
         results = {}
         for field, functions in self.field_definitions.items():
             precision = self.precisions.get(field)
-            values = [item[field] for item in self.data if field in item]
+            state = self._states[field]
             results[field] = {}
             if 'sum' in functions:
-                result = sum(values)
+                result = state['sum']
                 results[field]['sum'] = precision and round(result, precision) or result
             if 'count' in functions:
-                results[field]['count'] = round(len(values), precision)
+                results[field]['count'] = round(state['count'], precision)
             if 'avg' in functions:
-                result = sum(values) / float(len(values)) if values else 0
+                result = state['sum'] / float(state['count']) if state['count'] else 0
                 results[field]['avg'] = precision and round(result, precision) or result
             if 'max' in functions:
-                result = max(values) if values else 0
+                result = state['max'] if state['count'] else 0
                 results[field]['max'] = precision and round(result, precision) or result
             if 'min' in functions:
-                result = min(values) if values else 0
+                result = state['min'] if state['count'] else 0
                 results[field]['min'] = precision and round(result, precision) or result
         return results
+
+    @timed('ooui_aggregator_process')
+    def process(self):
+        self.reset()
+        self.update(self.data)
+        return self.result()
@@ -0,0 +1,286 @@
+"""
+Limit the resources used to evaluate a condition or a domain.
+
+The depth and the number of nodes of the expressions are checked before they
+are evaluated. Powers, repetitions and concatenations are checked by the
+operators, and the interpreter counts the nodes it visits and checks the
+deadline while it evaluates comprehensions. The compiled conditions don't
+have loops, so they are only checked before they are evaluated.
+"""
+from __future__ import absolute_import, unicode_literals
+import ast
+import math
+import numbers
+from timeit import default_timer
+
+from simpleeval import EvalWithCompoundTypes
+
+
+class BudgetExceeded(ValueError):
+    """
+    The evaluation exceeds a limit of its budget.
+    """
+
+    def __init__(self, limit, message):
+        super(BudgetExceeded, self).__init__(message)
+        self.limit = limit
+
+
+# Nodes that are not evaluated on their own
+_NOT_EVALUATED = (
+    ast.expr_context, ast.operator, ast.unaryop, ast.boolop, ast.cmpop
+)
+
+
+def measure_expression(expression):
+    """
+    Measure the depth and the number of nodes of an expression.
+
+    :rtype: tuple
+    :returns: The depth and the number of nodes.
+
+    :raises BudgetExceeded: If the expression is too deep to be parsed.
+    :raises SyntaxError: If the expression is not valid.
+    """
+    try:
+        tree = ast.parse(expression.strip())
+    except (RuntimeError, MemoryError):
+        raise BudgetExceeded('max_depth', "Expression too deep to parse")
+    depth = nodes = 0
+    # Iterative walk, the parser accepts trees deeper than the recursion
+    # limit
+    stack = [(tree, 1)]
+    while stack:
+        node, level = stack.pop()
+        nodes += 1
+        depth = max(depth, level)
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, _NOT_EVALUATED):
+                stack.append((child, level + 1))
+    return depth, nodes
+
+
+def _has_length(value):
+    return hasattr(value, '__len__')
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+class Budget(object):
+    """
+    Limits of an evaluation.
+
+    Budgets are immutable and compare by their limits, so they can be shared
+    and used as keys.
+    """
+    __slots__ = (
+        'max_depth', 'max_nodes', 'max_power', 'max_length', 'timeout',
+        '_operators'
+    )
+
+    def __init__(self, max_depth=32, max_nodes=10000, max_power=10000,
+                 max_length=100000, timeout=None):
+        """
+        :param int max_depth: Maximum depth of the expressions.
+        :param int max_nodes: Maximum number of nodes of the expressions
+            and of nodes visited by the interpreter.
+        :param int max_power: Maximum base and exponent of the powers.
+        :param int max_length: Maximum length of the strings and sequences
+            built by repetitions and concatenations, and maximum number of
+            digits of the powers.
+        :param float timeout: Optional seconds each evaluation can take.
+        """
+        for name, value in (
+            ('max_depth', max_depth), ('max_nodes', max_nodes),
+            ('max_power', max_power), ('max_length', max_length)
+        ):
+            if value < 1:
+                raise ValueError("{} must be a positive number".format(name))
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be a positive number")
+        object.__setattr__(self, 'max_depth', max_depth)
+        object.__setattr__(self, 'max_nodes', max_nodes)
+        object.__setattr__(self, 'max_power', max_power)
+        object.__setattr__(self, 'max_length', max_length)
+        object.__setattr__(self, 'timeout', timeout)
+        # Memo of `get_operators`, the only state that changes
+        object.__setattr__(self, '_operators', {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def _key(self):
+        return (
+            self.max_depth, self.max_nodes, self.max_power, self.max_length,
+            self.timeout
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, Budget) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return (
+            'Budget(max_depth={}, max_nodes={}, max_power={}, max_length={}, '
+            'timeout={})'.format(*self._key())
+        )
+
+    def __reduce__(self):
+        return Budget, self._key()
+
+    def check_size(self, depth, nodes):
+        """
+        Check the depth and the number of nodes of the expressions.
+
+        :raises BudgetExceeded: If they exceed the budget.
+        """
+        if depth > self.max_depth:
+            raise BudgetExceeded(
+                'max_depth', "Expression depth {} exceeds {}".format(
+                    depth, self.max_depth
+                )
+            )
+        if nodes > self.max_nodes:
+            raise BudgetExceeded(
+                'max_nodes', "Expression nodes {} exceed {}".format(
+                    nodes, self.max_nodes
+                )
+            )
+
+    def check_power(self, a, b):
+        if not (_is_number(a) and _is_number(b)):
+            return
+        if abs(a) > self.max_power or abs(b) > self.max_power:
+            raise BudgetExceeded(
+                'max_power', "Power {} ** {} exceeds {}".format(
+                    a, b, self.max_power
+                )
+            )
+        if abs(a) > 1 and b > 0:
+            digits = b * math.log10(abs(a))
+            if digits > self.max_length:
+                raise BudgetExceeded(
+                    'max_length', "Power {} ** {} has too many digits".format(
+                        a, b
+                    )
+                )
+
+    def check_length(self, length):
+        if length > self.max_length:
+            raise BudgetExceeded('max_length', "Length {} exceeds {}".format(
+                length, self.max_length
+            ))
+
+    def get_operators(self, operators):
+        """
+        Retrieve an operators table that checks the powers, repetitions and
+        concatenations before calling the operators of `operators`.
+
+        :param dict operators: The operators table of an evaluator, which
+            must not be modified.
+
+        :rtype: dict
+        """
+        key = id(operators)
+        cached = self._operators.get(key)
+        if cached is not None and cached[0] is operators:
+            return cached[1]
+        power = operators.get(ast.Pow)
+        mult = operators.get(ast.Mult)
+        add = operators.get(ast.Add)
+
+        def bounded_power(a, b):
+            self.check_power(a, b)
+            return power(a, b)
+
+        def bounded_mult(a, b):
+            if _has_length(a) and isinstance(b, numbers.Integral):
+                self.check_length(len(a) * b)
+            elif _has_length(b) and isinstance(a, numbers.Integral):
+                self.check_length(len(b) * a)
+            return mult(a, b)
+
+        def bounded_add(a, b):
+            if _has_length(a) and _has_length(b):
+                self.check_length(len(a) + len(b))
+            return add(a, b)
+
+        bounded = dict(operators)
+        for node_type, function in (
+            (ast.Pow, bounded_power if power else None),
+            (ast.Mult, bounded_mult if mult else None),
+            (ast.Add, bounded_add if add else None),
+        ):
+            if function is not None:
+                bounded[node_type] = function
+        self._operators[key] = (operators, bounded)
+        return bounded
+
+    def start(self):
+        """
+        Start metering an evaluation.
+
+        :rtype: BudgetMeter
+        """
+        return BudgetMeter(self)
+
+
+class BudgetMeter(object):
+    """
+    Nodes visited and deadline of an evaluation.
+    """
+    __slots__ = ('budget', 'visits', 'deadline')
+
+    # Nodes visited between checks of the deadline
+    CHECK_INTERVAL = 64
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.visits = 0
+        self.deadline = None
+        if budget.timeout is not None:
+            self.deadline = default_timer() + budget.timeout
+
+    def check_deadline(self):
+        if self.deadline is not None and default_timer() > self.deadline:
+            raise BudgetExceeded('timeout', "Evaluation exceeds {}s".format(
+                self.budget.timeout
+            ))
+
+    def visit(self):
+        self.visits += 1
+        if self.visits > self.budget.max_nodes:
+            raise BudgetExceeded(
+                'max_nodes', "Evaluation visits more than {} nodes".format(
+                    self.budget.max_nodes
+                )
+            )
+        if not self.visits % self.CHECK_INTERVAL:
+            self.check_deadline()
+
+
+class BudgetEval(EvalWithCompoundTypes):
+    """
+    Interpreter that counts the nodes it visits in a `BudgetMeter`.
+    """
+
+    def __init__(self, meter, operators=None, functions=None, names=None):
+        super(BudgetEval, self).__init__(
+            operators=meter.budget.get_operators(operators),
+            functions=functions, names=names
+        )
+        self.meter = meter
+
+    def _eval(self, node):
+        self.meter.visit()
+        return super(BudgetEval, self)._eval(node)
@@ -0,0 +1,99 @@
+from __future__ import absolute_import, unicode_literals
+import threading
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """
+    Thread-safe mapping that keeps the `maxsize` most recently used items.
+    """
+
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive number")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.frozen = False
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Retrieve an item and mark it as the most recently used.
+
+        :param key: The key of the item.
+        :param default: The value returned when the key is not cached.
+        """
+        if self.frozen:
+            # Not reordered nor counted, see `freeze`
+            return self._data.get(key, default)
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._move_to_end(key, value)
+            self.hits += 1
+            return value
+
+    def _move_to_end(self, key, value):
+        if hasattr(self._data, 'move_to_end'):
+            self._data.move_to_end(key)
+        else:
+            del self._data[key]
+            self._data[key] = value
+
+    def set(self, key, value):
+        """
+        Add an item, discarding the least recently used one when the cache
+        is full.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def freeze(self):
+        """
+        Stop reordering the items and counting the hits and misses on
+        lookups.
+
+        Moving an item to the end relinks the nodes of the dictionary, so
+        the lookups of a cache filled before forking would write to the
+        pages the workers share. A frozen cache still adds new items, and
+        it discards the oldest ones first.
+        """
+        self.frozen = True
+
+    def unfreeze(self):
+        """
+        Reorder the items on lookups again, see `freeze`.
+        """
+        self.frozen = False
+
+    def resize(self, maxsize):
+        """
+        Change the maximum number of items, discarding the least recently
+        used ones that don't fit.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive number")
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
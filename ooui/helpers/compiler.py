@@ -0,0 +1,430 @@
+"""
+Compile the sentences of a condition to a Python function.
+
+The expressions are checked against the same rules `simpleeval` applies when
+it interprets them: only the nodes it evaluates, the functions and operators
+of the evaluator and the attributes it allows. Every operator is called from
+the operators table of the evaluator, so the limits of `safe_power`,
+`safe_mult` and `safe_add` still apply. Expressions with features that are not
+compiled, like comprehensions, raise `CompileError` and are interpreted.
+"""
+from __future__ import absolute_import, unicode_literals
+import ast
+import marshal
+import sys
+import types
+
+from simpleeval import (
+    DISALLOW_FUNCTIONS, DISALLOW_METHODS, DISALLOW_PREFIXES, MAX_STRING_LENGTH,
+    AttributeDoesNotExist, NameNotDefined
+)
+
+
+try:
+    from importlib.util import MAGIC_NUMBER
+except ImportError:
+    import imp
+    MAGIC_NUMBER = imp.get_magic()
+
+
+class CompileError(ValueError):
+    """
+    The expression uses a feature that is not compiled.
+    """
+
+
+class Names(dict):
+    """
+    Names of an evaluation, falling back to the functions of the evaluator
+    as `simpleeval` does.
+    """
+    __slots__ = ('functions', 'expression')
+
+    def __init__(self, functions, expression=''):
+        super(Names, self).__init__()
+        self.functions = functions
+        self.expression = expression
+
+    def __missing__(self, key):
+        if key in self.functions:
+            return self.functions[key]
+        raise NameNotDefined(key, self.expression)
+
+
+def get_attribute(value, attr):
+    try:
+        return getattr(value, attr)
+    except (AttributeError, TypeError):
+        pass
+    try:
+        return value[attr]
+    except (KeyError, TypeError):
+        pass
+    raise AttributeDoesNotExist(attr, '')
+
+
+def compare_chain(left, comparisons):
+    result = True
+    for compare, get_right in comparisons:
+        if not result:
+            break
+        right = get_right()
+        result = compare(left, right)
+        left = right
+    return result
+
+
+class ConditionCompiler(object):
+    """
+    Generate the Python source of the sentences of a condition.
+    """
+
+    def __init__(self, functions, operators):
+        """
+        :param dict functions: The functions of the evaluator.
+        :param dict operators: The operators table of the evaluator.
+        """
+        self.functions = functions
+        self.operators = operators
+        self.namespace = get_namespace()
+        self._refs = {}
+        self.nodes = {
+            ast.Name: self._compile_name,
+            ast.UnaryOp: self._compile_unaryop,
+            ast.BinOp: self._compile_binop,
+            ast.BoolOp: self._compile_boolop,
+            ast.Compare: self._compile_compare,
+            ast.IfExp: self._compile_ifexp,
+            ast.Call: self._compile_call,
+            ast.Subscript: self._compile_subscript,
+            ast.Attribute: self._compile_attribute,
+            ast.Slice: self._compile_slice,
+            ast.Dict: self._compile_dict,
+            ast.Tuple: self._compile_tuple,
+            ast.List: self._compile_list,
+            ast.Set: self._compile_set,
+        }
+        if hasattr(ast, 'Constant'):
+            self.nodes[ast.Constant] = self._compile_constant
+        if sys.version_info < (3, 9):
+            # Nodes that are not generated by newer parsers
+            for name in ('Num', 'Str', 'NameConstant', 'Index'):
+                node_type = getattr(ast, name, None)
+                if node_type is not None:
+                    self.nodes[node_type] = getattr(
+                        self, '_compile_{}'.format(name.lower())
+                    )
+
+    def _ref(self, value):
+        """
+        Add a value to the namespace of the generated code and return its
+        identifier.
+        """
+        key = id(value)
+        if key not in self._refs:
+            name = '_v{}'.format(len(self._refs))
+            self._refs[key] = (value, name)
+            self.namespace[name] = value
+        return self._refs[key][1]
+
+    def compile_expression(self, expression):
+        """
+        Generate the source of an expression.
+
+        :raises CompileError: If the expression is not compiled.
+        """
+        try:
+            body = ast.parse(expression.strip()).body
+        except (SyntaxError, ValueError, RuntimeError, MemoryError):
+            raise CompileError("Invalid expression: {}".format(expression))
+        if len(body) != 1 or not isinstance(body[0], ast.Expr):
+            raise CompileError("Not an expression: {}".format(expression))
+        return self._compile(body[0].value)
+
+    def compile_conditions(self, conditions, name='<condition>'):
+        """
+        Build a function that returns the key of the first sentence whose
+        expression is true.
+
+        :param list conditions: Tuples with the key and the expression of
+            each sentence, as returned by `ConditionParser.parse_condition`.
+        :param str name: The file name of the generated code.
+
+        :rtype: func
+        :returns: A function that receives the `Names` of the evaluation.
+
+        :raises CompileError: If an expression is not compiled.
+        """
+        lines = ['def _evaluate(_n):']
+        for key, expression in conditions:
+            lines.append('    if {}:'.format(self.compile_expression(expression)))
+            lines.append('        return {}'.format(self._ref(key)))
+        lines.append('    return None')
+        try:
+            code = compile('\n'.join(lines), name, 'exec')
+        except (SyntaxError, RuntimeError, MemoryError):
+            raise CompileError("Condition too complex to compile")
+        exec(code, self.namespace)
+        return self.namespace['_evaluate']
+
+    def _compile(self, node):
+        try:
+            handler = self.nodes[type(node)]
+        except KeyError:
+            raise CompileError(
+                "{} is not compiled".format(type(node).__name__)
+            )
+        return handler(node)
+
+    def _compile_value(self, value):
+        if hasattr(value, '__len__') and len(value) > MAX_STRING_LENGTH:
+            raise CompileError("Literal too long")
+        return self._ref(value)
+
+    def _compile_constant(self, node):
+        return self._compile_value(node.value)
+
+    def _compile_num(self, node):
+        return self._compile_value(node.n)
+
+    def _compile_str(self, node):
+        return self._compile_value(node.s)
+
+    def _compile_nameconstant(self, node):
+        return self._compile_value(node.value)
+
+    def _compile_index(self, node):
+        return self._compile(node.value)
+
+    def _compile_name(self, node):
+        return '_n[{!r}]'.format(str(node.id))
+
+    def _get_operator(self, op):
+        try:
+            return self._ref(self.operators[type(op)])
+        except KeyError:
+            raise CompileError(
+                "Operator {} not available".format(type(op).__name__)
+            )
+
+    def _compile_unaryop(self, node):
+        return '{}({})'.format(
+            self._get_operator(node.op), self._compile(node.operand)
+        )
+
+    def _compile_binop(self, node):
+        return '{}({}, {})'.format(
+            self._get_operator(node.op), self._compile(node.left),
+            self._compile(node.right)
+        )
+
+    def _compile_boolop(self, node):
+        join = ' and ' if isinstance(node.op, ast.And) else ' or '
+        return '({})'.format(join.join(
+            '({})'.format(self._compile(value)) for value in node.values
+        ))
+
+    def _compile_compare(self, node):
+        left = self._compile(node.left)
+        if len(node.ops) == 1:
+            return '{}({}, {})'.format(
+                self._get_operator(node.ops[0]), left,
+                self._compile(node.comparators[0])
+            )
+        # The comparators are only evaluated while the chain is true
+        return '_compare({}, ({},))'.format(left, ', '.join(
+            '({}, lambda: {})'.format(
+                self._get_operator(op), self._compile(comparator)
+            ) for op, comparator in zip(node.ops, node.comparators)
+        ))
+
+    def _compile_ifexp(self, node):
+        return '(({}) if ({}) else ({}))'.format(
+            self._compile(node.body), self._compile(node.test),
+            self._compile(node.orelse)
+        )
+
+    def _compile_call(self, node):
+        if isinstance(node.func, ast.Attribute):
+            func = self._compile(node.func)
+        elif isinstance(node.func, ast.Name):
+            if node.func.id not in self.functions:
+                raise CompileError("Function {} not defined".format(node.func.id))
+            function = self.functions[node.func.id]
+            if function in DISALLOW_FUNCTIONS:
+                raise CompileError("Function {} forbidden".format(node.func.id))
+            func = self._ref(function)
+        else:
+            raise CompileError("Only named functions are compiled")
+
+        arguments = []
+        for arg in node.args:
+            if isinstance(arg, getattr(ast, 'Starred', ())):
+                raise CompileError("Starred arguments are not compiled")
+            arguments.append(self._compile(arg))
+        for keyword in node.keywords:
+            if keyword.arg is None:
+                raise CompileError("Keyword unpacking is not compiled")
+            arguments.append('{}={}'.format(
+                keyword.arg, self._compile(keyword.value)
+            ))
+        return '{}({})'.format(func, ', '.join(arguments))
+
+    def _compile_subscript(self, node):
+        return '({})[{}]'.format(
+            self._compile(node.value), self._compile(node.slice)
+        )
+
+    def _compile_slice(self, node):
+        return '{}({}, {}, {})'.format(self._ref(slice), *[
+            'None' if part is None else self._compile(part)
+            for part in (node.lower, node.upper, node.step)
+        ])
+
+    def _compile_attribute(self, node):
+        for prefix in DISALLOW_PREFIXES:
+            if node.attr.startswith(prefix):
+                raise CompileError("Attribute {} forbidden".format(node.attr))
+        if node.attr in DISALLOW_METHODS:
+            raise CompileError("Method {} forbidden".format(node.attr))
+        return '_attr({}, {!r})'.format(
+            self._compile(node.value), str(node.attr)
+        )
+
+    def _compile_elements(self, elements):
+        sources = []
+        for element in elements:
+            if isinstance(element, getattr(ast, 'Starred', ())):
+                raise CompileError("Starred elements are not compiled")
+            sources.append(self._compile(element))
+        return sources
+
+    def _compile_dict(self, node):
+        if any(key is None for key in node.keys):
+            raise CompileError("Dict unpacking is not compiled")
+        return '{{{}}}'.format(', '.join(
+            '{}: {}'.format(self._compile(key), self._compile(value))
+            for key, value in zip(node.keys, node.values)
+        ))
+
+    def _compile_tuple(self, node):
+        elements = self._compile_elements(node.elts)
+        if len(elements) == 1:
+            return '({},)'.format(elements[0])
+        return '({})'.format(', '.join(elements))
+
+    def _compile_list(self, node):
+        return '[{}]'.format(', '.join(self._compile_elements(node.elts)))
+
+    def _compile_set(self, node):
+        return '{{{}}}'.format(', '.join(self._compile_elements(node.elts)))
+
+
+def get_expression_names(expression):
+    """
+    Retrieve the names used by an expression, without the called functions.
+
+    Unlike `ConditionParser.involved_fields`, which evaluates the expression,
+    the names of every branch are included.
+
+    :rtype: set
+    :raises CompileError: If the expression can't be parsed.
+    """
+    try:
+        tree = ast.parse(expression.strip())
+    except (SyntaxError, ValueError, RuntimeError, MemoryError):
+        raise CompileError("Invalid expression: {}".format(expression))
+    called = set(
+        id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)
+    )
+    return set(
+        node.id for node in ast.walk(tree)
+        if isinstance(node, ast.Name) and id(node) not in called
+    )
+
+
+def get_namespace():
+    """
+    Build the namespace of the generated code, without the values it uses.
+    """
+    return {
+        '__builtins__': {},
+        '_attr': get_attribute,
+        '_compare': compare_chain,
+    }
+
+
+def dump_compiled(compiled, functions, operators):
+    """
+    Convert a compiled condition to a picklable state.
+
+    The code is marshalled, and the functions and operators it uses are
+    stored by their name and node type, so they are taken from the tables
+    of the evaluator that loads it.
+
+    :param func compiled: A function returned by `compile_conditions`.
+    :param dict functions: The functions of the evaluator.
+    :param dict operators: The operators table of the evaluator.
+
+    :rtype: tuple
+    """
+    function_names = dict(
+        (id(value), name) for name, value in functions.items()
+    )
+    operator_types = dict(
+        (id(value), op) for op, value in operators.items()
+    )
+    refs = []
+    for name, value in compiled.__globals__.items():
+        if not name.startswith('_v'):
+            continue
+        if id(value) in function_names:
+            refs.append((name, 'function', function_names[id(value)]))
+        elif id(value) in operator_types:
+            refs.append((name, 'operator', operator_types[id(value)]))
+        else:
+            refs.append((name, 'value', value))
+    return MAGIC_NUMBER, marshal.dumps(compiled.__code__), refs
+
+
+def load_compiled(state, functions, operators):
+    """
+    Rebuild a compiled condition from the state of `dump_compiled`.
+
+    :returns: The function or `None` if the code was marshalled by another
+        Python version, so the condition has to be compiled again.
+    """
+    magic, code, refs = state
+    if magic != MAGIC_NUMBER:
+        return None
+    namespace = get_namespace()
+    for name, kind, value in refs:
+        if kind == 'function':
+            value = functions[value]
+        elif kind == 'operator':
+            value = operators[value]
+        namespace[name] = value
+    return types.FunctionType(marshal.loads(code), namespace, '_evaluate')
+
+
+def compile_conditions(conditions, functions, operators, name='<condition>'):
+    """
+    Compile the sentences of a condition.
+
+    :param list conditions: Tuples with the key and the expression of each
+        sentence.
+    :param dict functions: The functions of the evaluator.
+    :param dict operators: The operators table of the evaluator.
+
+    :rtype: func
+    :returns: A function that receives the `Names` of the evaluation and
+        returns the key of the first true sentence, or `None` if an
+        expression is not compiled.
+    """
+    try:
+        return ConditionCompiler(functions, operators).compile_conditions(
+            conditions, name
+        )
+    except (CompileError, RuntimeError, MemoryError):
+        # Too deep expressions exceed the recursion limit of the compiler
+        return None
@@ -1,8 +1,15 @@
 import time
 import ast
 import operator
-from datetime import datetime
+from datetime import datetime, timedelta
 from simpleeval import EvalWithCompoundTypes, DEFAULT_OPERATORS, DEFAULT_NAMES
+from ooui.metrics import timed
+from ooui.helpers.cache import LRUCache
+from ooui.helpers.budget import BudgetEval, measure_expression
+from ooui.helpers.compiler import (
+    CompileError, Names, compile_conditions, dump_compiled,
+    get_expression_names, load_compiled
+)
 
 
 class DummyObject:
@@ -34,14 +41,251 @@ class GetFieldsDict(dict):
         return dict.get(self, key, DummyObject())
 
 
+# Parsed conditions by their raw string, shared by every ConditionParser
+CONDITION_CACHE = LRUCache(maxsize=4096)
+
+# Compiled conditions by their raw string, False when they can't be compiled
+COMPILED_CACHE = LRUCache(maxsize=4096)
+
+# Results kept by each parser for the values of the names it uses, 0 disables
+# the memo
+MEMO_SIZE = 1024
+
+# Names whose value changes between evaluations with the same values
+VOLATILE_NAMES = ('time',)
+
+_MISSING = object()
+
+# Parsers by their condition, see `get_condition_parser`
+PARSER_CACHE = LRUCache(maxsize=4096)
+
+# Operators table shared by every parser, it must not be modified
+OPERATORS = DEFAULT_OPERATORS.copy()
+OPERATORS[ast.BitAnd] = operator.and_
+
+# The current date with the timestamps of its first and next days
+_CURRENT_DATE = (None, 0, 0)
+
+
+def get_current_date():
+    """
+    Retrieve the current date in `%Y-%m-%d` format, computed once a day.
+    """
+    global _CURRENT_DATE
+    now = time.time()
+    current_date, start, end = _CURRENT_DATE
+    if not start <= now < end:
+        today = datetime.fromtimestamp(now).date()
+        start = time.mktime(today.timetuple())
+        end = time.mktime((today + timedelta(days=1)).timetuple())
+        current_date = today.strftime('%Y-%m-%d')
+        _CURRENT_DATE = (current_date, start, end)
+    return current_date
+
+
+# Functions that give the names the values don't have, see `values`
+CURRENT_VALUES = {'current_date': get_current_date}
+
+
+def get_condition_parser(condition, unescape=False):
+    """
+    Retrieve the parser of a condition, shared by every caller with the same
+    condition.
+
+    The parsers don't keep any state of their evaluations apart from the
+    memoised results, and the current date is read when they are evaluated,
+    so they can be cached for days.
+
+    :param str condition: The condition.
+    :param bool unescape: Replace the HTML entities of the condition, as
+        found in the attributes of the views.
+
+    :rtype: ConditionParser
+    """
+    key = (condition, unescape)
+    parser = PARSER_CACHE.get(key)
+    if parser is None:
+        if unescape:
+            from ooui.helpers import replace_entities
+            condition = replace_entities(condition)
+        parser = ConditionParser(condition)
+        PARSER_CACHE.set(key, parser)
+    return parser
+
+
+def load_condition_parser(condition, conditions, memo_names, compiled):
+    """
+    Rebuild a pickled parser without parsing or compiling its condition
+    again, see `ConditionParser.__reduce__`.
+
+    The parser of the condition is shared as `get_condition_parser` does.
+    """
+    key = (condition, False)
+    parser = PARSER_CACHE.get(key)
+    if parser is None:
+        parser = ConditionParser.__new__(ConditionParser)
+        parser.setup(condition, conditions, memo_names, compiled)
+        PARSER_CACHE.set(key, parser)
+    return parser
+
+
 class ConditionParser(object):
     def __init__(self, condition):
+        conditions = CONDITION_CACHE.get(condition)
+        if conditions is None:
+            conditions = self.parse_condition(condition)
+            CONDITION_CACHE.set(condition, conditions)
+        self.setup(condition, conditions)
+
+    def setup(self, condition, conditions, memo_names=_MISSING,
+              compiled=None):
+        """
+        Set up the parser for the parsed sentences of its condition.
+
+        :param str condition: The raw condition.
+        :param list conditions: The sentences of the condition.
+        :param tuple memo_names: The names of `get_memo_names`, found from
+            the sentences when they are not given.
+        :param tuple compiled: The state of the compiled sentences, see
+            `ooui.helpers.compiler.dump_compiled`. They are compiled when it
+            is not given or it was built by another Python version.
+        """
         self.raw_condition = condition
-        self.conditions = self.parse_condition(condition)
+        self.conditions = conditions
         self.functions = {'time': time, 'bool': bool}
-        self.operators = DEFAULT_OPERATORS.copy()
-        self.operators[ast.BitAnd] = operator.and_
-        self.values = {'current_date': datetime.now().strftime('%Y-%m-%d')}
+        self.operators = OPERATORS
+        # The evaluator adds the compound types to the functions
+        self.compiled_functions = dict(
+            self.functions, list=list, tuple=tuple, dict=dict, set=set
+        )
+        self.compiled = None
+        if compiled is not None:
+            self.compiled = load_compiled(
+                compiled, self.compiled_functions, self.operators
+            )
+            if self.compiled is not None:
+                COMPILED_CACHE.set(condition, self.compiled)
+        if self.compiled is None and conditions:
+            self.compiled = self.compile()
+        self._size = None
+        if memo_names is _MISSING:
+            memo_names = self.get_memo_names() if conditions else None
+        self.memo_names = memo_names
+        self.memo = None
+        if self.memo_names is not None and MEMO_SIZE:
+            self.memo = LRUCache(maxsize=MEMO_SIZE)
+            # The names of the rows are read at once, the current values
+            # are only read when the rows don't have them
+            self._row_names = tuple(
+                name for name in self.memo_names
+                if name not in CURRENT_VALUES
+            )
+            self._current_names = tuple(
+                name for name in self.memo_names if name in CURRENT_VALUES
+            )
+            self._get_row_values = (
+                operator.itemgetter(*self._row_names) if self._row_names
+                else None
+            )
+
+    def compile(self, budget=None):
+        """
+        Compile the sentences of the condition to a Python function, see
+        `ooui.helpers.compiler`.
+
+        :param Budget budget: Optional budget whose operators are compiled.
+
+        :returns: The function or `None` if the condition uses features that
+            are only interpreted.
+        """
+        key = self.raw_condition
+        operators = self.operators
+        if budget is not None:
+            key = (self.raw_condition, budget)
+            operators = budget.get_operators(self.operators)
+        compiled = COMPILED_CACHE.get(key)
+        if compiled is None:
+            compiled = compile_conditions(
+                self.conditions, self.compiled_functions, operators,
+                '<condition {!r}>'.format(self.raw_condition)
+            ) or False
+            COMPILED_CACHE.set(key, compiled)
+        return compiled or None
+
+    def measure(self):
+        """
+        Measure the sentences of the condition, see `Budget.check_size`.
+
+        :rtype: tuple
+        :returns: The depth of the deepest sentence and the number of nodes
+            of all of them.
+        """
+        if self._size is None:
+            depth = nodes = 0
+            for key, condition in self.conditions:
+                sentence_depth, sentence_nodes = measure_expression(condition)
+                depth = max(depth, sentence_depth)
+                nodes += sentence_nodes
+            self._size = (depth, nodes)
+        return self._size
+
+    def get_memo_names(self):
+        """
+        Retrieve the names that determine the result of the condition.
+
+        :rtype: tuple
+        :returns: The sorted names, or `None` if the result can't be memoised
+            because the condition can't be parsed or uses volatile names,
+            like `time`.
+        """
+        names = set()
+        for key, condition in self.conditions:
+            try:
+                names.update(get_expression_names(condition))
+            except CompileError:
+                return None
+        if names.intersection(VOLATILE_NAMES):
+            return None
+        return tuple(sorted(names.difference(DEFAULT_NAMES)))
+
+    def get_memo_key(self, values):
+        """
+        Build the memo key of the values of an evaluation.
+
+        Each value goes with its type, so `1`, `1.0` and `True` get
+        different results.
+
+        :returns: A hashable tuple or `None` if a value is not hashable.
+        """
+        try:
+            if self._get_row_values is None:
+                found = ()
+            elif len(self._row_names) == 1:
+                found = (self._get_row_values(values),)
+            else:
+                found = self._get_row_values(values)
+        except KeyError:
+            found = tuple(
+                values.get(name, _MISSING) for name in self._row_names
+            )
+        for name in self._current_names:
+            if name in values:
+                found += (values[name],)
+            else:
+                found += (CURRENT_VALUES[name](),)
+        key = found + tuple(map(type, found))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    @property
+    def values(self):
+        # Read on every access, parsers can be cached for days
+        return {
+            name: get_value() for name, get_value in CURRENT_VALUES.items()
+        }
 
     @property
     def involved_fields(self):
@@ -55,22 +299,85 @@ class ConditionParser(object):
             s.eval(condition)
         return fields_tracker.fields
 
-    def eval(self, values):
+    @timed('ooui_condition_eval')
+    def eval(self, values, budget=None):
+        """
+        Evaluate the condition.
+
+        :param dict values: The values of the names of the condition.
+        :param Budget budget: Optional limits of the evaluation, see
+            `ooui.helpers.budget`.
+
+        :returns: The key of the first true sentence or `None`.
+        :raises BudgetExceeded: If the evaluation exceeds the budget.
+        """
+        if not self.conditions:
+            return self.raw_condition
+        compiled = self.compiled
+        if budget is not None:
+            budget.check_size(*self.measure())
+            compiled = self.compile(budget)
+        key = None
+        if self.memo is not None:
+            key = self.get_memo_key(values)
+            if key is not None:
+                result = self.memo.get(key, _MISSING)
+                if result is not _MISSING:
+                    return result
+        if compiled is None:
+            result = self.interpret(values, budget)
+        else:
+            names = Names(self.compiled_functions, self.raw_condition)
+            names.update(self.values)
+            names.update(values)
+            names.update(DEFAULT_NAMES)
+            result = compiled(names)
+        if key is not None:
+            self.memo.set(key, result)
+        return result
+
+    def interpret(self, values, budget=None):
+        """
+        Evaluate the condition with the `simpleeval` interpreter.
+        """
         if not self.conditions:
             return self.raw_condition
         names = self.values.copy()
         names.update(values)
         names.update(DEFAULT_NAMES)
+        meter = None
+        if budget is not None:
+            budget.check_size(*self.measure())
+            meter = budget.start()
         for key, condition in self.conditions:
-            s = EvalWithCompoundTypes(
-                names=names, functions=self.functions, operators=self.operators
-            )
+            if meter is None:
+                s = EvalWithCompoundTypes(
+                    names=names, functions=self.functions,
+                    operators=self.operators
+                )
+            else:
+                s = BudgetEval(
+                    meter, names=names, functions=self.functions,
+                    operators=self.operators
+                )
             if s.eval(condition):
                 return key
 
     def __str__(self):
         return self.raw_condition
 
+    def __reduce__(self):
+        # The functions are modules, which can't be pickled, the compiled
+        # sentences are stored as marshalled code
+        compiled = None
+        if self.compiled is not None:
+            compiled = dump_compiled(
+                self.compiled, self.compiled_functions, self.operators
+            )
+        return load_condition_parser, (
+            self.raw_condition, self.conditions, self.memo_names, compiled
+        )
+
     @staticmethod
     def parse_condition(condition):
         conditions = []
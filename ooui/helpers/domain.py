@@ -5,6 +5,10 @@ import time
 import datetime
 import dateutil
 from simpleeval import EvalWithCompoundTypes, DEFAULT_OPERATORS, DEFAULT_NAMES
+from ooui.metrics import timed
+from ooui.helpers.cache import LRUCache
+from ooui.helpers.budget import BudgetEval, measure_expression
+from ooui.helpers.domain_filter import compile_domain
 
 
 EVAL_FUNCTIONS = {
@@ -15,6 +19,13 @@ EVAL_FUNCTIONS = {
     'dateutil': dateutil,
 }
 
+# Operators table shared by every domain, it must not be modified
+OPERATORS = DEFAULT_OPERATORS.copy()
+OPERATORS[ast.BitAnd] = operator.and_
+
+# Domains by their string, see `get_domain`
+DOMAIN_CACHE = LRUCache(maxsize=4096)
+
 
 class DotDict(dict):
     def __getattr__(self, name):
@@ -35,22 +46,47 @@ class Domain(object):
         if not isinstance(domain, six.string_types):
             domain = six.text_type(domain)
         self.domain = domain
+        self._size = None
+
+    @timed('ooui_domain_parse')
+    def parse(self, values=None, budget=None):
+        """
+        Evaluate the domain.
 
-    def parse(self, values=None):
+        :param dict values: The values of the names of the domain.
+        :param Budget budget: Optional limits of the evaluation, see
+            `ooui.helpers.budget`.
+
+        :raises BudgetExceeded: If the evaluation exceeds the budget.
+        """
         if values is None:
             values = {}
         # Hack to allow JSON domains
         values.update({'true': True, 'false': False, 'null': None})
 
-        operators = DEFAULT_OPERATORS.copy()
-        operators[ast.BitAnd] = operator.and_
         values = make_dotdict(values)
         values.update(DEFAULT_NAMES.copy())
-        s = EvalWithCompoundTypes(
-            names=values, functions=EVAL_FUNCTIONS, operators=operators
-        )
+        if budget is None:
+            s = EvalWithCompoundTypes(
+                names=values, functions=EVAL_FUNCTIONS, operators=OPERATORS
+            )
+        else:
+            if self._size is None:
+                self._size = measure_expression(self.domain)
+            budget.check_size(*self._size)
+            s = BudgetEval(
+                budget.start(), names=values, functions=EVAL_FUNCTIONS,
+                operators=OPERATORS
+            )
         return s.eval(self.domain)
 
+    def compile(self, values=None, budget=None):
+        """
+        Parse the domain and compile it to a function that tells if a record
+        matches it, see `ooui.helpers.domain_filter.compile_domain`.
+        """
+        return compile_domain(self.parse(values, budget))
+
     def __str__(self):
         return self.domain
 
@@ -59,3 +95,29 @@ class Domain(object):
 
     def __nonzero__(self):
         return self.__bool__()
+
+    def __reduce__(self):
+        return get_domain, (self.domain,)
+
+
+def get_domain(domain, unescape=False):
+    """
+    Retrieve the `Domain` of a string, shared by every caller with the same
+    string. The domains are immutable and the values are given when they are
+    parsed.
+
+    :param str domain: The domain.
+    :param bool unescape: Replace the HTML entities of the domain, as found
+        in the attributes of the views.
+
+    :rtype: Domain
+    """
+    key = (domain, unescape)
+    instance = DOMAIN_CACHE.get(key)
+    if instance is None:
+        if unescape:
+            from ooui.helpers import replace_entities
+            domain = replace_entities(domain)
+        instance = Domain(domain)
+        DOMAIN_CACHE.set(key, instance)
+    return instance
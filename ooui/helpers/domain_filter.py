@@ -0,0 +1,325 @@
+from __future__ import absolute_import, unicode_literals
+import operator
+import re
+import six
+
+
+DOMAIN_OPERATORS = ('&', '|', '!')
+
+UNSUPPORTED_OPERATORS = ('child_of', 'parent_of')
+
+INDEXED_OPERATORS = ('=', '==', 'in')
+
+COMPARISON_OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def is_many2one_value(value):
+    """
+    Check if a value is a many2one read as an `(id, name)` pair.
+    """
+    return (
+        isinstance(value, (list, tuple)) and len(value) == 2 and
+        isinstance(value[0], six.integer_types) and
+        not isinstance(value[0], bool)
+    )
+
+
+def is_null(value):
+    return value is None or value is False
+
+
+def _get_comparable(value, other):
+    # many2one values are compared by id, or by name with a text value
+    if is_many2one_value(value):
+        if isinstance(other, six.string_types):
+            return value[1]
+        return value[0]
+    return value
+
+
+def _like_to_regex(pattern, ignore_case):
+    regex = ''.join(
+        '.*' if char == '%' else '.' if char == '_' else re.escape(char)
+        for char in pattern
+    )
+    return re.compile('^{}$'.format(regex), re.DOTALL | (
+        re.IGNORECASE if ignore_case else 0
+    ))
+
+
+def _compile_leaf(leaf):
+    if len(leaf) != 3:
+        raise ValueError("Invalid domain leaf: {!r}".format(leaf))
+    name, op, value = leaf
+    op = op.lower()
+
+    # TRUE_LEAF and FALSE_LEAF
+    if name in (0, 1) and not isinstance(name, bool) and op == '=':
+        result = name == value
+        return lambda record: result
+
+    if op in UNSUPPORTED_OPERATORS:
+        raise ValueError(
+            "Domain operator {} can't be evaluated in memory".format(op)
+        )
+
+    if op in ('=', '==', '!=', '<>'):
+        if is_null(value):
+            def equals(record):
+                return is_null(record[name])
+        else:
+            def equals(record):
+                # Null values are not equal to any value, although
+                # `False == 0` in Python
+                current = record[name]
+                if is_null(current):
+                    return False
+                return _get_comparable(current, value) == value
+
+        if op in ('=', '=='):
+            return equals
+        return _make_not(equals)
+
+    if op in ('in', 'not in'):
+        if not isinstance(value, (list, tuple, set, frozenset)):
+            value = [value]
+        with_null = any(is_null(v) for v in value)
+        values = [v for v in value if not is_null(v)]
+        try:
+            values = frozenset(values)
+        except TypeError:
+            pass
+
+        def contains(record):
+            current = record[name]
+            if is_null(current):
+                return with_null
+            if is_many2one_value(current):
+                return current[0] in values or current[1] in values
+            return current in values
+
+        if op == 'in':
+            return contains
+        return lambda record: not contains(record)
+
+    if op in COMPARISON_OPERATORS:
+        compare = COMPARISON_OPERATORS[op]
+
+        def compare_record(record):
+            current = record[name]
+            if is_null(current):
+                return False
+            return compare(_get_comparable(current, value), value)
+
+        return compare_record
+
+    if op.endswith('like'):
+        negate = op.startswith('not ')
+        base = op[4:] if negate else op
+        if base not in ('like', 'ilike', '=like', '=ilike'):
+            raise ValueError("Unsupported domain operator: {}".format(op))
+        if is_null(value):
+            # Matches everything, as in the ORM
+            return lambda record: not negate
+        pattern = six.text_type(value)
+        if not base.startswith('='):
+            pattern = '%{}%'.format(pattern)
+        regex = _like_to_regex(pattern, ignore_case='ilike' in base)
+
+        def like(record):
+            current = record[name]
+            if is_null(current):
+                return negate
+            if is_many2one_value(current):
+                current = current[1]
+            return bool(regex.match(six.text_type(current))) != negate
+
+        return like
+
+    raise ValueError("Unsupported domain operator: {}".format(op))
+
+
+def _make_not(predicate):
+    return lambda record: not predicate(record)
+
+
+def _make_and(predicates):
+    def all_match(record):
+        for predicate in predicates:
+            if not predicate(record):
+                return False
+        return True
+    return all_match
+
+
+def _make_or(predicates):
+    def any_match(record):
+        for predicate in predicates:
+            if predicate(record):
+                return True
+        return False
+    return any_match
+
+
+def compile_domain(domain):
+    """
+    Compile a domain to a function that tells if a record matches it.
+
+    Domains are lists of `(field, operator, value)` leaves and the `&`, `|`
+    and `!` operators in prefix notation, with an implicit `&` between
+    consecutive expressions. Records are dictionaries as returned by `read`,
+    so many2one values are `(id, name)` pairs compared by id, or by name when
+    the domain value is a text.
+
+    :param list domain: The domain, already parsed, like the result of
+        `Domain.parse`.
+
+    :rtype: func
+    :returns: A function that receives a record and returns a boolean.
+
+    :raises ValueError: If the domain is not valid or uses an operator that
+        can't be evaluated in memory, like `child_of`.
+    """
+    stack = []
+    for item in reversed(list(domain)):
+        if item in DOMAIN_OPERATORS:
+            arity = 1 if item == '!' else 2
+            if len(stack) < arity:
+                raise ValueError("Invalid domain: {!r}".format(domain))
+            operands = [stack.pop() for _ in range(arity)]
+            if item == '!':
+                stack.append(_make_not(operands[0]))
+            elif item == '&':
+                stack.append(_make_and(operands))
+            else:
+                stack.append(_make_or(operands))
+        elif isinstance(item, (list, tuple)):
+            stack.append(_compile_leaf(item))
+        else:
+            raise ValueError("Invalid domain item: {!r}".format(item))
+
+    if not stack:
+        return lambda record: True
+    if len(stack) == 1:
+        return stack[0]
+    return _make_and(list(reversed(stack)))
+
+
+def filter_records(domain, records):
+    """
+    Filter records with a domain.
+
+    :param list domain: The domain, already parsed.
+    :param records: An iterable of records.
+
+    :rtype: list
+    :returns: The records that match the domain.
+    """
+    predicate = compile_domain(domain)
+    return [record for record in records if predicate(record)]
+
+
+class DomainIndex(object):
+    """
+    Filter the same records with several domains.
+
+    The records of the equality leaves (`=` and `in`) of conjunctive domains
+    are looked up in hash indexes, which are built for each field the first
+    time it is used. The rest of the domain is only evaluated on them.
+    """
+
+    def __init__(self, records):
+        self.records = list(records)
+        self._indexes = {}
+
+    def _get_index(self, name):
+        if name in self._indexes:
+            return self._indexes[name]
+        index = {}
+        for position, record in enumerate(self.records):
+            value = record[name]
+            if is_many2one_value(value):
+                keys = value
+            else:
+                keys = (value, )
+            for key in keys:
+                try:
+                    index.setdefault(key, []).append(position)
+                except TypeError:
+                    # Unhashable values can't be indexed
+                    index = None
+                    break
+            if index is None:
+                break
+        self._indexes[name] = index
+        return index
+
+    def _get_candidates(self, leaf):
+        if not isinstance(leaf, (list, tuple)) or len(leaf) != 3:
+            return None
+        name, op, value = leaf
+        if not isinstance(op, six.string_types) or op.lower() not in INDEXED_OPERATORS:
+            return None
+        if name in (0, 1) and not isinstance(name, bool):
+            return None
+        if op.lower() == 'in':
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                value = [value]
+        else:
+            value = [value]
+        keys = set()
+        try:
+            for key in value:
+                if is_null(key):
+                    keys.update((None, False))
+                else:
+                    keys.add(key)
+        except TypeError:
+            # Unhashable values are not looked up, every record is evaluated
+            return None
+        index = self._get_index(name)
+        if index is None:
+            return None
+        positions = set()
+        for key in keys:
+            try:
+                positions.update(index.get(key, ()))
+            except TypeError:
+                return None
+        return positions
+
+    def filter(self, domain):
+        """
+        Filter the records with a domain.
+
+        :param list domain: The domain, already parsed.
+
+        :rtype: list
+        :returns: The records that match the domain, in their order.
+        """
+        domain = list(domain)
+        predicate = compile_domain(domain)
+        candidates = None
+        if not any(item in ('|', '!') for item in domain):
+            for leaf in domain:
+                positions = self._get_candidates(leaf)
+                if positions is None:
+                    continue
+                if candidates is None:
+                    candidates = positions
+                else:
+                    candidates &= positions
+        if candidates is None:
+            return [record for record in self.records if predicate(record)]
+        return [
+            self.records[position] for position in sorted(candidates)
+            if predicate(self.records[position])
+        ]
+
+    def __len__(self):
+        return len(self.records)
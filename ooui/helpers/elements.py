@@ -0,0 +1,41 @@
+from __future__ import absolute_import, unicode_literals
+
+
+def dump_element(element):
+    """
+    Convert an lxml element to nested tuples that can be pickled.
+
+    Comments and processing instructions are discarded.
+
+    :param element: lxml.etree._Element
+    :rtype: tuple
+    :returns: A tuple with the tag, the attributes, the text, the tail and
+        the children of the element.
+    """
+    return (
+        element.tag, dict(element.attrib), element.text, element.tail,
+        [dump_element(child) for child in element if not callable(child.tag)]
+    )
+
+
+def load_element(data, parent=None):
+    """
+    Build an lxml element from the tuples returned by `dump_element` without
+    parsing any XML.
+
+    :param tuple data: The dumped element.
+    :param parent: Optional parent element of the new element.
+    :rtype: lxml.etree._Element
+    """
+    from lxml import etree
+
+    tag, attrib, text, tail, children = data
+    if parent is None:
+        element = etree.Element(tag, attrib)
+    else:
+        element = etree.SubElement(parent, tag, attrib)
+    element.text = text
+    element.tail = tail
+    for child in children:
+        load_element(child, element)
+    return element
@@ -1,13 +1,159 @@
 from lxml import etree
+from ooui.metrics import timed
+from ooui.helpers.xmlparser import parse_xml
 
+OUTPUT_FORMATS = ('unicode', 'bytes', 'element')
 
-def preprocess_feature_tags(xml_str, feature_checker):
-    doc = etree.fromstring(xml_str)
 
+@timed('ooui_preprocess_feature_tags')
+def preprocess_feature_tags(xml_str, feature_checker, output='unicode'):
+    """
+    Resolve the feature tags of a view.
+
+    :param xml_str: The view as bytes or text, or a parsed element, which is
+        modified in place.
+    :param feature_checker: Function that returns if a feature key is
+        active, called once for each distinct key, or an object with a
+        `check_features(keys)` method called once with all the distinct
+        keys, see `check_features`.
+    :param str output: `unicode` (default), `bytes` (UTF-8) or `element`, to
+        pass the result to `parse_graph` or `parse_tree` without serializing
+        and parsing it again.
+    """
+    doc = parse_feature_document(xml_str, output)
+    active_features = check_features(feature_checker, get_feature_keys(doc))
+    return apply_feature_tags(doc, active_features.__getitem__, output)
+
+
+class BatchFeatureChecker(object):
+    """
+    Feature checker that checks all the keys of a view with a single call.
+    """
+
+    def __init__(self, check_features, feature_checker=None):
+        """
+        :param func check_features: Function that receives a list of feature
+            keys and returns a dictionary with the active state of each one,
+            or a list in the same order.
+        :param func feature_checker: Optional function to check the keys
+            missing from the dictionary.
+        """
+        self.check_features = check_features
+        self.feature_checker = feature_checker
+
+
+def get_key_checker(feature_checker):
+    """
+    Retrieve the function to check a single key of a feature checker.
+    """
+    if isinstance(feature_checker, BatchFeatureChecker):
+        return feature_checker.feature_checker
+    if callable(feature_checker):
+        return feature_checker
+    return None
+
+
+def get_batch_checker(feature_checker):
+    """
+    Retrieve the batch method of a feature checker, if it has one.
+    """
+    return getattr(feature_checker, 'check_features', None)
+
+
+def get_active_features(keys, result, feature_checker=None):
+    """
+    Build the active state of each key from the result of a batch check.
+
+    :param list keys: The checked keys.
+    :param result: A dictionary with the state of the keys or a list with
+        the state of each key, in order.
+    :param func feature_checker: Optional function to check the keys missing
+        from the result, which are not active without it.
+
+    :rtype: dict
+    """
+    if not isinstance(result, dict):
+        result = list(result)
+        if len(result) != len(keys):
+            raise ValueError(
+                "Expected {} feature states, got {}".format(
+                    len(keys), len(result)
+                )
+            )
+        result = dict(zip(keys, result))
+    active_features = {}
+    for key in keys:
+        if key in result:
+            active_features[key] = bool(result[key])
+        elif feature_checker is not None:
+            active_features[key] = feature_checker(key)
+        else:
+            active_features[key] = False
+    return active_features
+
+
+def check_features(feature_checker, keys):
+    """
+    Check if each feature key is active.
+
+    Checkers with a `check_features(keys)` method are called once with all
+    the keys, and plain functions once for each key.
+
+    :param feature_checker: The feature checker.
+    :param list keys: The distinct feature keys.
+
+    :rtype: dict
+    :returns: If each key is active.
+    """
+    if not keys:
+        return {}
+    batch = get_batch_checker(feature_checker)
+    if batch is not None:
+        return get_active_features(
+            keys, batch(keys), get_key_checker(feature_checker)
+        )
+    return dict((key, feature_checker(key)) for key in keys)
+
+
+def parse_feature_document(xml_str, output='unicode'):
+    """
+    Parse a view to resolve its feature tags.
+
+    :raises ValueError: If the output format is not supported.
+    """
+    if output not in OUTPUT_FORMATS:
+        raise ValueError("Unsupported output: {}".format(output))
+    # The blank text is kept, the result is returned to the clients
+    return parse_xml(xml_str, remove_blank_text=False)
+
+
+def get_feature_keys(doc):
+    """
+    Retrieve the distinct feature keys of a view, in document order.
+
+    :rtype: list
+    """
+    keys = []
     for node in doc.xpath('//feature'):
         key = node.get('key')
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+def apply_feature_tags(doc, is_active, output='unicode'):
+    """
+    Keep the content of the feature tags whose condition is met and remove
+    the rest.
+
+    :param doc: The parsed view, which is modified in place.
+    :param func is_active: Function that returns if a feature key is active,
+        called with the key of each feature tag in document order.
+    :param str output: The output format, see `preprocess_feature_tags`.
+    """
+    for node in doc.xpath('//feature'):
         status = node.get('status', 'enabled')
-        active = feature_checker(key)
+        active = is_active(node.get('key'))
 
         if status == 'enabled':
             condition_met = active
@@ -24,4 +170,8 @@ def preprocess_feature_tags(xml_str, feature_checker):
         else:
             parent.remove(node)
 
+    if output == 'element':
+        return doc
+    elif output == 'bytes':
+        return etree.tostring(doc, encoding='utf-8')
     return etree.tostring(doc, encoding='unicode')
@@ -0,0 +1,56 @@
+from __future__ import absolute_import, unicode_literals
+import threading
+
+import six
+
+
+# lxml parsers can't be shared between threads, each one gets its own
+_local = threading.local()
+
+
+def get_xml_parser(remove_blank_text=True):
+    """
+    Retrieve the XML parser of the current thread.
+
+    The parser doesn't resolve entities and doesn't accept huge trees.
+
+    :param bool remove_blank_text: Remove the blank text between elements.
+
+    :rtype: lxml.etree.XMLParser
+    """
+    parsers = getattr(_local, 'parsers', None)
+    if parsers is None:
+        parsers = _local.parsers = {}
+    parser = parsers.get(remove_blank_text)
+    if parser is None:
+        from lxml import etree
+
+        parser = parsers[remove_blank_text] = etree.XMLParser(
+            remove_blank_text=remove_blank_text, resolve_entities=False,
+            huge_tree=False
+        )
+    return parser
+
+
+def parse_xml(xml, remove_blank_text=True):
+    """
+    Parse an XML document with a parser of the current thread.
+
+    :param xml: The document as bytes or text, or an element, which is
+        returned as it is.
+    :param bool remove_blank_text: Remove the blank text between elements.
+
+    :rtype: lxml.etree._Element
+    """
+    from lxml import etree
+
+    if etree.iselement(xml):
+        return xml
+    return etree.fromstring(xml, get_xml_parser(remove_blank_text))
+
+
+def is_xml_string(xml):
+    """
+    Check if a document is bytes or text instead of a parsed element.
+    """
+    return isinstance(xml, (six.binary_type, six.text_type))
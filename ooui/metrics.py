@@ -0,0 +1,227 @@
+from __future__ import absolute_import, unicode_literals
+import functools
+import threading
+import time
+
+try:
+    perf_counter = time.perf_counter
+except AttributeError:
+    perf_counter = time.time
+
+
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0
+)
+
+
+class NullMetrics(object):
+    """
+    Metrics registry that discards everything. It is the default registry,
+    so instrumented functions only pay for a flag check.
+    """
+    enabled = False
+
+    def increment(self, name, value=1):
+        pass
+
+    def observe(self, name, value):
+        pass
+
+
+class Histogram(object):
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry(object):
+    """
+    In-memory registry of counters and latency histograms.
+    """
+    enabled = True
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        :param tuple buckets: Upper bounds in seconds of the histogram buckets.
+        """
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def to_prometheus_text(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        :rtype: str
+        """
+        lines = []
+        with self._lock:
+            for name in sorted(self.counters):
+                lines.append('# TYPE {} counter'.format(name))
+                lines.append('{} {}'.format(name, self.counters[name]))
+            for name in sorted(self.histograms):
+                histogram = self.histograms[name]
+                lines.append('# TYPE {} histogram'.format(name))
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append('{}_bucket{{le="{}"}} {}'.format(
+                        name, _format_number(bound), cumulative
+                    ))
+                lines.append('{}_bucket{{le="+Inf"}} {}'.format(
+                    name, histogram.count
+                ))
+                lines.append('{}_sum {}'.format(
+                    name, _format_number(histogram.sum)
+                ))
+                lines.append('{}_count {}'.format(name, histogram.count))
+        return '\n'.join(lines) + '\n'
+
+
+class StatsdMetrics(object):
+    """
+    Registry that sends the metrics to a StatsD server using UDP.
+
+    Lines are buffered and sent in packets of up to `max_packet_size` bytes,
+    call `flush` to send the pending lines.
+    """
+    enabled = True
+
+    def __init__(self, host='127.0.0.1', port=8125, prefix=None,
+                 max_packet_size=512):
+        """
+        :param str host: The StatsD server host.
+        :param int port: The StatsD server port.
+        :param str prefix: Optional prefix added to every metric name.
+        :param int max_packet_size: Maximum size in bytes of each packet.
+        """
+        import socket
+
+        self.address = (host, port)
+        self.prefix = prefix
+        self.max_packet_size = max_packet_size
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._buffer = []
+        self._buffer_size = 0
+        self._lock = threading.Lock()
+
+    def _name(self, name):
+        if self.prefix:
+            return '{}.{}'.format(self.prefix, name)
+        return name
+
+    def increment(self, name, value=1):
+        self._add('{}:{}|c'.format(self._name(name), value))
+
+    def observe(self, name, value):
+        self._add('{}:{}|ms'.format(
+            self._name(name), _format_number(round(value * 1000, 3))
+        ))
+
+    def _add(self, line):
+        line = line.encode('utf-8')
+        with self._lock:
+            if self._buffer and (
+                    self._buffer_size + len(line) + 1 > self.max_packet_size):
+                self._send()
+            self._buffer.append(line)
+            self._buffer_size += len(line) + 1
+
+    def _send(self):
+        packet = b'\n'.join(self._buffer)
+        self._buffer = []
+        self._buffer_size = 0
+        try:
+            self._socket.sendto(packet, self.address)
+        except (IOError, OSError):
+            # Metrics must never break the instrumented code
+            pass
+
+    def flush(self):
+        """
+        Send the pending lines.
+        """
+        with self._lock:
+            if self._buffer:
+                self._send()
+
+    def close(self):
+        self.flush()
+        self._socket.close()
+
+
+_registry = NullMetrics()
+
+
+def get_registry():
+    """
+    Retrieve the metrics registry in use.
+    """
+    return _registry
+
+
+def set_registry(registry):
+    """
+    Set the metrics registry used by the instrumented functions.
+
+    :param registry: A registry like `MetricsRegistry` or `StatsdMetrics`.
+        `None` restores the default no-op registry.
+
+    :returns: The previous registry.
+    """
+    global _registry
+    previous = _registry
+    _registry = registry if registry is not None else NullMetrics()
+    return previous
+
+
+def timed(name):
+    """
+    Decorator that counts the calls of a function in `<name>_total` and
+    observes their latency in seconds in `<name>_seconds`.
+
+    :param str name: The base name of the metrics.
+    """
+    counter_name = '{}_total'.format(name)
+    histogram_name = '{}_seconds'.format(name)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            registry = _registry
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.increment(counter_name)
+                registry.observe(histogram_name, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _format_number(value):
+    return '{}'.format(value)
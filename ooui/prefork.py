@@ -0,0 +1,70 @@
+from __future__ import absolute_import, unicode_literals
+import gc
+import sys
+
+import six
+
+
+def warmup(views, freeze=True):
+    """
+    Parse views in the master process of a pre-fork server.
+
+    The views are parsed with `parse_graph` and `parse_tree`, so they stay in
+    their parse caches, and the conditions of the views are parsed to fill
+    the condition cache. The caches grow to fit every view and condition
+    parsed, so the workers don't parse them again.
+
+    With `freeze`, every object alive is moved to the permanent generation
+    of the garbage collector (Python 3.7+), so the collections of the forked
+    workers don't write to the pages of the cached views, and the caches are
+    frozen, so their lookups don't reorder them, see `LRUCache.freeze`. The
+    reference counts of the views a worker reads are still written.
+
+    :param views: An iterable of view archs (graph or tree XML) or parsed
+        views, like the ones of a `ViewBundle`.
+    :param bool freeze: Freeze the objects from the garbage collector.
+
+    :rtype: list
+    :returns: The parsed views.
+    """
+    from ooui.compile import parse_view
+
+    caches = _get_caches()
+    sizes = [cache.maxsize for cache in caches]
+    for cache in caches:
+        cache.resize(sys.maxsize)
+    parsed = []
+    try:
+        for view in views:
+            if isinstance(view, (six.text_type, six.binary_type)):
+                view = parse_view(view)
+            _warmup_conditions(view)
+            parsed.append(view)
+    finally:
+        for cache, size in zip(caches, sizes):
+            cache.resize(max(size, len(cache)))
+
+    gc.collect()
+    if freeze:
+        for cache in caches:
+            cache.freeze()
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+    return parsed
+
+
+def _get_caches():
+    from ooui import graph, tree
+    from ooui.helpers import conditions, domain
+
+    return [
+        graph.PARSE_CACHE, tree.PARSE_CACHE, conditions.PARSER_CACHE,
+        conditions.CONDITION_CACHE, conditions.COMPILED_CACHE,
+        domain.DOMAIN_CACHE
+    ]
+
+
+def _warmup_conditions(view):
+    # Trees parse their conditions when the involved fields are requested
+    if hasattr(view, 'fields_in_conditions'):
+        view.fields_in_conditions
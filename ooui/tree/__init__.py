@@ -1,16 +1,32 @@
 from __future__ import absolute_import, unicode_literals
+from ooui.metrics import timed
+from ooui.helpers.cache import LRUCache
+from ooui.helpers.xmlparser import parse_xml, is_xml_string
 from .base import Tree
 
+# Parsed trees by their XML. Trees are not modified once parsed, so the same
+# object is returned for the same XML.
+PARSE_CACHE = LRUCache(maxsize=1024)
 
+
+@timed('ooui_parse_tree')
 def parse_tree(xml):
     """
     Parse a tree from an XML string.
-    :param xml:
+    :param xml: The XML as bytes or text, or a parsed element
     :return:
     :rtype ooui.tree.Tree
     """
-    from lxml import etree
+    if not is_xml_string(xml):
+        return _parse_tree(xml)
+    tree = PARSE_CACHE.get(xml)
+    if tree is None:
+        tree = _parse_tree(xml)
+        PARSE_CACHE.set(xml, tree)
+    return tree
+
 
-    tree = etree.fromstring(xml)
+def _parse_tree(xml):
+    tree = parse_xml(xml)
     tree = tree.xpath('//tree')[0]
     return Tree(tree)
\ No newline at end of file
@@ -1,19 +1,55 @@
 from __future__ import absolute_import, unicode_literals
-from ooui.helpers.conditions import ConditionParser
+import ast
+
+from ooui.helpers import intern_string
+from ooui.helpers.elements import dump_element, load_element
+
+AGGREGATE_ATTRIBUTES = ('sum', 'avg', 'max', 'min', 'count')
+
+
+def get_precision(digits):
+    """
+    Retrieve the number of decimals of a `digits` attribute, like "(16, 2)"
+    or "2".
+    :param str digits:
+    :return: The number of decimals or None if it can't be parsed
+    """
+    try:
+        digits = ast.literal_eval(digits)
+    except (ValueError, SyntaxError):
+        return None
+    if isinstance(digits, (tuple, list)) and digits:
+        digits = digits[-1]
+    if isinstance(digits, int) and not isinstance(digits, bool):
+        return digits
+    return None
 
 
 class Tree(object):
+    __slots__ = (
+        '_string', '_infinite', '_colors', '_status', '_editable', '_element'
+    )
+
     def __init__(self, element):
         """
         :param element: lxml.etree._Element
         """
-        self._string = element.get('string')
-        self._infinite = element.get('infinite', None)
-        self._colors = element.get('colors', None)
-        self._status = element.get('status', None)
-        self._editable = element.get('editable', None)
+        self._string = intern_string(element.get('string'))
+        self._infinite = intern_string(element.get('infinite', None))
+        self._colors = intern_string(element.get('colors', None))
+        self._status = intern_string(element.get('status', None))
+        self._editable = intern_string(element.get('editable', None))
         self._element = element
 
+    def __getstate__(self):
+        state = dict((name, getattr(self, name)) for name in self.__slots__)
+        state['_element'] = dump_element(self._element)
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state, _element=load_element(state['_element']))
+        for name, value in state.items():
+            setattr(self, name, intern_string(value))
 
     @property
     def string(self):
@@ -30,13 +66,116 @@ class Tree(object):
             res.append(field)
         return res
 
+    @property
+    def aggregates(self):
+        """
+        Aggregates of the footer defined by the `sum`, `avg`, `max`, `min` and
+        `count` attributes of the fields.
+        :return: A dictionary with the label of each function by field
+        """
+        res = {}
+        for field in self.fields:
+            functions = dict(
+                (function, field.get(function))
+                for function in AGGREGATE_ATTRIBUTES
+                if field.get(function) is not None
+            )
+            if functions:
+                res[field.get('name')] = functions
+        return res
+
+    @property
+    def precisions(self):
+        """
+        Decimals of the aggregated fields with a `digits` attribute.
+        :return: A dictionary with the precision by field
+        """
+        aggregates = self.aggregates
+        res = {}
+        for field in self.fields:
+            name = field.get('name')
+            if name in aggregates and field.get('digits'):
+                precision = get_precision(field.get('digits'))
+                if precision is not None:
+                    res[name] = precision
+        return res
+
+    def aggregator(self, data=None):
+        """
+        Build an aggregator for the footer aggregates of the tree.
+        :param list data: Optional rows to aggregate with `process()`
+        :rtype: ooui.helpers.aggregated.Aggregator
+        """
+        from ooui.helpers.aggregated import Aggregator
+
+        field_definitions = dict(
+            (name, list(functions))
+            for name, functions in self.aggregates.items()
+        )
+        return Aggregator(data or [], field_definitions, self.precisions)
+
+    def row_decorator(self):
+        """
+        Build a function that evaluates the colors and status of a row.
+        :return: A function that returns a dictionary with the `color` and
+            `status` of a row, when the tree defines them
+        """
+        from ooui.helpers.conditions import get_condition_parser
+
+        decorators = []
+        if self._colors:
+            decorators.append(('color', get_condition_parser(self._colors)))
+        if self._status:
+            decorators.append(('status', get_condition_parser(self._status)))
+
+        def decorate(row):
+            return dict((key, parser.eval(row)) for key, parser in decorators)
+
+        return decorate
+
+    def cursor(self, max_pages=None):
+        """
+        Build a cursor to evaluate the rows of an infinite tree page by page.
+        :param int max_pages: Optional number of pages kept, older pages are
+            evicted when a new one is added
+        :rtype: ooui.tree.cursor.TreeCursor
+        """
+        from ooui.tree.cursor import TreeCursor
+
+        return TreeCursor(self, max_pages)
+
+    def process(self, rows, aggregator=None):
+        """
+        Evaluate the colors and status of each row and aggregate the footer
+        in a single pass over the rows.
+        :param rows: An iterable of rows
+        :param aggregator: Optional aggregator to accumulate the rows, as
+            returned by `aggregator()`. A new one is used by default.
+        :return: A dictionary with the `decorations` of each row (`color` and
+            `status` keys when the tree defines them) and the `aggregates`
+        """
+        if aggregator is None:
+            aggregator = self.aggregator()
+        decorate = self.row_decorator()
+
+        decorations = []
+        for row in rows:
+            decorations.append(decorate(row))
+            aggregator.add(row)
+        return {
+            'decorations': decorations,
+            'aggregates': aggregator.result(),
+        }
+
     @property
     def fields_in_conditions(self):
+        from ooui.helpers.conditions import get_condition_parser
+
         res = {}
         if self._colors:
-            parser = ConditionParser(self._colors)
+            parser = get_condition_parser(self._colors)
             res['colors'] = list(parser.involved_fields)
         if self._status:
-            parser = ConditionParser(self._status)
+            parser = get_condition_parser(self._status)
             res['status'] = list(parser.involved_fields)
         return res
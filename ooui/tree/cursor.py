@@ -0,0 +1,92 @@
+from __future__ import absolute_import, unicode_literals
+from collections import OrderedDict
+
+
+class TreeCursor(object):
+    """
+    Evaluate the rows of a tree page by page.
+
+    Only the rows of each new page are decorated and aggregated, and the
+    running aggregates keep the rows of the pages that are evicted, so the
+    cost of each page is proportional to its size.
+    """
+
+    def __init__(self, tree, max_pages=None):
+        """
+        :param ooui.tree.Tree tree: The tree of the rows.
+        :param int max_pages: Optional number of pages kept, older pages are
+            evicted when a new one is added.
+        """
+        if max_pages is not None and max_pages < 1:
+            raise ValueError("max_pages must be a positive number")
+        self.tree = tree
+        self.max_pages = max_pages
+        self.aggregator = tree.aggregator()
+        self.num_rows = 0
+        self._decorate = tree.row_decorator()
+        self._pages = OrderedDict()
+        self._next_page = 0
+
+    def add_page(self, rows):
+        """
+        Decorate and aggregate a new page of rows.
+
+        :param rows: An iterable with the rows of the page.
+
+        :rtype: dict
+        :returns: A dictionary with the `page` number, the `decorations` of
+            its rows and the `aggregates` of every row added so far.
+        """
+        decorations = []
+        for row in rows:
+            decorations.append(self._decorate(row))
+            self.aggregator.add(row)
+        self.num_rows += len(decorations)
+
+        page = self._next_page
+        self._next_page += 1
+        self._pages[page] = decorations
+        if self.max_pages is not None:
+            while len(self._pages) > self.max_pages:
+                self.evict()
+
+        return {
+            'page': page,
+            'decorations': decorations,
+            'aggregates': self.aggregates,
+        }
+
+    def evict(self, page=None):
+        """
+        Discard the decorations of a page. The aggregates still include its
+        rows.
+
+        :param int page: The page to evict, the oldest one by default.
+
+        :raises KeyError: If the page is not loaded.
+        """
+        if page is None:
+            if not self._pages:
+                raise KeyError("No pages loaded")
+            page = next(iter(self._pages))
+        del self._pages[page]
+
+    @property
+    def pages(self):
+        """
+        Numbers of the pages loaded.
+        """
+        return list(self._pages)
+
+    def get_decorations(self, page):
+        """
+        Retrieve the decorations of the rows of a loaded page.
+        """
+        return self._pages[page]
+
+    @property
+    def aggregates(self):
+        """
+        Footer aggregates of every row added, including the evicted pages.
+        """
+        return self.aggregator.result()
@@ -27,6 +27,26 @@ with description('Aggregator class'):
             expect(results['value']['max']).to(equal(20))
             expect(results['value']['min']).to(equal(10))
 
+        with it('counts values that are not numbers'):
+            data = [{'name': 'a'}, {'name': 'b'}]
+            aggregator = Aggregator(data, {'name': ['count']})
+
+            expect(aggregator.process()).to(equal({'name': {'count': 2}}))
+
+        with it('counts empty values and many2one pairs'):
+            data = [{'partner': None}, {'partner': [1, 'A']}, {'partner': None}]
+            aggregator = Aggregator(data, {'partner': ['count']})
+
+            expect(aggregator.process()).to(equal({'partner': {'count': 3}}))
+
+        with it('compares the values without adding them for max and min'):
+            data = [{'name': 'b'}, {'name': 'a'}, {'name': 'c'}]
+            aggregator = Aggregator(data, {'name': ['max', 'min']})
+
+            expect(aggregator.process()).to(equal({
+                'name': {'max': 'c', 'min': 'a'}
+            }))
+
     with context('Using precision in aggregation'):
 
         with it('should use the precision for the field'):
@@ -46,3 +66,18 @@ with description('Aggregator class'):
             results = aggregator.process()
 
             expect(str(results['value']['sum'])).to(equal(str(60)))
+
+    with context('accumulating rows in batches'):
+        with it('should aggregate every batch in a single pass'):
+            aggregator = Aggregator([], {'value': ['sum', 'count', 'min']})
+            aggregator.update([{'value': 10}, {'value': 20}])
+            aggregator.update(iter([{'value': 5}, {}]))
+
+            expect(aggregator.result()).to(equal({
+                'value': {'sum': 35, 'count': 3, 'min': 5}
+            }))
+
+        with it('should not count the data twice when processed again'):
+            aggregator = Aggregator([{'value': 1}], {'value': ['sum']})
+            aggregator.process()
+            expect(aggregator.process()).to(equal({'value': {'sum': 1}}))
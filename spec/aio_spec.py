@@ -0,0 +1,138 @@
+from mamba import description, context, it
+from expects import *
+import asyncio
+
+from ooui.aio import (
+    Coalescer, collect_values, process_graph_data_async,
+    process_dashboard_async, preprocess_feature_tags_async
+)
+from ooui.graph import parse_graph
+from ooui.graph.dashboard import process_dashboard
+from ooui.helpers.features import (
+    preprocess_feature_tags, BatchFeatureChecker
+)
+
+XML = '''<graph type="bar">
+    <field name="meter" axis="x"/>
+    <field name="value" operator="+" axis="y"/>
+</graph>'''
+
+FIELDS = {
+    'meter': {'type': 'char', 'string': 'Meter'},
+    'value': {'type': 'float', 'string': 'Value'},
+}
+
+VALUES = [
+    {'meter': 'AB'[index % 2], 'value': index} for index in range(100)
+]
+
+
+async def iter_values(reads):
+    reads.append(1)
+    for value in VALUES:
+        await asyncio.sleep(0)
+        yield value
+
+
+with description('Async processing'):
+    with it('should collect async iterators, awaitables and iterables'):
+        async def collect():
+            async def records():
+                return iter(VALUES)
+            return (
+                await collect_values(iter_values([])),
+                await collect_values(records()),
+                await collect_values(iter(VALUES)),
+            )
+        for result in asyncio.run(collect()):
+            expect(result).to(equal(VALUES))
+
+    with it('should process graphs from async iterators'):
+        result = asyncio.run(
+            process_graph_data_async(XML, iter_values([]), FIELDS)
+        )
+        expect(result).to(equal(parse_graph(XML).process(VALUES, FIELDS)))
+
+    with context('when the same graph and data version are in flight'):
+        with it('should coalesce them in a single computation'):
+            reads = []
+            coalescer = Coalescer()
+
+            async def run():
+                results = await asyncio.gather(*[
+                    process_graph_data_async(
+                        XML, iter_values(reads), FIELDS, data_version=version,
+                        coalescer=coalescer
+                    ) for version in (1, 1, 1, 2)
+                ])
+                return results
+
+            results = asyncio.run(run())
+            expect(reads).to(have_length(2))
+            expect(results[0]).to(be(results[1]))
+            expect(results[0]).to(equal(results[3]))
+            expect(coalescer).to(have_length(0))
+
+        with it('should not cancel the computation with a waiter'):
+            coalescer = Coalescer()
+
+            async def slow():
+                await asyncio.sleep(0.01)
+                return 42
+
+            async def run():
+                first = asyncio.ensure_future(coalescer.run('key', slow))
+                second = asyncio.ensure_future(coalescer.run('key', slow))
+                await asyncio.sleep(0)
+                first.cancel()
+                return await second
+
+            expect(asyncio.run(run())).to(equal(42))
+
+    with it('should process dashboards with async fetches'):
+        items = [
+            {'graph': XML, 'model': 'meter.reading'},
+            {'graph': XML.replace('"+"', '"max"'), 'model': 'meter.reading'},
+        ]
+        reads = []
+
+        async def fetch(model, domain, fields):
+            return iter_values(reads), FIELDS
+
+        results = asyncio.run(process_dashboard_async(items, fetch))
+        expect(reads).to(have_length(1))
+        expect(results).to(equal(process_dashboard(
+            items, lambda model, domain, fields: (VALUES, FIELDS)
+        )))
+
+    with it('should check the features concurrently'):
+        xml = '''<form>
+            <feature key="a"><field name="a"/></feature>
+            <feature key="b"><field name="b"/></feature>
+            <feature key="a" status="disabled"><field name="c"/></feature>
+        </form>'''
+        checks = []
+
+        async def checker(key):
+            checks.append(key)
+            await asyncio.sleep(0)
+            return key == 'a'
+
+        result = asyncio.run(preprocess_feature_tags_async(xml, checker))
+        expect(checks).to(equal(['a', 'b']))
+        expect(result).to(equal(
+            preprocess_feature_tags(xml, lambda key: key == 'a')
+        ))
+
+    with it('should check the features with an async batch checker'):
+        xml = '<form><feature key="a"><field name="a"/></feature></form>'
+        calls = []
+
+        async def check(keys):
+            calls.append(keys)
+            return {}
+
+        checker = BatchFeatureChecker(check, lambda key: True)
+        result = asyncio.run(preprocess_feature_tags_async(xml, checker))
+        expect(calls).to(equal([['a']]))
+        expect(result).to(equal(preprocess_feature_tags(xml, bool)))
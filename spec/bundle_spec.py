@@ -0,0 +1,145 @@
+from mamba import description, context, it, before, after
+from expects import *
+import os
+import shutil
+import sys
+import tempfile
+
+from six import StringIO
+
+from lxml import etree
+
+from ooui.bundle import ViewBundle, write_bundle
+from ooui.compile import compile_views, main
+from ooui.graph import parse_graph, PARSE_CACHE as GRAPH_CACHE
+from ooui.tree import parse_tree, PARSE_CACHE as TREE_CACHE
+
+VIEWS = {
+    'sales/monthly.xml': '''<?xml version="1.0"?>
+<graph type="line" timerange="month">
+    <field name="date" axis="x"/>
+    <field name="amount" operator="+" axis="y"/>
+</graph>''',
+    'indicator.xml': '''<graph type="indicatorField" color="red:value&gt;10">
+    <field name="amount" operator="+"/>
+</graph>''',
+    'readings.xml': '''<tree string="Readings" colors="red:value&lt;0">
+    <field name="date"/>
+    <!-- comment -->
+    <field name="value" sum="Total"/>
+</tree>''',
+    'README.txt': 'Not a view',
+}
+
+FIELDS = {
+    'date': {'type': 'date', 'string': 'Date'},
+    'amount': {'type': 'float', 'string': 'Amount'},
+}
+
+VALUES = [
+    {'date': '2024-01-02', 'amount': 3},
+    {'date': '2024-03-02', 'amount': 4},
+]
+
+
+with description('View bundles'):
+    with before.each:
+        self.src = tempfile.mkdtemp()
+        for name, xml in VIEWS.items():
+            path = os.path.join(self.src, name)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as view_file:
+                view_file.write(xml)
+        self.out = os.path.join(self.src, 'views.bundle')
+
+    with after.each:
+        shutil.rmtree(self.src)
+
+    with it('should compile every XML view of a directory'):
+        stdout = sys.stdout
+        sys.stdout = output = StringIO()
+        try:
+            expect(main([self.src, self.out])).to(equal(0))
+        finally:
+            sys.stdout = stdout
+        expect(output.getvalue()).to(contain('Compiled 3 views'))
+        with ViewBundle(self.out) as bundle:
+            expect(sorted(bundle.keys())).to(equal(
+                ['indicator', 'readings', 'sales/monthly']
+            ))
+            expect('indicator' in bundle).to(be_true)
+            expect(bundle).to(have_length(3))
+
+    with it('should load views that work as the parsed ones'):
+        write_bundle(self.out, compile_views(self.src))
+        original_fromstring = etree.fromstring
+
+        def fail(*args, **kwargs):
+            raise AssertionError('XML parsed while loading the bundle')
+
+        etree.fromstring = fail
+        try:
+            bundle = ViewBundle(self.out)
+            chart = bundle.get('sales/monthly')
+            indicator = bundle['indicator']
+            tree = bundle['readings']
+        finally:
+            etree.fromstring = original_fromstring
+
+        expected = parse_graph(VIEWS['sales/monthly.xml'])
+        expect(chart.process(VALUES, FIELDS)).to(
+            equal(expected.process(VALUES, FIELDS))
+        )
+        expect(indicator.fields).to(equal(['amount']))
+        expect(indicator.color.eval({'value': 11})).to(equal('red'))
+        expect(tree.string).to(equal('Readings'))
+        expect([f.get('name') for f in tree.fields]).to(
+            equal(['date', 'value'])
+        )
+        expect(tree.fields_in_conditions).to(equal({'colors': ['value']}))
+        expect(bundle.get('readings')).to(be(tree))
+        bundle.close()
+
+    with it('should raise KeyError for unknown views'):
+        write_bundle(self.out, {'tree': parse_tree('<tree/>')})
+        with ViewBundle(self.out) as bundle:
+            expect(lambda: bundle['other']).to(raise_error(KeyError))
+
+    with it('should not write repeated keys'):
+        tree = parse_tree('<tree/>')
+        expect(lambda: write_bundle(
+            self.out, [('tree', tree), ('tree', tree)]
+        )).to(raise_error(ValueError))
+
+    with it('should not open files that are not bundles'):
+        path = os.path.join(self.src, 'README.txt')
+        with open(path, 'w') as other:
+            other.write('Not a view bundle at all')
+        expect(lambda: ViewBundle(path)).to(raise_error(ValueError))
+
+    with it('should parse each view once with the thread parser'):
+        GRAPH_CACHE.clear()
+        TREE_CACHE.clear()
+        original_fromstring = etree.fromstring
+        parsed = []
+
+        def fromstring(text, parser=None):
+            parsed.append(parser)
+            return original_fromstring(text, parser)
+
+        etree.fromstring = fromstring
+        try:
+            views = dict(compile_views(self.src))
+        finally:
+            etree.fromstring = original_fromstring
+        expect(parsed).to(have_length(len(views)))
+        expect(parsed).not_to(contain(None))
+
+    with context('when a view is not a graph nor a tree'):
+        with it('should raise a ValueError with its path'):
+            with open(os.path.join(self.src, 'form.xml'), 'w') as view_file:
+                view_file.write('<form/>')
+            expect(lambda: list(compile_views(self.src))).to(
+                raise_error(ValueError, contain('form.xml'))
+            )
@@ -1,8 +1,9 @@
 # test_get_y_axis_fieldname.py
 from mamba import description, context, it
-from expects import expect, equal
+from expects import expect, equal, be, be_false, raise_error, have_length
+import pickle
 
-from ooui.graph.axis import get_y_axis_fieldname, GraphYAxis
+from ooui.graph.axis import get_y_axis_fieldname, GraphXAxis, GraphYAxis
 
 
 with description('Testing get_y_axis_fieldname') as self:
@@ -27,3 +28,31 @@ with description('Testing get_y_axis_fieldname') as self:
 
             field_name = get_y_axis_fieldname(y_axis, fields_data)
             expect(field_name).to(equal('inventory'))
+
+
+with description('Testing the axis objects'):
+    with it('should be immutable'):
+        y_axis = GraphYAxis('sales', '+')
+        def set_name():
+            y_axis._name = 'other'
+        expect(set_name).to(raise_error(AttributeError))
+        expect(hasattr(y_axis, '__dict__')).to(be_false)
+
+    with it('should compare and hash by value'):
+        y_axis = GraphYAxis('sales', '+', 'period', 'a')
+        expect(y_axis).to(equal(GraphYAxis('sales', '+', 'period', 'a')))
+        expect(y_axis == GraphYAxis('sales', 'max')).to(be_false)
+        expect(GraphXAxis('sales') == GraphYAxis('sales', '+')).to(be_false)
+        expect({y_axis, GraphYAxis('sales', '+', 'period', 'a')}).to(
+            have_length(1)
+        )
+
+    with it('should intern the names'):
+        name = ''.join(['sal', 'es'])
+        expect(GraphXAxis(name).name).to(be(GraphYAxis('sales', '+').name))
+
+    with it('should be pickled'):
+        y_axis = GraphYAxis('sales', 'avg', 'period')
+        expect(pickle.loads(pickle.dumps(y_axis))).to(equal(y_axis))
+        x_axis = GraphXAxis('date')
+        expect(pickle.loads(pickle.dumps(x_axis))).to(equal(x_axis))
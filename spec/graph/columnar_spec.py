@@ -0,0 +1,212 @@
+# coding: utf-8
+from mamba import description, context, it
+from expects import *
+import os
+import sys
+
+from ooui.graph import parse_graph
+from ooui.graph.columnar import ColumnarData, get_columnar_values
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+mock_data_dir = os.path.join(current_dir, 'mock')
+if mock_data_dir not in sys.path:
+    sys.path.insert(0, mock_data_dir)
+
+from lectura import Lectura  # NOQA
+from polissa import Polissa  # NOQA
+
+models = {'polissa': Polissa, 'lectura': Lectura}
+
+
+def get_both_formats(xml, model):
+    """
+    Process a graph with the records and the columnar formats
+    :param str xml: xml content
+    :param str model: model name 'lectura' or 'polissa'
+    :return: tuple with the records and the columnar results
+    """
+    g = parse_graph(xml)
+    records = g.process(models[model].data, models[model].fields)
+    columnar = g.process(
+        models[model].data, models[model].fields,
+        options={'format': 'columnar'}
+    )
+    return records, columnar
+
+
+def columnar_to_records(data):
+    """
+    Flatten a columnar data into a set of (x, type, stacked, value) tuples
+    """
+    res = set()
+    for series in data['series']:
+        for x, value in zip(data['x'], series['values']):
+            if value is not None:
+                res.add((x, series['type'], series['stacked'], value))
+    return res
+
+
+def records_to_set(data):
+    return set((d['x'], d['type'], d['stacked'], d['value']) for d in data)
+
+
+def columnar_to_records_by_operator(data):
+    res = set()
+    for series in data['series']:
+        for x, value in zip(data['x'], series['values']):
+            if value is not None:
+                res.add((x, series['type'], series['operator'], value))
+    return res
+
+
+def records_to_set_by_operator(data):
+    return set((d['x'], d['type'], d['operator'], d['value']) for d in data)
+
+
+with description('Columnar format for charts'):
+
+    with context('when processing a chart with labels and stacks'):
+        with it('should have the same values as the records format'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="bar">
+                <field name="name" axis="x"/>
+                <field name="consum" operator="+" label="periode" axis="y" stacked="entrada" />
+                <field name="generacio" operator="+" label="periode" axis="y" stacked="sortida" />
+            </graph>'''
+            records, columnar = get_both_formats(xml, 'lectura')
+
+            expect(columnar['format']).to(equal('columnar'))
+            expect(columnar['isGroup']).to(equal(records['isGroup']))
+            expect(columnar['isStack']).to(equal(records['isStack']))
+            expect(columnar['num_items']).to(equal(records['num_items']))
+            expect(columnar_to_records(columnar['data'])).to(
+                equal(records_to_set(records['data']))
+            )
+
+        with it('should have the series metadata once'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="bar">
+                <field name="name" axis="x"/>
+                <field name="consum" operator="+" axis="y"/>
+                <field name="ajust" operator="+" axis="y"/>
+            </graph>'''
+            records, columnar = get_both_formats(xml, 'lectura')
+            data = columnar['data']
+
+            expect(data['series']).to(have_length(2))
+            expect(data['series'][0]).to(have_keys(
+                type='Consum', operator='+', stacked=None
+            ))
+            expect(data['x']).to(equal(sorted(set(d['x'] for d in records['data']))))
+            for series in data['series']:
+                expect(series['values']).to(have_length(len(data['x'])))
+
+    with context('when two y axes have the same series name'):
+        with it('should keep a series for each axis like the records format'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="bar">
+                <field name="name" axis="x"/>
+                <field name="consum" operator="+" axis="y"/>
+                <field name="consum" operator="max" axis="y"/>
+            </graph>'''
+            records, columnar = get_both_formats(xml, 'lectura')
+            data = columnar['data']
+
+            expect([s['operator'] for s in data['series']]).to(
+                equal(['+', 'max'])
+            )
+            expect(columnar_to_records_by_operator(data)).to(
+                equal(records_to_set_by_operator(records['data']))
+            )
+
+    with context('when processing a chart with a timerange'):
+        with it('should fill the gaps like the records format'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="line" timerange="day">
+                <field name="data_alta" axis="x"/>
+                <field name="data_alta" operator="count" axis="y"/>
+            </graph>'''
+            records, columnar = get_both_formats(xml, 'polissa')
+
+            expect(columnar['data']['x']).to(
+                equal([d['x'] for d in records['data']])
+            )
+            expect(columnar_to_records(columnar['data'])).to(
+                equal(records_to_set(records['data']))
+            )
+            expect(columnar['yAxisProps']).to(equal(records['yAxisProps']))
+
+        with it('should fill the gaps of each series with an interval'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="line" timerange="week" interval="2">
+                <field name="data_alta" axis="x"/>
+                <field name="data_alta" operator="count" label="tarifa" axis="y"/>
+            </graph>'''
+            records, columnar = get_both_formats(xml, 'polissa')
+
+            expect(columnar_to_records(columnar['data'])).to(
+                equal(records_to_set(records['data']))
+            )
+
+        with it('should keep max_points values of each series'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="line" timerange="month">
+                <field name="data_alta" axis="x"/>
+                <field name="data_alta" operator="count" label="tarifa" axis="y"/>
+            </graph>'''
+            g = parse_graph(xml)
+            records = g.process(
+                Polissa.data, Polissa.fields, options={'max_points': 5}
+            )
+            columnar = g.process(
+                Polissa.data, Polissa.fields,
+                options={'max_points': 5, 'format': 'columnar'}
+            )
+
+            for series in columnar['data']['series']:
+                informed = [v for v in series['values'] if v is not None]
+                expect(len(informed)).to(be_below_or_equal(5))
+            expect(columnar_to_records(columnar['data'])).to(
+                equal(records_to_set(records['data']))
+            )
+
+    with context('when processing a pie chart'):
+        with it('should use the uninformed string and sort by value'):
+            xml = """<?xml version="1.0"?>
+            <graph type="pie">
+              <field name="llista_preu" axis="x"/>
+              <field name="llista_preu" operator="count" axis="y"/>
+            </graph>
+            """
+            records, columnar = get_both_formats(xml, 'polissa')
+            data = columnar['data']
+
+            expect(data['x']).to(contain('Not informed'))
+            expect(data['series'][0]['values']).to(equal(
+                sorted(data['series'][0]['values'], reverse=True)
+            ))
+            expect(columnar_to_records(data)).to(
+                equal(records_to_set(records['data']))
+            )
+
+
+with description('Testing ColumnarData') as self:
+    with it('should leave positions without values as None'):
+        columns = ColumnarData()
+        columns.add('a', 1, 'A', '+', None)
+        columns.add('b', 2, 'B', '+', None)
+        data = columns.build()
+
+        expect(data['x']).to(equal(['a', 'b']))
+        expect(data['series'][0]['values']).to(equal([1, None]))
+        expect(data['series'][1]['values']).to(equal([None, 2]))
+        expect(get_columnar_values(data)).to(equal([1, 2]))
+
+    with it('should downsample keeping the same x for all the series'):
+        columns = ColumnarData()
+        for i in range(100):
+            columns.add(i, i % 10, 'A', '+', None)
+        data = columns.build(max_points=20)
+
+        expect(data['x']).to(have_length(20))
+        expect(data['series'][0]['values']).to(have_length(20))
@@ -0,0 +1,123 @@
+from mamba import description, context, it, before
+from expects import *
+import os
+import sys
+
+from ooui.graph import parse_graph
+from ooui.graph.dashboard import Dashboard, process_dashboard
+from ooui.helpers.domain_filter import filter_records
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+mock_data_dir = os.path.join(current_dir, 'mock')
+if mock_data_dir not in sys.path:
+    sys.path.insert(0, mock_data_dir)
+
+from polissa import Polissa  # NOQA
+
+BAR = '''<graph type="bar">
+    <field name="tarifa" axis="x"/>
+    <field name="potencia" operator="+" axis="y"/>
+</graph>'''
+
+PIE = '''<graph type="pie">
+    <field name="tarifa" axis="x"/>
+    <field name="potencia" operator="max" axis="y"/>
+</graph>'''
+
+LINE = '''<graph type="line">
+    <field name="distribuidora" axis="x"/>
+    <field name="tensio" operator="avg" axis="y"/>
+</graph>'''
+
+INDICATOR = '''<graph type="indicatorField" showPercent="1"
+        totalDomain="[('state', '!=', state)]">
+    <field name="potencia" operator="+"/>
+</graph>'''
+
+COUNTER = '''<graph type="indicator" totalDomain="[]"/>'''
+
+COUNT = '''<graph type="bar">
+    <field name="state" axis="x"/>
+    <field name="tarifa" operator="count" axis="y"/>
+</graph>'''
+
+
+def fetch(calls):
+    def read(model, domain, fields):
+        calls.append((model, domain, fields))
+        return filter_records(domain, Polissa.data), Polissa.fields
+    return read
+
+
+with description('Processing a dashboard'):
+    with before.each:
+        self.items = [
+            {'graph': BAR, 'model': 'giscedata.polissa'},
+            {'graph': PIE, 'model': 'giscedata.polissa'},
+            {'graph': LINE, 'model': 'giscedata.polissa'},
+            {'graph': INDICATOR, 'model': 'giscedata.polissa',
+             'domain': [('tarifa', '=', '2.0A')],
+             'context': {'state': 'baixa'}},
+            {'graph': COUNTER, 'model': 'giscedata.polissa',
+             'domain': [('tarifa', '=', '2.0A')]},
+        ]
+
+    with it('should read each dataset once with the union of its fields'):
+        calls = []
+        process_dashboard(self.items, fetch(calls))
+
+        # The empty totalDomain of the counter is the dataset of the charts
+        expect(calls).to(have_length(3))
+        expect(calls[0][2]).to(equal(['tarifa', 'potencia', 'distribuidora', 'tensio']))
+        datasets = Dashboard(self.items).datasets
+        expect([d['domain'] for d in datasets.values()]).to(contain(
+            [('state', '!=', 'baixa')]
+        ))
+
+    with it('should read the definitions of the count axes'):
+        def read(model, domain, fields):
+            definitions = dict(
+                (name, Polissa.fields[name]) for name in fields
+            )
+            return Polissa.data, definitions
+
+        items = [{'graph': COUNT, 'model': 'giscedata.polissa'}]
+        expect(list(Dashboard(items).datasets.values())[0]['fields']).to(
+            equal(['state', 'tarifa'])
+        )
+        result = process_dashboard(items, read)[0]
+        expect(result).to(equal(
+            parse_graph(COUNT).process(Polissa.data, Polissa.fields)
+        ))
+
+    with it('should give the same results as processing each graph'):
+        results = process_dashboard(self.items, fetch([]))
+
+        for item, result in zip(self.items[:3], results):
+            expected = parse_graph(item['graph']).process(
+                Polissa.data, Polissa.fields
+            )
+            expect(result).to(equal(expected))
+
+        total_values = filter_records([('state', '!=', 'baixa')], Polissa.data)
+        values = filter_records([('tarifa', '=', '2.0A')], Polissa.data)
+        expect(results[3]).to(equal(parse_graph(INDICATOR).process(
+            values, Polissa.fields, total_values
+        )))
+        expect(results[4]).to(have_keys(
+            value=len(values), total=len(Polissa.data)
+        ))
+
+    with it('should apply the shared and the graph options'):
+        self.items[0]['options'] = {'format': 'columnar'}
+        results = process_dashboard(
+            self.items[:2], fetch([]), options={'uninformedString': 'None'}
+        )
+        expect(results[0]['format']).to(equal('columnar'))
+        expect(results[1]).not_to(have_key('format'))
+
+    with context('when a chart is approximate'):
+        with it('should not share the grouping'):
+            self.items[0]['options'] = {'approximate': {'seed': 1}}
+            results = process_dashboard(self.items[:1], fetch([]))
+            expect(results[0]['approximate']).to(be_true)
@@ -0,0 +1,84 @@
+from mamba import description, context, it
+from expects import *
+
+from ooui.graph import parse_graph
+from ooui.graph.downsample import get_lttb_indexes, downsample_data
+
+
+with description('Testing get_lttb_indexes') as self:
+    with context('when the series is smaller than max_points'):
+        with it('should keep all the points'):
+            indexes = list(get_lttb_indexes([1, 2, 3], 10))
+            expect(indexes).to(equal([0, 1, 2]))
+
+    with context('when the series is bigger than max_points'):
+        with it('should keep max_points points including first and last'):
+            series = [i % 7 for i in range(1000)]
+            indexes = list(get_lttb_indexes(series, 50))
+            expect(indexes).to(have_length(50))
+            expect(indexes[0]).to(equal(0))
+            expect(indexes[-1]).to(equal(999))
+            expect(sorted(indexes)).to(equal(indexes))
+
+        with it('should keep the peaks of the series'):
+            series = [0] * 500
+            series[250] = 100
+            indexes = list(get_lttb_indexes(series, 10))
+            expect(indexes).to(contain(250))
+
+        with it('should use the key to get the value of each point'):
+            series = [{'value': 0} for _ in range(100)]
+            series[42]['value'] = -50
+            indexes = list(
+                get_lttb_indexes(series, 5, key=lambda v: v['value'])
+            )
+            expect(indexes).to(contain(42))
+
+    with context('when max_points is lower than 3'):
+        with it('should keep only the first and last points'):
+            expect(list(get_lttb_indexes(range(10), 2))).to(equal([0, 9]))
+            expect(list(get_lttb_indexes(range(10), 1))).to(equal([0]))
+
+    with context('when max_points is not positive'):
+        with it('should raise a ValueError'):
+            expect(lambda: list(get_lttb_indexes([1, 2], 0))).to(
+                raise_error(ValueError)
+            )
+
+
+with description('Testing downsample_data') as self:
+    with it('should downsample every series on its own'):
+        values = []
+        for i in range(200):
+            values.append({'x': i, 'value': i, 'type': 'A', 'stacked': None})
+        for i in range(20):
+            values.append({'x': i, 'value': i, 'type': 'B', 'stacked': None})
+
+        result = downsample_data(values, 50)
+        expect([v for v in result if v['type'] == 'A']).to(have_length(50))
+        expect([v for v in result if v['type'] == 'B']).to(have_length(20))
+
+    with it('should be applied by a chart when max_points is given'):
+        xml = '''<?xml version="1.0"?>
+        <graph type="line" timerange="day">
+            <field name="date" axis="x"/>
+            <field name="value" operator="+" axis="y"/>
+        </graph>'''
+        fields = {
+            'date': {'type': 'date', 'string': 'Date'},
+            'value': {'type': 'float', 'string': 'Value'},
+        }
+        values = [
+            {'date': '2020-01-{:02d}'.format(day), 'value': day}
+            for day in range(1, 32)
+        ]
+        graph = parse_graph(xml)
+
+        result = graph.process(values, fields, options={'max_points': 10})
+        data = result['data']
+        expect(data).to(have_length(10))
+        expect(data[0]['x']).to(equal('2020-01-01'))
+        expect(data[-1]['x']).to(equal('2020-01-31'))
+
+        result = graph.process(values, fields)
+        expect(result['data']).to(have_length(31))
@@ -1,8 +1,10 @@
 from mamba import *
 from expects import *
 from ooui.graph.fields import (
-    get_fields_to_retrieve, get_value_and_label_for_field,
-    get_value_for_operator, round_number
+    get_fields_to_retrieve, get_processed_fields,
+    get_value_and_label_for_field,
+    get_value_for_operator, round_number, OperatorAccumulator,
+    ACCUMULATED_OPERATORS
 )
 from ooui.graph import parse_graph
 
@@ -36,6 +38,33 @@ with description('Graph fields utils'):
             graph = parse_graph(xml)
             expect(graph.fields).to(be_empty)
 
+    with describe('Testing get_processed_fields'):
+        with it('should add the fields of the count axes'):
+            xml = """<?xml version="1.0"?>
+            <graph type="bar">
+              <field name="state" axis="x"/>
+              <field name="id" operator="count" axis="y"/>
+              <field name="consum" operator="+" label="periode" axis="y"/>
+            </graph>
+            """
+            g = parse_graph(xml)
+            expect(get_fields_to_retrieve(g)).to(
+                equal(['state', 'consum', 'periode'])
+            )
+            expect(get_processed_fields(g)).to(
+                equal(['state', 'consum', 'periode', 'id'])
+            )
+
+        with it('should not describe fields for the indicators'):
+            xml = """<graph type="indicator" totalDomain="[]"/>"""
+            expect(get_processed_fields(parse_graph(xml))).to(be_empty)
+            xml = """<graph type="indicatorField">
+                <field name="potencia" operator="+"/>
+            </graph>"""
+            expect(get_processed_fields(parse_graph(xml))).to(
+                equal(['potencia'])
+            )
+
     with description('Testing get_value_and_label_for_field') as self:
         with context('when field type is many2one'):
             with it('should return the value and label if value is present'):
@@ -139,6 +168,25 @@ with description('Testing get_value_for_operator') as self:
                 result = get_value_for_operator('max', values)
                 expect(result).to(equal(0))
 
+    with context('when operator is "count_distinct"'):
+        with it('should return the number of distinct values'):
+            values = [1, 2, 2, 'a', 'a', 3]
+            result = get_value_for_operator('count_distinct', values)
+            expect(result).to(equal(4))
+
+    with context('when operator is "median"'):
+        with it('should return the median of values'):
+            result = get_value_for_operator('median', [10, 3, 45, 7])
+            expect(result).to(equal(8.5))
+
+    with context('when operator is "p95"'):
+        with it('should return the 95th percentile of values'):
+            result = get_value_for_operator('p95', list(range(101)))
+            expect(result).to(equal(95))
+        with context('if sequence is empty'):
+            with it('should return 0'):
+                expect(get_value_for_operator('p95', [])).to(equal(0))
+
     with context('when an unsupported operator is provided'):
         with it('should raise a ValueError'):
             values = [10, 20, 30]
@@ -147,6 +195,46 @@ with description('Testing get_value_for_operator') as self:
             )
 
 
+with description('Testing OperatorAccumulator') as self:
+    with it('should give the same result as get_value_for_operator'):
+        values = [3, 1.5, -2, 7, 4.25, 0.5]
+        for operator in ACCUMULATED_OPERATORS:
+            accumulator = OperatorAccumulator(operator)
+            for value in values:
+                accumulator.add(value)
+            expect(accumulator.result()).to(
+                equal(get_value_for_operator(operator, values))
+            )
+
+    with it('should merge accumulators of the same operator'):
+        values = [3, 1.5, -2, 7, 4.25, 0.5]
+        for operator in ACCUMULATED_OPERATORS:
+            left = OperatorAccumulator(operator)
+            right = OperatorAccumulator(operator)
+            for value in values[:2]:
+                left.add(value)
+            for value in values[2:]:
+                right.add(value)
+            left.merge(right)
+            left.merge(OperatorAccumulator(operator))
+            expect(left.result()).to(
+                equal(get_value_for_operator(operator, values))
+            )
+
+    with it('should return the result of empty values'):
+        expect(OperatorAccumulator('count').result()).to(equal(0))
+        expect(OperatorAccumulator('avg').result()).to(equal(0))
+        expect(OperatorAccumulator('+').result()).to(equal(0))
+
+    with it('should raise a ValueError for unsupported operators'):
+        expect(lambda: OperatorAccumulator('unsupported')).to(
+            raise_error(ValueError, 'Unsupported operator: unsupported')
+        )
+        expect(lambda: OperatorAccumulator('+').merge(
+            OperatorAccumulator('avg')
+        )).to(raise_error(ValueError))
+
+
 with description('Testing round_number function') as self:
     with context('when rounding positive numbers'):
         with it('should round up to two decimal places'):
@@ -2,6 +2,8 @@ from mamba import *
 from expects import *
 
 from ooui.helpers import parse_bool_attribute, ConditionParser, Domain
+from ooui.helpers.domain import get_domain
+from ooui.graph import parse_graph
 
 
 with description('Helpers module'):
@@ -94,3 +96,24 @@ with description('Helpers module'):
                 domain = Domain(domain_str)
                 result = domain.parse(values)
                 expect(result).to(equal([['invoice_id', '=', 10]]))
+
+        with context("when the domain is shared"):
+            with it("should return the same domain for the same string"):
+                domain = get_domain("[('user', '=', uid)]")
+                expect(get_domain("[('user', '=', uid)]")).to(be(domain))
+                expect(domain.parse({'uid': 3})).to(
+                    equal([('user', '=', 3)])
+                )
+
+            with it("should share the conditions and domains of indicators"):
+                xml = (
+                    '<graph type="indicator" color="red:debt&gt;0" '
+                    'totalDomain="[(\'debt\', \'&gt;\', 0)]"/>'
+                )
+                first, second = parse_graph(xml), parse_graph(xml)
+                expect(first.color).to(be(second.color))
+                expect(first.total_domain).to(be(second.total_domain))
+                expect(first.color.raw_condition).to(equal('red:debt>0'))
+                expect(first.total_domain.domain).to(
+                    equal("[('debt', '>', 0)]")
+                )
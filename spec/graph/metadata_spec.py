@@ -0,0 +1,113 @@
+# coding: utf-8
+from mamba import description, context, it
+from expects import *
+import os
+import pickle
+import sys
+
+from ooui.graph import parse_graph
+from ooui.graph.fields import get_value_and_label_for_field
+from ooui.graph.metadata import (
+    FieldMetadata, FieldsMetadata, get_fields_metadata, project_fields
+)
+from ooui.graph.processor import process_graph_data
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+mock_data_dir = os.path.join(current_dir, 'mock')
+if mock_data_dir not in sys.path:
+    sys.path.insert(0, mock_data_dir)
+
+from polissa import Polissa  # NOQA
+
+XML = '''<?xml version="1.0"?>
+<graph type="bar">
+    <field name="autoconsumo" axis="x"/>
+    <field name="potencia" operator="+" label="tarifa" axis="y"/>
+</graph>'''
+
+
+with description('Fields metadata'):
+    with it('should keep only the fields of the graph'):
+        metadata = get_fields_metadata(parse_graph(XML), Polissa.fields)
+        expect(sorted(metadata)).to(
+            equal(['autoconsumo', 'potencia', 'tarifa'])
+        )
+        expect(metadata['tarifa']['type']).to(equal('many2one'))
+        expect(metadata['tarifa']['relation']).to(
+            equal(Polissa.fields['tarifa']['relation'])
+        )
+        expect(metadata['potencia']).not_to(have_key('selection'))
+        expect(len(pickle.dumps(metadata, protocol=2))).to(
+            be_below(len(pickle.dumps(Polissa.fields, protocol=2)) // 5)
+        )
+
+    with it('should be hashable and picklable'):
+        graph = parse_graph(XML)
+        metadata = get_fields_metadata(graph, Polissa.fields)
+        other = get_fields_metadata(graph, dict(Polissa.fields))
+        expect(metadata).not_to(be(other))
+        expect(metadata).to(equal(other))
+        expect(hash(metadata)).to(equal(hash(other)))
+        expect(pickle.loads(pickle.dumps(metadata))).to(equal(metadata))
+        expect(metadata['autoconsumo']).to(equal(FieldMetadata.from_definition(
+            Polissa.fields['autoconsumo']
+        )))
+
+    with context('when the model and the fields version are given'):
+        with it('should share the projection'):
+            graph = parse_graph(XML)
+            metadata = get_fields_metadata(
+                graph, Polissa.fields, 'giscedata.polissa', 1
+            )
+            expect(get_fields_metadata(
+                graph, Polissa.fields, 'giscedata.polissa', 1
+            )).to(be(metadata))
+            expect(get_fields_metadata(
+                graph, Polissa.fields, 'giscedata.polissa', 2
+            )).not_to(be(metadata))
+
+    with it('should give the same values and labels as the definitions'):
+        fields = {
+            'state': {'type': 'selection', 'string': 'State', 'selection': [
+                ['draft', 'Draft'], ['open', 'Open'], ['open', 'Other'],
+                [1, 'One'],
+            ]},
+            'partner': {'type': 'many2one', 'relation': 'res.partner'},
+            'name': {'type': 'char', 'string': 'Name'},
+        }
+        metadata = project_fields(fields, ['state', 'partner', 'name'])
+        values = [
+            {'state': 'open'}, {'state': 'done'}, {'state': False},
+            {'state': True}, {'state': ['open']}, {'partner': [1, 'A']},
+            {'partner': False}, {'name': 'x'},
+        ]
+        for entry in values:
+            for name in entry:
+                expect(get_value_and_label_for_field(
+                    metadata, entry, name
+                )).to(equal(get_value_and_label_for_field(
+                    fields, entry, name
+                )))
+        expect(lambda: get_value_and_label_for_field(
+            metadata, {}, 'unknown'
+        )).to(raise_error(ValueError))
+
+    with it('should process the graphs as the definitions'):
+        graph = parse_graph(XML)
+        metadata = get_fields_metadata(graph, Polissa.fields)
+        expect(isinstance(metadata, FieldsMetadata)).to(be_true)
+        expect(process_graph_data(graph, Polissa.data, metadata)).to(
+            equal(graph.process(Polissa.data, Polissa.fields))
+        )
+
+    with context('when a count axis has another field than the x axis'):
+        with it('should keep the definition of the count field'):
+            graph = parse_graph('''<graph type="bar">
+                <field name="state" axis="x"/>
+                <field name="tarifa" operator="count" axis="y"/>
+            </graph>''')
+            metadata = get_fields_metadata(graph, Polissa.fields)
+            expect(sorted(metadata)).to(equal(['state', 'tarifa']))
+            expect(process_graph_data(graph, Polissa.data, Polissa.fields)).to(
+                equal(graph.process(Polissa.data, Polissa.fields))
+            )
@@ -0,0 +1,105 @@
+from mamba import description, context, it
+from expects import *
+
+from ooui.graph import parse_graph
+from ooui.graph.ordering import (
+    get_sort_key, get_ordinals, sort_keyed_values, merge_sorted_runs
+)
+
+
+with description('Testing get_sort_key') as self:
+    with it('should sort empty values first, then numbers, then text'):
+        values = ['b', 10, False, 'a', 9, None, 2.5]
+        expect(sorted(values, key=get_sort_key)).to(
+            equal([False, None, 2.5, 9, 10, 'a', 'b'])
+        )
+
+
+with description('Testing get_ordinals') as self:
+    with it('should assign the position of each distinct value'):
+        expect(get_ordinals(['b', 'a', 'b', 'c'])).to(
+            equal({'a': 0, 'b': 1, 'c': 2})
+        )
+
+
+with description('Testing sort_keyed_values') as self:
+    with it('should sort by x ordinal and series ordinal'):
+        keyed = [(1, 'b', 'v1'), (0, 'b', 'v2'), (1, 'a', 'v3'), (0, 'a', 'v4')]
+        result = sort_keyed_values(keyed, {'a': 0, 'b': 1})
+        expect(result).to(equal(['v4', 'v2', 'v3', 'v1']))
+
+
+with description('Testing merge_sorted_runs') as self:
+    with it('should merge the sorted runs'):
+        runs = [[1, 4, 7], [2, 5], [0, 3, 6]]
+        expect(merge_sorted_runs(runs, key=lambda v: v)).to(
+            equal([0, 1, 2, 3, 4, 5, 6, 7])
+        )
+
+    with it('should keep the order of the runs for equal keys'):
+        runs = [[(1, 'a')], [(1, 'b')]]
+        expect(merge_sorted_runs(runs, key=lambda v: v[0])).to(
+            equal([(1, 'a'), (1, 'b')])
+        )
+
+
+with description('Ordering of chart values'):
+    with context('when the series labels contain dashes'):
+        with it('should sort by x and then by series'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="bar">
+                <field name="name" axis="x"/>
+                <field name="value" operator="+" label="kind" axis="y"/>
+            </graph>'''
+            fields = {
+                'name': {'type': 'char'},
+                'value': {'type': 'float'},
+                'kind': {'type': 'char'},
+            }
+            values = [
+                {'name': 'a-b', 'value': 1, 'kind': 'c'},
+                {'name': 'a', 'value': 2, 'kind': 'b-c'},
+                {'name': 'a', 'value': 3, 'kind': 'b'},
+            ]
+            data = parse_graph(xml).process(values, fields)['data']
+            expect([(d['x'], d['type']) for d in data]).to(equal([
+                ('a', 'b'), ('a', 'b-c'), ('a-b', 'c')
+            ]))
+
+    with context('when the x values are numbers'):
+        with it('should sort them in numeric order'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="bar">
+                <field name="year" axis="x"/>
+                <field name="value" operator="+" axis="y"/>
+            </graph>'''
+            fields = {'year': {'type': 'integer'}, 'value': {'type': 'float'}}
+            values = [
+                {'year': 10, 'value': 1}, {'year': 9, 'value': 1},
+                {'year': 100, 'value': 1},
+            ]
+            data = parse_graph(xml).process(values, fields)['data']
+            expect([d['x'] for d in data]).to(equal([9, 10, 100]))
+
+    with context('when the chart has a timerange and several series'):
+        with it('should merge the series sorted by x and series'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="line" timerange="day">
+                <field name="date" axis="x"/>
+                <field name="value" operator="+" label="kind" axis="y"/>
+            </graph>'''
+            fields = {
+                'date': {'type': 'date'},
+                'value': {'type': 'float'},
+                'kind': {'type': 'char'},
+            }
+            values = [
+                {'date': '2020-01-05', 'value': 1, 'kind': 'B'},
+                {'date': '2020-01-01', 'value': 1, 'kind': 'B'},
+                {'date': '2020-01-03', 'value': 1, 'kind': 'A'},
+                {'date': '2020-01-02', 'value': 1, 'kind': 'A'},
+            ]
+            data = parse_graph(xml).process(values, fields)['data']
+            keys = [(d['x'], d['type']) for d in data]
+            expect(keys).to(equal(sorted(keys)))
+            expect(keys).to(have_length(7))
@@ -71,6 +71,51 @@ with description('When process a graph'):
             showTotal=True,
         ))
 
+    with it('should process indicatorField graph from iterables'):
+        xml = """<?xml version="1.0"?>
+        <graph type="indicatorField" showPercent="1" totalDomain="[]">
+            <field name="potencia" operator="+" />
+        </graph>
+        """
+        total_values = models['polissa'].data
+        g = parse_graph(xml)
+        result = g.process(
+            (v for v in total_values if v['tarifa'][1] == "2.0A"),
+            fields=models['polissa'].fields,
+            total_values=iter(total_values)
+        )
+        expect(result).to(have_keys(value=77.72, total=275.72))
+
+    with it('should process indicatorField value and total from one stream'):
+        xml = """<?xml version="1.0"?>
+        <graph type="indicatorField" showPercent="1" totalDomain="[]">
+            <field name="potencia" operator="+" />
+            <field name="potencia" operator="count" />
+        </graph>
+        """
+        total_values = models['polissa'].data
+        g = parse_graph(xml)
+        result = g.process(
+            iter(total_values),
+            fields=models['polissa'].fields,
+            value_filter=lambda v: v['tarifa'][1] == "2.0A"
+        )
+        expected = g.process(
+            [v for v in total_values if v['tarifa'][1] == "2.0A"],
+            fields=models['polissa'].fields,
+            total_values=total_values
+        )
+        expect(result).to(equal(expected))
+        result = g.process(
+            total_values, models['polissa'].fields,
+            value_filter=[('tarifa', '=', '2.0A')]
+        )
+        expect(result).to(equal(expected))
+        expect(lambda: g.process(
+            total_values, models['polissa'].fields, total_values=[],
+            value_filter=bool
+        )).to(raise_error(ValueError))
+
     with it('should process indicator graph'):
         xml = """<?xml version="1.0"?>
         <graph string="My indicator" showPercent="1" type="indicator" color="green:value>15;red:value&gt;16" totalDomain="[]" icon="slack">
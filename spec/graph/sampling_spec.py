@@ -0,0 +1,162 @@
+from mamba import description, context, it
+from expects import *
+import random
+
+from ooui.graph import parse_graph
+from ooui.graph.sampling import (
+    Reservoir, get_z_score, get_approximate_options, estimate_for_operator
+)
+
+FIELDS = {
+    'date': {'type': 'date', 'string': 'Date'},
+    'meter': {'type': 'char', 'string': 'Meter'},
+    'value': {'type': 'float', 'string': 'Value'},
+}
+
+
+def iter_readings(size, seed=1):
+    rng = random.Random(seed)
+    for index in range(size):
+        yield {
+            'date': '2024-{:02d}-{:02d}'.format(index % 2 + 1, index % 28 + 1),
+            'meter': 'AB'[index % 2],
+            'value': rng.uniform(0, 100),
+        }
+
+
+with description('Testing the reservoir'):
+    with it('should keep at most size items of the stream'):
+        reservoir = Reservoir(10, random.Random(1))
+        for item in range(1000):
+            reservoir.add(item)
+        expect(reservoir.items).to(have_length(10))
+        expect(reservoir.seen).to(equal(1000))
+        expect(len(set(reservoir.items))).to(equal(10))
+
+    with it('should keep every item of a small stream'):
+        reservoir = Reservoir(10)
+        for item in range(5):
+            reservoir.add(item)
+        expect(reservoir.items).to(equal([0, 1, 2, 3, 4]))
+
+    with it('should not accept an empty sample'):
+        expect(lambda: Reservoir(0)).to(raise_error(ValueError))
+
+
+with description('Testing the estimates'):
+    with it('should compute the critical value of a confidence level'):
+        expect(get_z_score(0.95)).to(be_within(1.9599, 1.9601))
+
+    with it('should be disabled without the approximate option'):
+        expect(get_approximate_options({})).to(be_none)
+        expect(lambda: get_approximate_options({'approximate': {
+            'confidence': 95
+        }})).to(raise_error(ValueError))
+
+    with it('should be exact when the sample is the whole group'):
+        value, interval = estimate_for_operator('+', [1, 2, 3], 3, 3, 1.96)
+        expect(value).to(equal(6))
+        expect(interval).to(equal([6, 6]))
+        expect(estimate_for_operator('max', [1, 5], 2, 2, 1.96)).to(
+            equal((5, [5, 5]))
+        )
+
+    with it('should scale counts and sums to the population'):
+        value, interval = estimate_for_operator('count', [1] * 30, 100, 1000, 1.96)
+        expect(value).to(equal(300))
+        expect(interval[0]).to(be_below(300))
+        expect(interval[1]).to(be_above(300))
+
+        value, interval = estimate_for_operator('+', [2] * 100, 100, 1000, 1.96)
+        expect(value).to(equal(2000))
+        expect(interval).to(equal([2000, 2000]))
+
+    with it('should not add an interval to the other operators'):
+        expect(estimate_for_operator('min', [3, 1], 2, 10, 1.96)).to(
+            equal((1, None))
+        )
+
+
+with description('Processing a chart in approximate mode'):
+    with context('when the stream is bigger than the sample'):
+        with it('should estimate the values with confidence intervals'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="bar">
+                <field name="meter" axis="x"/>
+                <field name="value" operator="+" axis="y"/>
+            </graph>'''
+            graph = parse_graph(xml)
+            exact = graph.process(list(iter_readings(20000)), FIELDS)
+            result = graph.process(iter_readings(20000), FIELDS, options={
+                'approximate': {'sample_size': 500, 'seed': 1}
+            })
+
+            expect(result['approximate']).to(be_true)
+            expect(result['num_items']).to(equal(20000))
+            for exact_value, value in zip(exact['data'], result['data']):
+                expect(value['x']).to(equal(exact_value['x']))
+                low, high = value['confidenceInterval']
+                expect(exact_value['value']).to(be_within(low, high))
+                expect(value['value']).to(be_within(low, high))
+
+        with it('should estimate each time unit from its own sample'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="line" timerange="month">
+                <field name="date" axis="x"/>
+                <field name="value" operator="count" axis="y"/>
+            </graph>'''
+            result = parse_graph(xml).process(
+                iter_readings(1000), FIELDS,
+                options={'approximate': {'sample_size': 50}}
+            )
+            expect([(v['x'], v['value'], v['confidenceInterval'])
+                    for v in result['data']]).to(equal([
+                ('2024-01', 500, [500, 500]),
+                ('2024-02', 500, [500, 500]),
+            ]))
+
+    with it('should not support the columnar format'):
+        xml = '''<?xml version="1.0"?>
+        <graph type="bar">
+            <field name="meter" axis="x"/>
+            <field name="value" operator="+" axis="y"/>
+        </graph>'''
+        expect(lambda: parse_graph(xml).process([], FIELDS, options={
+            'approximate': True, 'format': 'columnar'
+        })).to(raise_error(ValueError))
+
+
+with description('Processing an indicator field in approximate mode'):
+    with it('should estimate the value and the total from streams'):
+        xml = '''<?xml version="1.0"?>
+        <graph type="indicatorField" showPercent="1">
+            <field name="value" operator="+"/>
+        </graph>'''
+        graph = parse_graph(xml)
+        exact = graph.process(
+            list(iter_readings(5000)), FIELDS, list(iter_readings(10000, 2))
+        )
+        result = graph.process(
+            iter_readings(5000), FIELDS, iter_readings(10000, 2),
+            options={'approximate': {'sample_size': 500, 'seed': 3}}
+        )
+        low, high = result['confidenceInterval']
+        expect(exact['value']).to(be_within(low, high))
+        expect(result['total']).to(be_within(
+            exact['total'] * 0.9, exact['total'] * 1.1
+        ))
+
+    with it('should sample the value and the total from one stream'):
+        xml = '''<?xml version="1.0"?>
+        <graph type="indicatorField" showPercent="1">
+            <field name="value" operator="count"/>
+        </graph>'''
+        result = parse_graph(xml).process(
+            iter_readings(10000), FIELDS,
+            value_filter=lambda entry: entry['value'] < 50,
+            options={'approximate': {'sample_size': 500, 'seed': 3}}
+        )
+        expect(result['total']).to(equal(10000))
+        low, high = result['confidenceInterval']
+        expect(low).to(be_below_or_equal(result['value']))
+        expect(high).to(be_above_or_equal(result['value']))
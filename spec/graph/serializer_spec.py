@@ -0,0 +1,101 @@
+# coding: utf-8
+from mamba import description, context, it
+from expects import *
+import io
+import json
+
+from ooui.graph import parse_graph
+from ooui.graph.serializer import iter_json, dump_json, get_json_dumps
+from ooui.helpers import Aggregator
+
+
+def decode(chunks):
+    return json.loads(b''.join(chunks).decode('utf-8'))
+
+
+with description('Streaming JSON serializer'):
+
+    with context('when encoding a chart result'):
+        with it('should produce the same JSON as json.dumps'):
+            xml = '''<?xml version="1.0"?>
+            <graph type="bar">
+                <field name="date" axis="x"/>
+                <field name="value" operator="+" axis="y"/>
+            </graph>'''
+            fields = {
+                'date': {'type': 'date', 'string': u'Data d\'alta'},
+                'value': {'type': 'float', 'string': u'Consum elèctric'},
+            }
+            values = [
+                {'date': '2020-01-{:02d}'.format(day), 'value': day * 1.5}
+                for day in range(1, 29)
+            ]
+            result = parse_graph(xml).process(values, fields)
+
+            expect(decode(iter_json(result))).to(equal(result))
+
+        with it('should yield chunks of about chunk_size bytes'):
+            result = {'data': [{'x': i, 'value': i} for i in range(1000)]}
+            chunks = list(iter_json(result, chunk_size=512))
+
+            expect(len(chunks)).to(be_above(1))
+            for chunk in chunks[:-1]:
+                expect(len(chunk)).to(be_above_or_equal(512))
+                expect(len(chunk)).to(be_below(600))
+            expect(decode(chunks)).to(equal(result))
+
+    with context('when encoding an Aggregator output'):
+        with it('should produce the same values'):
+            data = [{'value': 10, 'amount': 1.5}, {'value': 20, 'amount': 2}]
+            results = Aggregator(
+                data, {'value': ['sum', 'avg'], 'amount': ['max']}
+            ).process()
+
+            expect(decode(iter_json(results))).to(equal(results))
+
+    with context('when encoding generators'):
+        with it('should write them as arrays while they are consumed'):
+            consumed = []
+
+            def produce():
+                for i in range(3):
+                    consumed.append(i)
+                    yield {'x': i}
+
+            chunks = iter_json({'data': produce()}, chunk_size=1)
+            first = next(chunks)
+            expect(first).to(equal(b'{'))
+            expect(consumed).to(be_empty)
+            rest = list(chunks)
+            expect(consumed).to(equal([0, 1, 2]))
+            expect(decode([first] + rest)).to(
+                equal({'data': [{'x': 0}, {'x': 1}, {'x': 2}]})
+            )
+
+    with context('when encoding dictionaries with non string keys'):
+        with it('should convert the keys like the json module'):
+            value = {1: [{'a': 1}], None: [{'b': 2}], True: [{'c': 3}]}
+            expect(decode(iter_json(value, backend='json'))).to(
+                equal(json.loads(json.dumps(value)))
+            )
+
+    with context('when writing to a file-like object'):
+        with it('should write bytes to binary files'):
+            fp = io.BytesIO()
+            dump_json({'data': [[1, 2], [3, 4]]}, fp, chunk_size=4)
+            expect(json.loads(fp.getvalue().decode('utf-8'))).to(
+                equal({'data': [[1, 2], [3, 4]]})
+            )
+
+        with it('should write text to text files'):
+            fp = io.StringIO()
+            dump_json({'type': [u'Generació']}, fp)
+            expect(json.loads(fp.getvalue())).to(
+                equal({'type': [u'Generació']})
+            )
+
+    with context('when selecting the JSON backend'):
+        with it('should raise a ValueError for unknown backends'):
+            expect(lambda: get_json_dumps('unknown')).to(
+                raise_error(ValueError)
+            )
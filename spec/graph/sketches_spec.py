@@ -0,0 +1,140 @@
+from mamba import description, context, it
+from expects import *
+import random
+
+from ooui.graph import parse_graph
+from ooui.graph.fields import get_value_for_operator, get_state_for_operator
+from ooui.graph.sketches import (
+    DistinctCounter, QuantileEstimator, HyperLogLog, KLLSketch,
+    get_weighted_quantile
+)
+
+
+with description('Testing the distinct counter'):
+    with context('when the values are below the threshold'):
+        with it('should count the distinct values exactly'):
+            counter = DistinctCounter(threshold=10)
+            for value in [1, 1.0, 2, 'a', 'a']:
+                counter.add(value)
+            expect(counter.result()).to(equal(3))
+            expect(counter.sketch).to(be_none)
+
+    with context('when the values are above the threshold'):
+        with it('should estimate them with a bounded error'):
+            counter = DistinctCounter(threshold=100)
+            for value in range(50000):
+                counter.add('reading-{}'.format(value % 20000))
+            expect(counter.values).to(be_none)
+            expect(counter.result()).to(be_within(19000, 21000))
+
+        with it('should merge counters without counting twice'):
+            first = DistinctCounter(threshold=100)
+            second = DistinctCounter(threshold=100)
+            for value in range(10000):
+                first.add(value)
+                second.add(value + 5000)
+            first.merge(second)
+            expect(first.result()).to(be_within(14250, 15750))
+
+    with it('should not merge sketches with different precision'):
+        expect(lambda: HyperLogLog(10).merge(HyperLogLog(12))).to(
+            raise_error(ValueError)
+        )
+
+
+with description('Testing the quantile estimator'):
+    with context('when the values are below the threshold'):
+        with it('should interpolate the quantile exactly'):
+            estimator = QuantileEstimator(0.5, threshold=10)
+            for value in [4, 1, 3, 2]:
+                estimator.add(value)
+            expect(estimator.result()).to(equal(2.5))
+
+    with context('when the values are above the threshold'):
+        with it('should estimate the quantile keeping few values'):
+            values = list(range(100000))
+            random.Random(1).shuffle(values)
+            estimator = QuantileEstimator(0.95, threshold=100)
+            for value in values:
+                estimator.add(value)
+            expect(estimator.sketch.size).to(be_below(1000))
+            expect(estimator.result()).to(be_within(94000, 96000))
+
+        with it('should merge estimators'):
+            first = QuantileEstimator(0.5, threshold=100)
+            second = QuantileEstimator(0.5, threshold=100)
+            for value in range(20000):
+                first.add(value)
+                second.add(value + 20000)
+            first.merge(second)
+            expect(first.result()).to(be_within(19000, 21000))
+
+        with it('should interpolate the ranks as the exact quantile'):
+            generator = random.Random(2)
+            values = [generator.uniform(0, 100) for _ in range(50000)]
+            estimator = QuantileEstimator(0.5)
+            for value in values:
+                estimator.add(value)
+            exact = QuantileEstimator(0.5, threshold=len(values))
+            for value in values:
+                exact.add(value)
+            expect(estimator.sketch).not_to(be_none)
+            expect(exact.sketch).to(be_none)
+            expect(estimator.result()).to(
+                be_within(exact.result() - 0.5, exact.result() + 0.5)
+            )
+
+    with it('should interpolate the quantiles of weighted values'):
+        expect(get_weighted_quantile([(1, 2), (3, 2)], 0.5)).to(equal(2))
+        expect(get_weighted_quantile([(1, 1), (3, 3)], 0.5)).to(equal(3))
+        expect(get_weighted_quantile([(v, 1) for v in [1, 2, 3, 4]], 0.5)).to(
+            equal(2.5)
+        )
+
+    with it('should take the values of a group as an iterable'):
+        expect(get_value_for_operator('median', iter([10, 3, 45, 7]))).to(
+            equal(get_value_for_operator('median', [10, 3, 45, 7]))
+        )
+
+    with it('should not accept quantiles outside [0, 1]'):
+        expect(lambda: QuantileEstimator(95)).to(raise_error(ValueError))
+
+    with it('should return 0 for an empty KLL sketch'):
+        expect(KLLSketch().quantile(0.5)).to(equal(0))
+
+
+with description('Testing sketch states'):
+    with it('should combine states of the same operator'):
+        states = [
+            get_state_for_operator('count_distinct', ['a', 'b']),
+            get_state_for_operator('count_distinct', ['b', 'c']),
+        ]
+        expect(get_value_for_operator('count_distinct', states)).to(equal(3))
+
+    with it('should return the value for the rest of operators'):
+        expect(get_state_for_operator('+', [1, 2])).to(equal(3))
+
+    with it('should merge the sketches of a timerange'):
+        xml = '''<?xml version="1.0"?>
+        <graph type="bar" timerange="month">
+            <field name="date" axis="x"/>
+            <field name="meter" operator="count_distinct" axis="y"/>
+        </graph>'''
+        fields = {
+            'date': {'type': 'date', 'string': 'Date'},
+            'meter': {'type': 'char', 'string': 'Meter'},
+        }
+        values = [
+            {'date': '2024-01-01', 'meter': 'A'},
+            {'date': '2024-01-01', 'meter': 'B'},
+            {'date': '2024-01-02', 'meter': 'A'},
+            {'date': '2024-01-02', 'meter': 'C'},
+            {'date': '2024-02-01', 'meter': 'A'},
+        ]
+        result = parse_graph(xml).process(values, fields)
+        expect(result['data']).to(equal([
+            {'x': '2024-01', 'value': 3, 'type': 'Meter',
+             'operator': 'count_distinct', 'stacked': None},
+            {'x': '2024-02', 'value': 1, 'type': 'Meter',
+             'operator': 'count_distinct', 'stacked': None},
+        ]))
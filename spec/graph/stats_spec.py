@@ -0,0 +1,79 @@
+from mamba import description, context, it
+from expects import *
+
+from ooui.graph import parse_graph
+from ooui.graph.stats import StageRecorder, run_stage, get_stage_recorder
+
+XML = '''<?xml version="1.0"?>
+<graph type="line" timerange="day" y_range="auto">
+    <field name="date" axis="x"/>
+    <field name="value" operator="+" axis="y"/>
+</graph>'''
+
+FIELDS = {
+    'date': {'type': 'date', 'string': 'Date'},
+    'value': {'type': 'float', 'string': 'Value'},
+}
+
+VALUES = [
+    {'date': '2020-01-{:02d}'.format(day), 'value': day}
+    for day in range(1, 32, 2)
+]
+
+
+with description('Processing stats of a chart'):
+
+    with context('when stats are not enabled'):
+        with it('should not add the _stats key'):
+            result = parse_graph(XML).process(VALUES, FIELDS)
+            expect(result).not_to(have_key('_stats'))
+
+    with context('when stats are enabled'):
+        with it('should add the stats of every stage'):
+            result = parse_graph(XML).process(
+                VALUES, FIELDS, options={'stats': True}
+            )
+            names = [stage['name'] for stage in result['_stats']]
+            expect(names).to(equal([
+                'group', 'aggregate', 'sort', 'timerange.combine',
+                'timerange.fill_gaps', 'timerange.merge', 'timerange',
+                'min_max'
+            ]))
+
+            stages = dict((stage['name'], stage) for stage in result['_stats'])
+            expect(stages['group']['input_size']).to(equal(16))
+            expect(stages['group']['output_size']).to(equal(16))
+            expect(stages['timerange']['output_size']).to(equal(31))
+            for stage in result['_stats']:
+                expect(stage['time']).to(be_above_or_equal(0))
+                expect(stage).to(have_key('allocated_blocks'))
+
+        with it('should record the stages of the columnar format'):
+            result = parse_graph(XML).process(
+                VALUES, FIELDS, options={'stats': True, 'format': 'columnar'}
+            )
+            names = [stage['name'] for stage in result['_stats']]
+            expect(names).to(equal(['group', 'aggregate', 'build', 'min_max']))
+
+    with context('when a stage callback is given'):
+        with it('should call it for every stage without adding _stats'):
+            stages = []
+            result = parse_graph(XML).process(
+                VALUES, FIELDS, options={'on_stage': stages.append}
+            )
+            expect(result).not_to(have_key('_stats'))
+            expect([s['name'] for s in stages]).to(contain('sort'))
+
+
+with description('Testing the stage recorder'):
+    with it('should not record anything without a recorder'):
+        expect(run_stage(None, 'sum', sum, [1, 2, 3])).to(equal(6))
+        expect(get_stage_recorder({})).to(be_none)
+
+    with it('should record the sizes of the stage'):
+        recorder = StageRecorder()
+        result = run_stage(recorder, 'double', lambda v: v * 2, [1, 2])
+        expect(result).to(equal([1, 2, 1, 2]))
+        expect(recorder.stages[0]).to(have_keys(
+            name='double', input_size=2, output_size=4
+        ))
@@ -0,0 +1,157 @@
+from mamba import description, context, it
+from expects import *
+
+from ooui.helpers.budget import Budget, BudgetExceeded, measure_expression
+from ooui.helpers.conditions import ConditionParser
+from ooui.helpers.domain import Domain
+
+
+def exceeded(limit):
+    def check(error):
+        return isinstance(error, BudgetExceeded) and error.limit == limit
+    return check
+
+
+def error_of(func):
+    try:
+        func()
+    except Exception as error:
+        return error
+
+
+with description('Evaluation budgets'):
+    with it('should measure the depth and the nodes of expressions'):
+        expect(measure_expression('x')).to(equal((3, 3)))
+        expect(measure_expression('x + 1')).to(equal((4, 5)))
+
+    with it('should compare budgets by their limits'):
+        expect(Budget(max_depth=10)).to(equal(Budget(max_depth=10)))
+        expect(hash(Budget(timeout=1))).to(equal(hash(Budget(timeout=1))))
+        expect(Budget(max_depth=10)).not_to(equal(Budget(max_depth=11)))
+
+    with it('should be immutable'):
+        budget = Budget(max_depth=10)
+
+        def set_limit():
+            budget.max_depth = 100
+
+        def delete_limit():
+            del budget.timeout
+
+        expect(set_limit).to(raise_error(AttributeError))
+        expect(delete_limit).to(raise_error(AttributeError))
+        expect(budget).to(equal(Budget(max_depth=10)))
+
+    with it('should not accept limits lower than one'):
+        expect(lambda: Budget(max_nodes=0)).to(raise_error(ValueError))
+        expect(lambda: Budget(timeout=0)).to(raise_error(ValueError))
+
+    with it('should give the same results within the budget'):
+        budget = Budget()
+        cases = [
+            ("red:value>0;green:value==0", {'value': 0}),
+            ("a:[v for v in x] == [1, 2]", {'x': [1, 2]}),
+            ("a:x ** 2 == 9 and s * 2 == 'abab'", {'x': 3, 's': 'ab'}),
+            ("a:current_date > '2000-01-01'", {}),
+        ]
+        for condition, values in cases:
+            parser = ConditionParser(condition)
+            expect(parser.eval(values, budget)).to(
+                equal(parser.interpret(values))
+            )
+            expect(parser.interpret(values, budget)).to(
+                equal(parser.interpret(values))
+            )
+
+    with it('should be a ValueError'):
+        error = error_of(
+            lambda: ConditionParser("a:x ** y").eval(
+                {'x': 10, 'y': 20000}, Budget()
+            )
+        )
+        expect(error).to(be_a(ValueError))
+        expect(error.limit).to(equal('max_power'))
+
+    with context('when a condition exceeds the budget'):
+        with it('should check the depth before evaluating it'):
+            parser = ConditionParser('a:' + '-' * 40 + 'x')
+            expect(parser.measure()).to(equal((43, 43)))
+            error = error_of(lambda: parser.eval({}, Budget(max_depth=32)))
+            expect(exceeded('max_depth')(error)).to(be_true)
+
+        with it('should check the nodes of all the sentences'):
+            parser = ConditionParser('a:x + x;b:x + x')
+            expect(parser.eval({'x': 1}, Budget(max_nodes=10))).to(
+                equal('a')
+            )
+            error = error_of(
+                lambda: parser.eval({'x': 1}, Budget(max_nodes=9))
+            )
+            expect(exceeded('max_nodes')(error)).to(be_true)
+
+        with it('should check the powers'):
+            parser = ConditionParser('a:x ** y')
+            expect(parser.compile(Budget())).not_to(be(parser.compiled))
+            error = error_of(
+                lambda: parser.eval(
+                    {'x': 9999, 'y': 9999}, Budget(max_length=1000)
+                )
+            )
+            expect(exceeded('max_length')(error)).to(be_true)
+            error = error_of(
+                lambda: parser.eval({'x': 2, 'y': 10 ** 6}, Budget())
+            )
+            expect(exceeded('max_power')(error)).to(be_true)
+            expect(parser.eval({'x': 2, 'y': 10}, Budget())).to(equal('a'))
+
+        with it('should check the repetitions and concatenations'):
+            budget = Budget(max_length=10)
+            error = error_of(
+                lambda: ConditionParser('a:s * n').eval(
+                    {'s': 'ab', 'n': 6}, budget
+                )
+            )
+            expect(exceeded('max_length')(error)).to(be_true)
+            error = error_of(
+                lambda: ConditionParser('a:s + s').eval(
+                    {'s': 'abcdef'}, budget
+                )
+            )
+            expect(exceeded('max_length')(error)).to(be_true)
+
+        with it('should count the nodes visited by the interpreter'):
+            parser = ConditionParser("a:[v for v in x if v > 0]")
+            expect(parser.compiled).to(be_none)
+            error = error_of(
+                lambda: parser.eval({'x': list(range(10000))}, Budget())
+            )
+            expect(exceeded('max_nodes')(error)).to(be_true)
+
+        with it('should stop the interpreter at the deadline'):
+            parser = ConditionParser("a:[v for v in x if v > 0]")
+            budget = Budget(max_nodes=10 ** 9, timeout=1e-6)
+            error = error_of(
+                lambda: parser.eval({'x': list(range(100000))}, budget)
+            )
+            expect(exceeded('timeout')(error)).to(be_true)
+
+    with context('when a domain exceeds the budget'):
+        with it('should raise BudgetExceeded'):
+            domain = Domain("[('id', 'in', [v for v in ids])]")
+            expect(domain.parse({'ids': [1, 2]}, Budget())).to(
+                equal([('id', 'in', [1, 2])])
+            )
+            error = error_of(
+                lambda: domain.parse({'ids': list(range(10000))}, Budget())
+            )
+            expect(exceeded('max_nodes')(error)).to(be_true)
+            error = error_of(
+                lambda: Domain("[('id', '=', 10 ** 10 ** 6)]").parse(
+                    None, Budget()
+                )
+            )
+            expect(exceeded('max_power')(error)).to(be_true)
+            error = error_of(
+                lambda: Domain('[' * 40 + ']' * 40).parse(None, Budget())
+            )
+            expect(exceeded('max_depth')(error)).to(be_true)
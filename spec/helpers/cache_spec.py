@@ -0,0 +1,62 @@
+from mamba import description, context, it
+from expects import *
+
+from ooui.helpers.cache import LRUCache
+
+
+with description('LRUCache'):
+    with it('should return the cached items'):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        expect(cache.get('a')).to(equal(1))
+        expect(cache.get('b')).to(be_none)
+        expect(cache.get('b', 2)).to(equal(2))
+        expect((cache.hits, cache.misses)).to(equal((1, 2)))
+
+    with it('should discard the least recently used item'):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        expect('a' in cache).to(be_true)
+        expect('b' in cache).to(be_false)
+        expect(cache).to(have_length(2))
+
+    with it('should be cleared'):
+        cache = LRUCache()
+        cache.set('a', 1)
+        cache.clear()
+        expect(cache).to(have_length(0))
+
+    with it('should not accept an empty cache'):
+        expect(lambda: LRUCache(0)).to(raise_error(ValueError))
+
+    with it('should be resized'):
+        cache = LRUCache(maxsize=3)
+        for key in 'abc':
+            cache.set(key, key)
+        cache.resize(2)
+        expect('a' in cache).to(be_false)
+        expect(cache).to(have_length(2))
+        cache.resize(4)
+        cache.set('d', 'd')
+        cache.set('e', 'e')
+        expect(cache).to(have_length(4))
+        expect(lambda: cache.resize(0)).to(raise_error(ValueError))
+
+    with it('should not reorder the items when frozen'):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.freeze()
+        expect(cache.get('a')).to(equal(1))
+        expect(cache.get('c', 3)).to(equal(3))
+        expect((cache.hits, cache.misses)).to(equal((0, 0)))
+        cache.set('c', 3)
+        expect('a' in cache).to(be_false)
+        cache.unfreeze()
+        cache.get('b')
+        cache.set('d', 4)
+        expect('b' in cache).to(be_true)
+        expect(cache.hits).to(equal(1))
@@ -0,0 +1,138 @@
+from mamba import description, context, it
+from expects import *
+from datetime import datetime, timedelta
+
+from simpleeval import NumberTooHigh, IterableTooLong
+from ooui.helpers.conditions import ConditionParser
+from ooui.helpers.compiler import ConditionCompiler, CompileError
+
+YESTERDAY = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+# Conditions of the specs with the values they are evaluated with
+CASES = [
+    ("red:active==0;black:active==1 and meter_type=='PF';"
+     "blue:active==1 and meter_type=='G';green:active==1 and meter_type=='C';", [
+        {'active': False},
+        {'active': True, 'meter_type': 'PF'},
+        {'active': True, 'meter_type': 'G'},
+        {'active': True, 'meter_type': 'C'},
+        {'active': True, 'meter_type': 'X'},
+        {'active': True},
+    ]),
+    ("grey:reconcile_id!=0;blue:amount_to_pay==0;"
+     "red:date_maturity<time.strftime('%Y-%m-%d')", [
+        {'date_maturity': YESTERDAY, 'reconcile_id': False, 'amount_to_pay': 40},
+        {'date_maturity': YESTERDAY, 'reconcile_id': 3, 'amount_to_pay': 40},
+        {'date_maturity': '2999-01-01', 'reconcile_id': 0, 'amount_to_pay': 0},
+    ]),
+    ("red:state in ['tall', 'baixa', 'cancelada']", [
+        {'state': 'tall'}, {'state': 'esborrany'},
+    ]),
+    ("grey:state in ('cancel','done');blue:remaining_hours<0;"
+     "red:bool(date_deadline) & (date_deadline<current_date) & "
+     "(state in ('draft','open'))", [
+        {'state': 'open', 'remaining_hours': 10, 'date_deadline': '2021-01-01'},
+        {'state': 'done', 'remaining_hours': 10, 'date_deadline': False},
+        {'state': 'draft', 'remaining_hours': -1, 'date_deadline': False},
+        {'state': 'draft', 'remaining_hours': 1, 'date_deadline': False},
+    ]),
+    ("blue:valid==False", [{'valid': False}, {'valid': True}, {'valid': None}]),
+    ("red:value>0;green:value==0", [{'value': 1}, {'value': 0}, {'value': -2}]),
+    ("green:value>15;red:value>16", [{'value': 16}, {'value': 17}]),
+    ("blue:percent>40;red:percent<41", [{'percent': 40.5}, {'percent': 41}]),
+    ("red:amount<0", [{'amount': -1}, {'amount': 0}]),
+    ("danger:state=='draft'", [{'state': 'draft'}, {'state': 'open'}]),
+    ("green:active==True", [{'active': True}, {'active': 1}, {'active': 0}]),
+    # Expressions using the rest of the compiled nodes
+    ("a:0 < x <= 10 < y;b:not x;c:-x + 2 * y ** 2 // 3 % 5 == 1", [
+        {'x': 5, 'y': 11}, {'x': 0, 'y': 1}, {'x': 20, 'y': 0},
+        {'x': -1, 'y': 2},
+    ]),
+    ("a:x is None or x is not False and x;b:(x if y else y)", [
+        {'x': None, 'y': 1}, {'x': False, 'y': 0}, {'x': 2, 'y': 0},
+        {'x': False, 'y': 'b'},
+    ]),
+    ("a:parent.state == 'done';b:parent['lines'][1] > 1;"
+     "c:name.upper().startswith('X')", [
+        {'parent': {'state': 'done', 'lines': [1, 2]}, 'name': 'x'},
+        {'parent': {'state': 'open', 'lines': [1, 2]}, 'name': 'x'},
+        {'parent': {'state': 'open', 'lines': [1, 0]}, 'name': 'xyz'},
+        {'parent': {'state': 'open', 'lines': [1, 0]}, 'name': 'abc'},
+        {'parent': {'state': 'open', 'lines': [1, 0]}, 'name': 3},
+    ]),
+    ("a:dict(k=x).get('k') == (x,)[0] and len_ok;b:x in {1, 2, 3};"
+     "c:list((x, y)) == [x, y] and set([x]) == {x};d:dict(a=x)['a']", [
+        {'x': 1, 'len_ok': True, 'y': 1}, {'x': 3, 'len_ok': False, 'y': 0},
+        {'x': 0, 'len_ok': False, 'y': 0}, {'x': 5, 'len_ok': 0, 'y': 2},
+    ]),
+    ("a:unknown == 1", [{}, {'unknown': 1}]),
+    ("a:x ** y > 0", [{'x': 2, 'y': 3}, {'x': 2, 'y': 5000000}]),
+    ("a:s * n", [{'s': 'ab', 'n': 2}, {'s': 'ab', 'n': 10 ** 6}]),
+    ("a:current_date > '2000-01-01' and bool", [{}]),
+    ("a:x / y", [{'x': 1, 'y': 0}, {'x': 0, 'y': 1}]),
+]
+
+
+def evaluate(method, values):
+    try:
+        return 'result', method(values)
+    except Exception as error:
+        return 'error', type(error)
+
+
+with description('Compiled conditions'):
+    with it('should give the same results as the interpreter'):
+        for condition, values_list in CASES:
+            parser = ConditionParser(condition)
+            expect(parser.compiled).not_to(be_none)
+            for values in values_list:
+                expect(evaluate(parser.eval, values)).to(
+                    equal(evaluate(parser.interpret, values))
+                )
+
+    with it('should keep the limits of the interpreter'):
+        parser = ConditionParser("a:x ** y > 0")
+        expect(lambda: parser.eval({'x': 2, 'y': 5000000})).to(
+            raise_error(NumberTooHigh)
+        )
+        parser = ConditionParser("a:s * n")
+        expect(lambda: parser.eval({'s': 'ab', 'n': 10 ** 6})).to(
+            raise_error(IterableTooLong)
+        )
+
+    with context('when the condition uses features that are not compiled'):
+        with it('should interpret it'):
+            conditions = [
+                "a:[v for v in x] == [1]",
+                "a:x.__class__",
+                "a:'{}'.format(x)",
+                "a:open('x')",
+                "a:f'{x}' == '1'",
+                "a:x +",
+            ]
+            for condition in conditions:
+                parser = ConditionParser(condition)
+                expect(parser.compiled).to(be_none)
+                expect(evaluate(parser.eval, {'x': [1]})).to(
+                    equal(evaluate(parser.interpret, {'x': [1]}))
+                )
+
+    with it('should not compile names out of the evaluator'):
+        compiler = ConditionCompiler({}, {})
+        expect(lambda: compiler.compile_expression('x + 1')).to(
+            raise_error(CompileError)
+        )
+        expect(lambda: compiler.compile_expression('len(x)')).to(
+            raise_error(CompileError)
+        )
+        expect(compiler.compile_expression('x[0]')).to(equal("(_n['x'])[_v0]"))
+
+    with it('should compile slices and dictionaries'):
+        compiler = ConditionCompiler({}, ConditionParser('a:1').operators)
+        evaluate = compiler.compile_conditions([
+            ('slice', "x[1:][::2] == [2, 4]"),
+            ('dict', "{'k': x[0]}['k'] == 1"),
+        ])
+        expect(evaluate({'x': [1, 2, 3, 4]})).to(equal('slice'))
+        expect(evaluate({'x': [1, 2]})).to(equal('dict'))
+        expect(evaluate({'x': [0]})).to(be_none)
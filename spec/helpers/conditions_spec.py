@@ -0,0 +1,118 @@
+from mamba import description, context, it
+from expects import *
+from datetime import datetime
+import pickle
+import time
+
+from ooui.helpers import conditions
+from ooui.helpers.conditions import (
+    ConditionParser, get_condition_parser, get_current_date
+)
+
+
+with description('Memoised conditions'):
+    with it('should reuse the result of repeated values'):
+        parser = ConditionParser("red:value>0;green:value==0")
+        for value in (1, 0, 1, 0, 1):
+            parser.eval({'value': value, 'other': [value]})
+        expect(parser.memo.misses).to(equal(2))
+        expect(parser.memo.hits).to(equal(3))
+        expect(parser.eval({'value': 1})).to(equal('red'))
+
+    with it('should key the values with their type'):
+        parser = ConditionParser("a:value is True;b:value")
+        expect(parser.eval({'value': True})).to(equal('a'))
+        expect(parser.eval({'value': 1})).to(equal('b'))
+        expect(parser.eval({'value': 1.0})).to(equal('b'))
+        expect(parser.memo).to(have_length(3))
+
+    with it('should include the names of branches not evaluated'):
+        parser = ConditionParser("a:x or y;b:z.startswith('a')")
+        expect(parser.memo_names).to(equal(('x', 'y', 'z')))
+        expect(parser.eval({'x': True, 'y': False, 'z': 'ab'})).to(equal('a'))
+        expect(parser.eval({'x': False, 'y': False, 'z': 'ab'})).to(
+            equal('b')
+        )
+        expect(parser.eval({'x': False, 'y': True, 'z': 'ab'})).to(equal('a'))
+
+    with it('should not memoise unhashable values'):
+        parser = ConditionParser("red:meter[0] == 1")
+        expect(parser.eval({'meter': [1, 'Meter']})).to(equal('red'))
+        expect(parser.eval({'meter': [2, 'Meter']})).to(be_none)
+        expect(parser.memo).to(have_length(0))
+
+    with it('should not cache errors'):
+        parser = ConditionParser("a:x / y")
+        expect(lambda: parser.eval({'x': 1, 'y': 0})).to(
+            raise_error(ZeroDivisionError)
+        )
+        expect(parser.memo).to(have_length(0))
+
+    with context('when the condition uses time'):
+        with it('should not be memoised'):
+            parser = ConditionParser("red:date < time.strftime('%Y-%m-%d')")
+            expect(parser.memo_names).to(be_none)
+            expect(parser.memo).to(be_none)
+            expect(parser.eval({'date': '2000-01-01'})).to(equal('red'))
+
+    with it('should memoise the interpreted conditions'):
+        parser = ConditionParser("a:[v for v in x] == [1]")
+        expect(parser.compiled).to(be_none)
+        expect(parser.eval({'x': (1,)})).to(equal('a'))
+        expect(parser.eval({'x': (1,)})).to(equal('a'))
+        expect(parser.memo.hits).to(equal(1))
+
+
+with description('Shared condition parsers'):
+    with it('should return the same parser for the same condition'):
+        parser = get_condition_parser("red:value>0")
+        expect(get_condition_parser("red:value>0")).to(be(parser))
+        expect(get_condition_parser("red:value>1")).not_to(be(parser))
+
+    with it('should replace the entities of the views'):
+        parser = get_condition_parser("red:value&lt;0", unescape=True)
+        expect(parser.raw_condition).to(equal("red:value<0"))
+        expect(get_condition_parser("red:value&lt;0", unescape=True)).to(
+            be(parser)
+        )
+
+    with it('should share the parsers when unpickled'):
+        parser = get_condition_parser("red:value>0")
+        expect(pickle.loads(pickle.dumps(parser))).to(be(parser))
+
+    with it('should not parse or compile the unpickled parsers'):
+        parser = get_condition_parser("red:value in (1, 2);blue:-value > 3")
+        data = pickle.dumps(parser)
+        conditions.PARSER_CACHE.clear()
+        conditions.COMPILED_CACHE.clear()
+        original_compile = conditions.compile_conditions
+        original_parse = ConditionParser.parse_condition
+
+        def fail(*args, **kwargs):
+            raise AssertionError('Condition parsed or compiled again')
+
+        conditions.compile_conditions = fail
+        ConditionParser.parse_condition = staticmethod(fail)
+        try:
+            loaded = pickle.loads(data)
+            expect(loaded).not_to(be(parser))
+            expect(loaded.compiled).not_to(be_none)
+            expect(loaded.memo_names).to(equal(('value',)))
+            expect(loaded.eval({'value': 2})).to(equal('red'))
+            expect(loaded.eval({'value': -4})).to(equal('blue'))
+            expect(get_condition_parser(parser.raw_condition)).to(be(loaded))
+        finally:
+            conditions.compile_conditions = original_compile
+            ConditionParser.parse_condition = staticmethod(original_parse)
+
+    with it('should read the current date when evaluated'):
+        parser = get_condition_parser("a:current_date == '1999-01-01'")
+        conditions._CURRENT_DATE = ('1999-01-01', 0, time.time() + 60)
+        expect(parser.eval({})).to(equal('a'))
+        # The next day
+        conditions._CURRENT_DATE = ('1999-01-01', 0, time.time())
+        expect(parser.eval({})).to(be_none)
+        expect(get_current_date()).to(
+            equal(datetime.now().strftime('%Y-%m-%d'))
+        )
+        expect(parser.eval({'current_date': '1999-01-01'})).to(equal('a'))
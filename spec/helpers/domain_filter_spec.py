@@ -0,0 +1,150 @@
+from mamba import description, context, it, before
+from expects import *
+
+from ooui.helpers import Domain
+from ooui.helpers.domain_filter import (
+    compile_domain, filter_records, DomainIndex
+)
+
+RECORDS = [
+    {'id': 1, 'name': 'Alpha', 'state': 'draft', 'amount': 10,
+     'partner_id': [7, 'Acme'], 'tag': False},
+    {'id': 2, 'name': 'beta', 'state': 'open', 'amount': 25,
+     'partner_id': [8, 'Globex'], 'tag': 'x'},
+    {'id': 3, 'name': 'Gamma', 'state': 'open', 'amount': 40,
+     'partner_id': False, 'tag': 'y'},
+    {'id': 4, 'name': 'delta', 'state': 'done', 'amount': 5,
+     'partner_id': [7, 'Acme'], 'tag': 'x'},
+]
+
+
+def ids(domain):
+    return [r['id'] for r in filter_records(domain, RECORDS)]
+
+
+with description('Compiling domains to predicates'):
+    with it('should match everything with an empty domain'):
+        expect(ids([])).to(equal([1, 2, 3, 4]))
+
+    with it('should evaluate the comparison operators'):
+        expect(ids([('state', '=', 'open')])).to(equal([2, 3]))
+        expect(ids([('state', '!=', 'open')])).to(equal([1, 4]))
+        expect(ids([('amount', '<', 25)])).to(equal([1, 4]))
+        expect(ids([('amount', '>=', 25)])).to(equal([2, 3]))
+        expect(ids([('state', 'in', ['draft', 'done'])])).to(equal([1, 4]))
+        expect(ids([('state', 'not in', ['draft'])])).to(equal([2, 3, 4]))
+
+    with it('should evaluate the like operators'):
+        expect(ids([('name', 'like', 'ta')])).to(equal([2, 4]))
+        expect(ids([('name', 'ilike', 'A')])).to(equal([1, 2, 3, 4]))
+        expect(ids([('name', '=like', 'G%a')])).to(equal([3]))
+        expect(ids([('name', 'not ilike', 'alp')])).to(equal([2, 3, 4]))
+
+    with it('should compare many2one values by id or by name'):
+        expect(ids([('partner_id', '=', 7)])).to(equal([1, 4]))
+        expect(ids([('partner_id', '=', 'Globex')])).to(equal([2]))
+        expect(ids([('partner_id', 'in', [8])])).to(equal([2]))
+        expect(ids([('partner_id', 'ilike', 'acm')])).to(equal([1, 4]))
+
+    with it('should handle empty values as null'):
+        expect(ids([('partner_id', '=', False)])).to(equal([3]))
+        expect(ids([('tag', '!=', 'x')])).to(equal([1, 3]))
+        expect(ids([('tag', 'in', [False, 'y'])])).to(equal([1, 3]))
+        expect(ids([('amount', '>', 0), ('tag', '<', 'z')])).to(
+            equal([2, 3, 4])
+        )
+
+    with it('should not take null values as 0'):
+        records = [{'id': 1, 'qty': False}, {'id': 2, 'qty': 0}]
+
+        def match(domain):
+            return [r['id'] for r in filter_records(domain, records)]
+
+        expect(match([('qty', '=', 0)])).to(equal([2]))
+        expect(match([('qty', '!=', 0)])).to(equal([1]))
+        expect(match([('qty', '=', False)])).to(equal([1]))
+        expect(match([('qty', '!=', False)])).to(equal([2]))
+        expect(match([('qty', 'in', [0])])).to(equal([2]))
+        expect(DomainIndex(records).filter([('qty', '=', 0)])).to(
+            equal([records[1]])
+        )
+
+    with it('should evaluate the prefix operators'):
+        expect(ids(['|', ('state', '=', 'draft'), ('amount', '>', 30)])).to(
+            equal([1, 3])
+        )
+        expect(ids(['!', ('state', '=', 'open')])).to(equal([1, 4]))
+        expect(ids([
+            '|', '&', ('state', '=', 'open'), ('amount', '<', 30),
+            ('name', '=', 'delta'), ('partner_id', '!=', False)
+        ])).to(equal([2, 4]))
+
+    with it('should evaluate the true and false leaves'):
+        expect(ids([(1, '=', 1)])).to(equal([1, 2, 3, 4]))
+        expect(ids([(0, '=', 1)])).to(equal([]))
+
+    with it('should not evaluate child_of'):
+        expect(lambda: compile_domain([('id', 'child_of', 1)])).to(
+            raise_error(ValueError)
+        )
+
+    with it('should raise ValueError with invalid domains'):
+        expect(lambda: compile_domain(['|', ('id', '=', 1)])).to(
+            raise_error(ValueError)
+        )
+        expect(lambda: compile_domain([('id', 'between', 1)])).to(
+            raise_error(ValueError)
+        )
+
+    with it('should compile parsed domains'):
+        predicate = Domain("[('partner_id', '=', uid)]").compile({'uid': 8})
+        expect([r['id'] for r in RECORDS if predicate(r)]).to(equal([2]))
+
+
+with description('Filtering records with a DomainIndex'):
+    with before.each:
+        self.index = DomainIndex(RECORDS)
+
+    with it('should give the same records as the predicate'):
+        domains = [
+            [],
+            [('state', '=', 'open')],
+            [('state', 'in', ['open', 'done']), ('amount', '<', 30)],
+            [('partner_id', '=', 7)],
+            [('partner_id', '=', 'Acme')],
+            [('partner_id', '=', False)],
+            [('tag', '=', False)],
+            ['|', ('state', '=', 'draft'), ('tag', '=', 'y')],
+            ['!', ('state', '=', 'open')],
+            [('id', '=', 0)],
+        ]
+        for domain in domains:
+            expect([r['id'] for r in self.index.filter(domain)]).to(
+                equal(ids(domain))
+            )
+
+    with it('should evaluate every record with unhashable values'):
+        domains = [
+            [('partner_id', 'in', [[7, 'Acme']])],
+            [('tag', '=', {'x': 1})],
+            [('tag', 'in', [['x'], 'y'])],
+        ]
+        for domain in domains:
+            expect([r['id'] for r in self.index.filter(domain)]).to(
+                equal(ids(domain))
+            )
+
+    with it('should only evaluate the indexed candidates'):
+        calls = []
+
+        class Record(dict):
+            def __getitem__(self, key):
+                calls.append(key)
+                return dict.__getitem__(self, key)
+
+        index = DomainIndex(Record(r) for r in RECORDS)
+        index.filter([('state', '=', 'done')])
+        del calls[:]
+        result = index.filter([('state', '=', 'open'), ('amount', '>', 30)])
+        expect([r['id'] for r in result]).to(equal([3]))
+        expect(calls.count('amount')).to(equal(2))
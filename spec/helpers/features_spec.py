@@ -1,6 +1,8 @@
 from mamba import *
 from expects import *
-from ooui.helpers.features import preprocess_feature_tags
+from ooui.helpers.features import (
+    preprocess_feature_tags, BatchFeatureChecker, check_features
+)
 
 
 from lxml import etree
@@ -110,3 +112,63 @@ with description('preprocess_feature_tags'):
             </form>
         """
         expect(xml_equal(result, expected_xml)).to(be_true)
+
+
+with description('Batch feature checkers'):
+    with before.each:
+        self.xml = """
+        <form>
+            <feature key="a"><field name="a"/></feature>
+            <feature key="b"><field name="b"/></feature>
+            <feature key="a" status="disabled"><field name="c"/></feature>
+        </form>
+        """
+        self.calls = []
+
+    with it('checks all the distinct keys with a single call'):
+        def check(keys):
+            self.calls.append(keys)
+            return {'a': True, 'b': False}
+
+        result = preprocess_feature_tags(self.xml, BatchFeatureChecker(check))
+        expect(self.calls).to(equal([['a', 'b']]))
+        expect(xml_equal(result, preprocess_feature_tags(
+            self.xml, lambda key: key == 'a'
+        ))).to(be_true)
+
+    with it('accepts the states as a list in the order of the keys'):
+        checker = BatchFeatureChecker(lambda keys: [False, True])
+        expect(check_features(checker, ['a', 'b'])).to(
+            equal({'a': False, 'b': True})
+        )
+        expect(lambda: check_features(checker, ['a'])).to(
+            raise_error(ValueError)
+        )
+
+    with it('checks the keys missing from the result one by one'):
+        class Checker(object):
+            def check_features(self, keys):
+                return {'a': True}
+
+            def __call__(self, key):
+                return key == 'b'
+
+        expect(check_features(Checker(), ['a', 'b'])).to(
+            equal({'a': True, 'b': True})
+        )
+        checker = BatchFeatureChecker(lambda keys: {})
+        expect(check_features(checker, ['a'])).to(equal({'a': False}))
+
+    with it('calls a plain checker once for each distinct key'):
+        def checker(key):
+            self.calls.append(key)
+            return key == 'a'
+
+        preprocess_feature_tags(self.xml, checker)
+        expect(self.calls).to(equal(['a', 'b']))
+
+    with it('does not call the checker without feature tags'):
+        result = preprocess_feature_tags(
+            '<form/>', BatchFeatureChecker(self.calls.append)
+        )
+        expect(self.calls).to(be_empty)
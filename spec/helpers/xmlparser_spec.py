@@ -0,0 +1,75 @@
+from mamba import description, context, it
+from expects import *
+import threading
+
+from lxml import etree
+
+from ooui.helpers.xmlparser import get_xml_parser, parse_xml
+from ooui.helpers.features import preprocess_feature_tags
+from ooui.graph import parse_graph
+from ooui.tree import parse_tree
+
+GRAPH_XML = b'''<?xml version="1.0" encoding="utf-8"?>
+<graph type="bar">
+    <feature key="period">
+        <field name="period" axis="x"/>
+    </feature>
+    <feature key="period" status="disabled">
+        <field name="name" axis="x"/>
+    </feature>
+    <field name="value" operator="+" axis="y"/>
+</graph>'''
+
+
+with description('Shared XML parsers'):
+    with it('should reuse one parser per thread'):
+        parsers = []
+        thread = threading.Thread(
+            target=lambda: parsers.append(get_xml_parser())
+        )
+        thread.start()
+        thread.join()
+
+        expect(get_xml_parser()).to(be(get_xml_parser()))
+        expect(parsers[0]).not_to(be(get_xml_parser()))
+
+    with it('should not resolve entities'):
+        doc = parse_xml(
+            b'<!DOCTYPE r [<!ENTITY e SYSTEM "file:///etc/hostname">]>'
+            b'<r>&e;</r>'
+        )
+        expect(doc.text).to(be_none)
+
+    with it('should remove the blank text'):
+        doc = parse_xml('<a>\n    <b/>\n</a>')
+        expect(etree.tostring(doc)).to(equal(b'<a><b/></a>'))
+
+    with it('should return the elements as they are'):
+        element = etree.Element('tree')
+        expect(parse_xml(element)).to(be(element))
+
+
+with description('Parsing views from bytes and elements'):
+    with it('should pass the preprocessed element to parse_graph'):
+        element = preprocess_feature_tags(
+            GRAPH_XML, lambda key: True, output='element'
+        )
+        graph = parse_graph(element)
+        expect(graph.x.name).to(equal('period'))
+
+    with it('should return the preprocessed view as bytes'):
+        result = preprocess_feature_tags(
+            GRAPH_XML, lambda key: False, output='bytes'
+        )
+        expect(result).to(be_a(bytes))
+        expect(parse_graph(result).x.name).to(equal('name'))
+
+    with it('should parse trees from bytes and elements'):
+        expect(parse_tree(b'<tree string="Bytes"/>').string).to(equal('Bytes'))
+        element = etree.fromstring('<tree string="Element"/>')
+        expect(parse_tree(element).string).to(equal('Element'))
+
+    with it('should not accept unknown output formats'):
+        expect(lambda: preprocess_feature_tags(
+            GRAPH_XML, lambda key: True, output='str'
+        )).to(raise_error(ValueError))
@@ -0,0 +1,60 @@
+from mamba import description, context, it
+from expects import *
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_loaded_modules(module, names):
+    script = (
+        'import json, sys\n'
+        'import {}\n'
+        'print(json.dumps([m for m in {!r} if m in sys.modules]))'
+    ).format(module, names)
+    output = subprocess.check_output([sys.executable, '-c', script],
+                                     cwd=ROOT_DIR)
+    return json.loads(output.decode('utf-8'))
+
+
+with description('Importing ooui'):
+    with context('when importing ooui.tree'):
+        with it('should not load lxml nor simpleeval'):
+            expect(get_loaded_modules(
+                'ooui.tree', ['lxml.etree', 'simpleeval']
+            )).to(be_empty)
+
+    with context('when importing ooui.helpers'):
+        with it('should not load the helpers until they are used'):
+            expect(get_loaded_modules(
+                'ooui.helpers', ['simpleeval', 'dateutil', 'six']
+            )).to(be_empty)
+
+        with it('should load them on first use'):
+            from ooui.helpers import ConditionParser, Domain, Aggregator
+            from ooui.helpers.conditions import ConditionParser as Parser
+            expect(ConditionParser).to(be(Parser))
+
+        with it('should raise AttributeError for unknown names'):
+            import ooui.helpers
+            expect(lambda: ooui.helpers.Unknown).to(raise_error(AttributeError))
+
+    with context('when importing ooui.graph'):
+        with it('should not load lxml nor the chart processing'):
+            expect(get_loaded_modules(
+                'ooui.graph', ['lxml.etree', 'dateutil', 'ooui.graph.chart']
+            )).to(be_empty)
+
+        with it('should load the graph classes on first use'):
+            from ooui.graph import GraphChart, iter_json
+            from ooui.graph.chart import GraphChart as Chart
+            expect(GraphChart).to(be(Chart))
+
+        with it('should map the graph types to their classes'):
+            from ooui.graph import GRAPH_TYPES
+            from ooui.graph.chart import GraphChart
+            from ooui.graph.indicator import GraphIndicator
+            expect(GRAPH_TYPES['bar']).to(be(GraphChart))
+            expect(GRAPH_TYPES['indicator']).to(be(GraphIndicator))
@@ -0,0 +1,115 @@
+from mamba import description, context, it, before, after
+from expects import *
+import socket
+
+from ooui.metrics import (
+    MetricsRegistry, StatsdMetrics, NullMetrics, get_registry, set_registry,
+    timed
+)
+from ooui.graph import parse_graph
+from ooui.tree import parse_tree
+from ooui.helpers import ConditionParser, Domain, Aggregator
+from ooui.helpers.features import preprocess_feature_tags
+
+GRAPH_XML = '''<?xml version="1.0"?>
+<graph type="bar">
+    <field name="name" axis="x"/>
+    <field name="value" operator="+" axis="y"/>
+</graph>'''
+
+
+with description('Metrics'):
+
+    with context('by default'):
+        with it('should use a no-op registry'):
+            expect(get_registry()).to(be_a(NullMetrics))
+
+    with context('when using an in-memory registry'):
+        with before.each:
+            self.registry = MetricsRegistry()
+            self.previous = set_registry(self.registry)
+
+        with after.each:
+            set_registry(self.previous)
+
+        with it('should count and time the instrumented hot paths'):
+            graph = parse_graph(GRAPH_XML)
+            graph.process(
+                [{'name': 'a', 'value': 1}],
+                {'name': {'type': 'char'}, 'value': {'type': 'float'}}
+            )
+            parse_tree('<tree colors="red:state==\'draft\'"/>')
+            ConditionParser("red:state=='draft'").eval({'state': 'draft'})
+            Domain("[('state', '=', 'draft')]").parse()
+            Aggregator([{'value': 1}], {'value': ['sum']}).process()
+            preprocess_feature_tags('<form/>', lambda key: True)
+
+            for name in ('ooui_parse_graph', 'ooui_parse_tree',
+                         'ooui_condition_eval', 'ooui_domain_parse',
+                         'ooui_aggregator_process',
+                         'ooui_preprocess_feature_tags', 'ooui_graph_process'):
+                expect(self.registry.counters['{}_total'.format(name)]).to(
+                    equal(1)
+                )
+                histogram = self.registry.histograms['{}_seconds'.format(name)]
+                expect(histogram.count).to(equal(1))
+
+        with it('should render the metrics as Prometheus text'):
+            self.registry.increment('ooui_parse_graph_total', 2)
+            self.registry.observe('ooui_parse_graph_seconds', 0.002)
+            self.registry.observe('ooui_parse_graph_seconds', 10)
+            text = self.registry.to_prometheus_text()
+
+            expect(text).to(contain('# TYPE ooui_parse_graph_total counter\n'))
+            expect(text).to(contain('ooui_parse_graph_total 2\n'))
+            expect(text).to(contain('# TYPE ooui_parse_graph_seconds histogram\n'))
+            expect(text).to(contain('ooui_parse_graph_seconds_bucket{le="0.001"} 0\n'))
+            expect(text).to(contain('ooui_parse_graph_seconds_bucket{le="0.005"} 1\n'))
+            expect(text).to(contain('ooui_parse_graph_seconds_bucket{le="5.0"} 1\n'))
+            expect(text).to(contain('ooui_parse_graph_seconds_bucket{le="+Inf"} 2\n'))
+            expect(text).to(contain('ooui_parse_graph_seconds_count 2\n'))
+
+        with it('should record failed calls too'):
+            @timed('failing')
+            def failing():
+                raise ValueError('boom')
+
+            expect(failing).to(raise_error(ValueError))
+            expect(self.registry.counters['failing_total']).to(equal(1))
+
+    with context('when using a StatsD registry'):
+        with before.each:
+            self.server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.server.bind(('127.0.0.1', 0))
+            self.server.settimeout(2)
+            port = self.server.getsockname()[1]
+            self.registry = StatsdMetrics(port=port, prefix='erp')
+            self.previous = set_registry(self.registry)
+
+        with after.each:
+            set_registry(self.previous)
+            self.registry.close()
+            self.server.close()
+
+        with it('should send StatsD lines to the server'):
+            ConditionParser("red:state=='draft'").eval({'state': 'draft'})
+            self.registry.flush()
+
+            lines = self.server.recv(4096).decode('utf-8').split('\n')
+            expect(lines).to(have_length(2))
+            expect(lines[0]).to(equal('erp.ooui_condition_eval_total:1|c'))
+            expect(lines[1]).to(start_with('erp.ooui_condition_eval_seconds:'))
+            expect(lines[1]).to(end_with('|ms'))
+
+        with it('should split the lines in packets of max_packet_size'):
+            self.registry.max_packet_size = 64
+            for _ in range(10):
+                self.registry.increment('ooui_parse_tree_total')
+            self.registry.flush()
+
+            received = []
+            while sum(len(p.split(b'\n')) for p in received) < 10:
+                packet = self.server.recv(4096)
+                expect(len(packet)).to(be_below_or_equal(64))
+                received.append(packet)
+            expect(len(received)).to(be_above(1))
@@ -0,0 +1,64 @@
+from mamba import description, context, it, after
+from expects import *
+import gc
+
+import ooui
+from ooui.graph import parse_graph, PARSE_CACHE as GRAPH_CACHE
+from ooui.tree import parse_tree, PARSE_CACHE as TREE_CACHE
+from ooui.helpers.conditions import CONDITION_CACHE
+from ooui.prefork import _get_caches
+
+GRAPH_XML = '''<graph type="bar">
+    <field name="warmup_name" axis="x"/>
+    <field name="value" operator="+" axis="y"/>
+</graph>'''
+
+TREE_XML = '<tree colors="red:warmup_state==\'draft\'"/>'
+
+
+with description('Warming up views before forking'):
+    with after.each:
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+        for cache in _get_caches():
+            cache.unfreeze()
+
+    with it('should parse the views and fill the caches'):
+        views = ooui.warmup([GRAPH_XML, TREE_XML.encode('utf-8')], freeze=False)
+        expect(views).to(have_length(2))
+        expect(views[0].x.name).to(equal('warmup_name'))
+        expect(parse_graph(GRAPH_XML)).to(be(views[0]))
+        expect(TREE_CACHE.get(TREE_XML.encode('utf-8'))).to(be(views[1]))
+        expect("red:warmup_state=='draft'" in CONDITION_CACHE).to(be_true)
+
+    with it('should grow the caches to fit the views'):
+        maxsize = GRAPH_CACHE.maxsize
+        GRAPH_CACHE.resize(4)
+        try:
+            archs = [
+                GRAPH_XML.replace('warmup_name', 'grow_{}'.format(i))
+                for i in range(10)
+            ]
+            views = ooui.warmup(archs, freeze=False)
+            expect(GRAPH_CACHE.maxsize).to(be_above_or_equal(10))
+            for arch, view in zip(archs, views):
+                expect(parse_graph(arch)).to(be(view))
+        finally:
+            GRAPH_CACHE.resize(maxsize)
+
+    with it('should keep the views that are already parsed'):
+        tree = parse_tree('<tree string="Parsed"/>')
+        expect(ooui.warmup([tree], freeze=False)).to(equal([tree]))
+
+    with it('should freeze the objects from the garbage collector'):
+        ooui.warmup([GRAPH_XML])
+        if hasattr(gc, 'get_freeze_count'):
+            expect(gc.get_freeze_count()).to(be_above(0))
+
+    with it('should freeze the caches'):
+        ooui.warmup([GRAPH_XML], freeze=False)
+        expect(GRAPH_CACHE.frozen).to(be_false)
+        ooui.warmup([GRAPH_XML])
+        expect(GRAPH_CACHE.frozen).to(be_true)
+        expect(CONDITION_CACHE.frozen).to(be_true)
+        expect(parse_graph(GRAPH_XML).x.name).to(equal('warmup_name'))
@@ -0,0 +1,69 @@
+from mamba import description, context, it, before
+from expects import *
+
+from ooui.tree import parse_tree
+
+XML = '''<tree infinite="1" colors="red:amount&lt;0">
+    <field name="name"/>
+    <field name="amount" sum="Total" max="Max"/>
+</tree>'''
+
+
+def make_page(start, size):
+    return [
+        {'name': 'row {}'.format(i), 'amount': i if i % 2 else -i}
+        for i in range(start, start + size)
+    ]
+
+
+with description('Tree cursor'):
+    with before.each:
+        self.tree = parse_tree(XML)
+
+    with it('should decorate only the rows of each new page'):
+        cursor = self.tree.cursor()
+        first = cursor.add_page(make_page(0, 3))
+        second = cursor.add_page(make_page(3, 2))
+
+        expect(first['page']).to(equal(0))
+        expect(second['page']).to(equal(1))
+        expect(second['decorations']).to(equal([{'color': None}, {'color': 'red'}]))
+        expect(cursor.pages).to(equal([0, 1]))
+        expect(cursor.get_decorations(0)).to(have_length(3))
+
+    with it('should keep the running aggregates of every page'):
+        cursor = self.tree.cursor()
+        cursor.add_page(make_page(0, 3))
+        result = cursor.add_page(make_page(3, 2))
+
+        expected = self.tree.process(make_page(0, 5))['aggregates']
+        expect(result['aggregates']).to(equal(expected))
+        expect(cursor.num_rows).to(equal(5))
+
+    with context('when pages are evicted'):
+        with it('should keep the totals'):
+            cursor = self.tree.cursor()
+            cursor.add_page(make_page(0, 3))
+            cursor.add_page(make_page(3, 3))
+            cursor.evict()
+
+            expect(cursor.pages).to(equal([1]))
+            expect(cursor.aggregates).to(equal(
+                self.tree.process(make_page(0, 6))['aggregates']
+            ))
+
+        with it('should evict the oldest pages beyond max_pages'):
+            cursor = self.tree.cursor(max_pages=2)
+            for start in range(0, 12, 3):
+                cursor.add_page(make_page(start, 3))
+
+            expect(cursor.pages).to(equal([2, 3]))
+            expect(cursor.aggregates['amount']['max']).to(equal(11))
+
+        with it('should raise KeyError for pages not loaded'):
+            cursor = self.tree.cursor()
+            expect(cursor.evict).to(raise_error(KeyError))
+            expect(lambda: cursor.evict(3)).to(raise_error(KeyError))
+
+    with it('should not accept an empty window'):
+        expect(lambda: self.tree.cursor(max_pages=0)).to(raise_error(ValueError))
@@ -1,5 +1,5 @@
-from mamba import description, context, it
-from expects import expect, equal
+from mamba import description, context, it, before
+from expects import expect, equal, have_length
 from ooui.tree import parse_tree
 
 with description('Tree') as self:
@@ -44,3 +44,50 @@ with description('Tree') as self:
             fields = tree.fields_in_conditions
             expect(fields['colors']).to(equal(['state']))
             expect(fields['status']).to(equal(['active']))
+
+    with context('when the fields define footer aggregates'):
+        with before.each:
+            self.tree = parse_tree('''<tree colors="red:amount&lt;0" status="danger:state=='draft'">
+                <field name="state"/>
+                <field name="amount" sum="Total" avg="Average" digits="(16, 2)"/>
+                <field name="qty" max="Max" digits="bad"/>
+            </tree>''')
+            self.rows = [
+                {'state': 'draft', 'amount': -1.004, 'qty': 3},
+                {'state': 'done', 'amount': 2.333, 'qty': 5},
+            ]
+
+        with it('should return the aggregates and precisions of the fields'):
+            expect(self.tree.aggregates).to(equal({
+                'amount': {'sum': 'Total', 'avg': 'Average'},
+                'qty': {'max': 'Max'},
+            }))
+            expect(self.tree.precisions).to(equal({'amount': 2}))
+
+        with it('should build an aggregator for the footer'):
+            aggregator = self.tree.aggregator(self.rows)
+            expect(aggregator.process()).to(equal({
+                'amount': {'sum': 1.33, 'avg': 0.66},
+                'qty': {'max': 5},
+            }))
+
+        with it('should decorate and aggregate the rows in one pass'):
+            result = self.tree.process(iter(self.rows))
+            expect(result['decorations']).to(equal([
+                {'color': 'red', 'status': 'danger'},
+                {'color': None, 'status': None},
+            ]))
+            expect(result['aggregates']['amount']['sum']).to(equal(1.33))
+
+        with it('should count the rows of fields that are not numbers'):
+            tree = parse_tree('<tree><field name="state" count="Rows"/></tree>')
+            result = tree.process(self.rows + [{'state': None}])
+            expect(result['aggregates']).to(equal({'state': {'count': 3}}))
+
+        with it('should accumulate the rows in the given aggregator'):
+            aggregator = self.tree.aggregator()
+            self.tree.process(self.rows[:1], aggregator)
+            result = self.tree.process(self.rows[1:], aggregator)
+            expect(result['decorations']).to(have_length(1))
+            expect(result['aggregates']['qty']['max']).to(equal(5))
+            expect(result['aggregates']['amount']['sum']).to(equal(1.33))